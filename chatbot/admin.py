@@ -24,6 +24,9 @@ class WebsiteAdmin(admin.ModelAdmin):
         ('AI Settings', {
             'fields': ('ai_model', 'ai_temperature', 'ai_max_tokens', 'system_prompt')
         }),
+        ('Retention', {
+            'fields': ('archive_after_days',)
+        }),
         ('Metadata', {
             'fields': ('id', 'created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -160,7 +160,7 @@ def end_conversation(request, conversation_id):
         # Mark conversation as ended
         conversation.is_active = False
         conversation.ended_at = timezone.now()
-        conversation.save()
+        conversation.save(update_fields=['is_active', 'ended_at'])
         
         # Notify via WebSocket
         if channel_layer:
@@ -0,0 +1,94 @@
+"""JSON codec for WebSocket frames, channel layer events and JSON responses
+
+The codec is chosen with the JSON_CODEC setting: 'orjson', 'json', or
+'auto' (the default), which uses orjson when it is installed. Both produce
+plain JSON for the payloads used here; datetimes, UUIDs and Decimals are
+encoded as DjangoJSONEncoder would.
+"""
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+DecodeError = json.JSONDecodeError  # orjson.JSONDecodeError subclasses it
+
+
+class JSONCodec:
+    """Standard library json"""
+
+    name = 'json'
+
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj, cls=DjangoJSONEncoder)
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """orjson: several times faster encoding and decoding"""
+
+    name = 'orjson'
+    _encoder = DjangoJSONEncoder()
+
+    @classmethod
+    def dumps(cls, obj):
+        # Passing datetimes through keeps their format identical to DjangoJSONEncoder's
+        return orjson.dumps(obj, default=cls._encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME).decode()
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+
+CODECS = {codec.name: codec for codec in (JSONCodec, OrjsonCodec)}
+
+
+def get_codec(name=None):
+    name = name or getattr(settings, 'JSON_CODEC', 'auto')
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+    if name == 'orjson' and orjson is None:
+        raise ImportError("JSON_CODEC is 'orjson' but orjson is not installed")
+    return CODECS[name]
+
+
+def dumps(obj):
+    """Encode obj as JSON text"""
+    return get_codec().dumps(obj)
+
+
+def loads(data):
+    """Decode JSON text or bytes; raises DecodeError on invalid input"""
+    return get_codec().loads(data)
+
+
+class JsonResponse(HttpResponse):
+    """django.http.JsonResponse encoded with the configured codec"""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+class CodecJSONRenderer(JSONRenderer):
+    """DRF JSONRenderer using the configured codec for compact (non-indented) output"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data).encode()
@@ -1,33 +1,160 @@
-import json
+import asyncio
 import logging
 import uuid
+from collections import OrderedDict
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.contrib.auth.models import AnonymousUser
+from django.db import IntegrityError
 from django.utils import timezone
+from . import codec, metrics
 from .models import Website, Conversation, Message
-from .services import NotificationService
+from .services import ChatbotService, MessageWriteBehind, NotificationRoute, NotificationService, ReplayBuffer
 
 logger = logging.getLogger(__name__)
+# Per-frame debug records, sampled by settings.LOG_SAMPLE_RATE
+frame_logger = logging.getLogger('chatbot.frames')
 
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ConversationState:
+    """Per-connection snapshot of a conversation and the website it belongs to"""
+    
+    __slots__ = ('conversation', 'website_id', 'website_name', 'owner_id')
+    
+    def __init__(self, conversation):
+        # The conversation must be loaded with select_related('website')
+        website = conversation.website
+        self.conversation = conversation
+        self.website_id = str(website.id)
+        self.website_name = website.name
+        self.owner_id = website.owner_id
+
+
+class SocketMetricsMixin:
+    """Keeps the open-socket gauge for a consumer (label: metrics_label)"""
+    
+    metrics_label = None
+    socket_counted = False
+    
+    async def accept(self, *args, **kwargs):
+        await super().accept(*args, **kwargs)
+        metrics.OPEN_SOCKETS.inc(consumer=self.metrics_label)
+        self.socket_counted = True
+    
+    async def websocket_disconnect(self, message):
+        if self.socket_counted:
+            metrics.OPEN_SOCKETS.dec(consumer=self.metrics_label)
+            self.socket_counted = False
+        await super().websocket_disconnect(message)
+
+
+class DashboardAccessCache:
+    """What one dashboard connection may see
+    
+    Holds the user's websites (id -> name), seeded at connect time and kept
+    current by website_access_changed events, and an LRU of conversation id
+    -> website id. A conversation never moves between websites, so mappings
+    only go stale when their website is deleted.
+    """
+    
+    MISSING = object()
+    
+    def __init__(self, max_conversations=None):
+        self.websites = {}
+        self.conversations = OrderedDict()
+        self.max_conversations = max_conversations or getattr(settings, 'DASHBOARD_ACCESS_CACHE_SIZE', 1000)
+    
+    def website_for(self, conversation_id):
+        """Cached website id of a conversation (None if it does not exist), or MISSING"""
+        website_id = self.conversations.get(conversation_id, self.MISSING)
+        if website_id is not self.MISSING:
+            self.conversations.move_to_end(conversation_id)
+        return website_id
+    
+    def remember(self, conversation_id, website_id):
+        self.conversations[conversation_id] = website_id
+        self.conversations.move_to_end(conversation_id)
+        while len(self.conversations) > self.max_conversations:
+            self.conversations.popitem(last=False)
+    
+    def grant(self, website_id, name):
+        self.websites[website_id] = name
+    
+    def revoke(self, website_id, deleted=False):
+        self.websites.pop(website_id, None)
+        if deleted:
+            for conversation_id in [c for c, w in self.conversations.items() if w == website_id]:
+                del self.conversations[conversation_id]
+
+
+class TypingCoalescer:
+    """Collapses one connection's typing frames into start/stop transitions
+    
+    Keyed by conversation id. A start is published once, however many typing
+    frames follow; repeated stops are ignored. A stop is held back for
+    TYPING_DEBOUNCE seconds so a quick stop/start pair publishes nothing, and
+    a start with no further frames expires after TYPING_TIMEOUT seconds.
+    `publish(key, is_typing)` is awaited for each transition.
+    """
+    
+    def __init__(self, publish):
+        self.publish = publish
+        self.debounce = getattr(settings, 'TYPING_DEBOUNCE', 1.0)
+        self.timeout = getattr(settings, 'TYPING_TIMEOUT', 6.0)
+        self.timers = {}  # key -> pending stop task, for keys currently typing
+    
+    async def update(self, key, is_typing):
+        timer = self.timers.get(key)
+        if timer is None:
+            if not is_typing:
+                return
+            await self.publish(key, True)
+        else:
+            timer.cancel()
+        self.timers[key] = asyncio.ensure_future(self._stop_after(key, self.timeout if is_typing else self.debounce))
+    
+    async def _stop_after(self, key, delay):
+        await asyncio.sleep(delay)
+        del self.timers[key]
+        try:
+            await self.publish(key, False)
+        except Exception as e:
+            logger.error(f"Error publishing typing stop for {key}: {e}")
+    
+    async def close(self):
+        """Publish a stop for every key still typing (call on disconnect)"""
+        for key, timer in list(self.timers.items()):
+            timer.cancel()
+            del self.timers[key]
+            await self.publish(key, False)
+
+
+class ChatConsumer(SocketMetricsMixin, AsyncWebsocketConsumer):
     """WebSocket consumer for handling real-time chat with website visitors"""
     
+    metrics_label = 'chat'
+    FRAME_TYPES = ('chat_message', 'typing', 'ping', 'init_conversation', 'identify', 'resume')
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.conversation_id = None
         self.room_group_name = None
         self.website_id = None
         self.user_identifier = None
+        self.state = None
+        self.chatbot = None
+        self.website_group_name = None
+        self.typing = TypingCoalescer(self.publish_typing)
+        self.typing_metadata = {}
     
     async def connect(self):
         """Handle WebSocket connection for chatbot"""
         try:
             # Get parameters from URL route
             self.conversation_id = self.scope['url_route']['kwargs']['conversation_id']
-            print(f'Connecting to chat: conversation_id={self.conversation_id}')
             
             # Extract optional parameters with fallbacks
             self.website_id = self.scope['url_route']['kwargs'].get('website_id')
@@ -43,7 +170,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
             #         if not self.user_identifier or self.user_identifier == 'Anonymous':
             #             self.user_identifier = params.get('user_identifier', ['Anonymous'])[0]
 
-            print(f'Connecting to chat: conversation_id={self.conversation_id}, website_id={self.website_id}, user_identifier={self.user_identifier}')
+            frame_logger.debug('Chat socket connecting', extra={
+                'conversation_id': str(self.conversation_id), 'website_id': self.website_id
+            })
             
             # Validate UUID format for conversation_id
             try:
@@ -55,11 +184,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
             
             self.room_group_name = f'chat_{self.conversation_id}'
             
-            # Try to get existing conversation first
-            conversation = await self.get_conversation(self.conversation_id)
+            # Try to get existing conversation first and keep it for the connection
+            await self.remember_state(await self.load_conversation_state(self.conversation_id))
             
             # If conversation exists or we have website_id, proceed with connection
-            if conversation or self.website_id:
+            if self.state or self.website_id:
                 # Join room group
                 await self.channel_layer.group_add(
                     self.room_group_name,
@@ -70,12 +199,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 logger.info(f"Chat WebSocket connected for conversation {self.conversation_id}")
                 
                 # Send connection confirmation
-                await self.send(text_data=json.dumps({
+                await self.send(text_data=codec.dumps({
                     'type': 'connection_established',
                     'message': 'WebSocket connection established',
                     'conversation_id': str(self.conversation_id),
                     'status': 'success',
-                    'requires_identification': not bool(conversation or self.website_id)
+                    'requires_identification': not bool(self.state or self.website_id)
                 }))
             else:
                 # No existing conversation and no website_id - accept connection but require identification
@@ -88,7 +217,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 logger.info(f"Chat WebSocket connected for conversation {self.conversation_id} (pending identification)")
                 
                 # Send connection confirmation with identification requirement
-                await self.send(text_data=json.dumps({
+                await self.send(text_data=codec.dumps({
                     'type': 'connection_established',
                     'message': 'WebSocket connection established. Please identify yourself by sending an "identify" message with website_id.',
                     'conversation_id': str(self.conversation_id),
@@ -103,6 +232,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection"""
         try:
+            await self.typing.close()
+            if MessageWriteBehind.enabled():
+                await MessageWriteBehind.for_loop().flush()
+            if self.website_group_name:
+                await self.channel_layer.group_discard(self.website_group_name, self.channel_name)
             if hasattr(self, 'room_group_name') and self.room_group_name:
                 # Leave room group
                 await self.channel_layer.group_discard(
@@ -116,38 +250,43 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         """Handle messages from WebSocket"""
         try:
-            text_data_json = json.loads(text_data)
-            print(f'Received message: {text_data_json}')
+            text_data_json = codec.loads(text_data)
             message_type = text_data_json.get('type')
+            frame_logger.debug('Frame received', extra={
+                'consumer': 'chat', 'frame_type': message_type, 'conversation_id': str(self.conversation_id)
+            })
             
-            if message_type == 'chat_message':
-                await self.handle_chat_message(text_data_json)
-            elif message_type == 'typing':
-                await self.handle_typing_indicator(text_data_json)
-            elif message_type == 'ping':
-                await self.handle_ping(text_data_json)
-            elif message_type == 'init_conversation':
-                await self.handle_init_conversation(text_data_json)
-            elif message_type == 'identify':
-                await self.handle_identify(text_data_json)
-            else:
-                logger.warning(f"Unknown message type: {message_type}")
-                await self.send(text_data=json.dumps({
-                    'type': 'error',
-                    'message': f'Unknown message type: {message_type}',
-                    'code': 'UNKNOWN_MESSAGE_TYPE'
-                }))
+            with metrics.track_frame('chat', message_type if message_type in self.FRAME_TYPES else 'unknown'):
+                if message_type == 'chat_message':
+                    await self.handle_chat_message(text_data_json)
+                elif message_type == 'typing':
+                    await self.handle_typing_indicator(text_data_json)
+                elif message_type == 'ping':
+                    await self.handle_ping(text_data_json)
+                elif message_type == 'init_conversation':
+                    await self.handle_init_conversation(text_data_json)
+                elif message_type == 'identify':
+                    await self.handle_identify(text_data_json)
+                elif message_type == 'resume':
+                    await self.handle_resume(text_data_json)
+                else:
+                    logger.warning(f"Unknown message type: {message_type}")
+                    await self.send(text_data=codec.dumps({
+                        'type': 'error',
+                        'message': f'Unknown message type: {message_type}',
+                        'code': 'UNKNOWN_MESSAGE_TYPE'
+                    }))
                 
-        except json.JSONDecodeError:
+        except codec.DecodeError:
             logger.error("Invalid JSON received")
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Invalid message format',
                 'code': 'INVALID_JSON'
             }))
         except Exception as e:
             logger.error(f"Error handling WebSocket message: {e}")
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Internal server error',
                 'code': 'INTERNAL_ERROR'
@@ -160,7 +299,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         metadata = message_data.get('metadata', {})
         
         if not website_id:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'website_id is required for identification',
                 'code': 'MISSING_WEBSITE_ID'
@@ -171,7 +310,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             # Validate UUID format for website_id
             uuid.UUID(str(website_id))
         except ValueError:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Invalid website_id format',
                 'code': 'INVALID_WEBSITE_ID'
@@ -184,18 +323,19 @@ class ChatConsumer(AsyncWebsocketConsumer):
         # Get or create conversation with the provided identification
         conversation = await self.get_or_create_conversation()
         if not conversation:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Failed to identify conversation',
                 'code': 'IDENTIFICATION_FAILED'
             }))
             return
+        await self.remember_state(ConversationState(conversation))
         
         # Update conversation metadata if provided
         if metadata:
             await self.update_conversation_metadata(conversation, metadata)
         
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=codec.dumps({
             'type': 'identified',
             'conversation_id': str(self.conversation_id),
             'website_id': str(self.website_id),
@@ -204,7 +344,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         }))
         
         # Send connection confirmation
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=codec.dumps({
             'type': 'connection_established',
             'message': 'WebSocket connection established',
             'conversation_id': str(self.conversation_id),
@@ -212,6 +352,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'requires_identification': False
         }))
 
+    @metrics.timed_handler('chat.handle_chat_message')
     async def handle_chat_message(self, message_data):
         """Handle incoming chat message from website visitor"""
         user_message = message_data.get('message', '').strip()
@@ -219,10 +360,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
         user_identifier = message_data.get('user_identifier', 'Anonymous')
         metadata = message_data.get('metadata', {})
         
-        print(f'Handling chat message for conversation: {self.conversation_id}, user_message: {user_message}, website_id: {website_id}')
-        
         if not user_message:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Empty message',
                 'code': 'EMPTY_MESSAGE'
@@ -230,13 +369,13 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
         
         try:
-            # Get conversation - use the conversation_id from the connection scope
-            conversation = await self.get_conversation(self.conversation_id)
+            # Get conversation - use the cached state for this connection
+            state = await self.get_state()
             
             # If conversation doesn't exist yet, check if we have website_id
-            if not conversation:
+            if not state:
                 if not website_id:
-                    await self.send(text_data=json.dumps({
+                    await self.send(text_data=codec.dumps({
                         'type': 'error',
                         'message': 'Please identify yourself first by sending an "identify" message with website_id',
                         'code': 'NOT_IDENTIFIED'
@@ -251,41 +390,60 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 conversation = await self.get_or_create_conversation()
                 if not conversation:
                     logger.error(f"Conversation {self.conversation_id} not found and cannot be created")
-                    await self.send(text_data=json.dumps({
+                    await self.send(text_data=codec.dumps({
                         'type': 'error',
                         'message': 'Conversation not found. Please refresh the page and try again.',
                         'code': 'CONVERSATION_NOT_FOUND'
                     }))
                     return
+                state = await self.remember_state(ConversationState(conversation))
             
-            # Save user message
-            user_msg = await self.save_message(conversation, 'user', user_message, metadata)
+            conversation = state.conversation
+            chatbot = await self.get_chatbot(state)
+            # Without an AI provider an agent has to answer; mark the conversation
+            # as requiring attention (skip the write if it already is)
+            needs_attention = not chatbot.enabled and not conversation.requires_attention
+            message_id = self.parse_message_id(message_data.get('messageId'))
             
-            # Mark conversation as requiring attention
-            await self.mark_conversation_attention(conversation, True)
+            if MessageWriteBehind.enabled():
+                if message_data.get('messageId') and not await MessageWriteBehind.claim(conversation.id, message_id):
+                    # A retried frame: the message was already published and answered
+                    logger.info(f"Ignoring duplicate message {message_id} in conversation {self.conversation_id}")
+                    return
+                # Publish now; the batch writer persists the message shortly after
+                user_msg = Message(
+                    id=message_id, conversation=conversation, role='user', content=user_message,
+                    timestamp=timezone.now()
+                )
+                MessageWriteBehind.for_loop().enqueue(user_msg, requires_attention=needs_attention)
+            else:
+                # Save user message
+                user_msg, created = await self.save_user_message(conversation, user_message, message_id)
+                if not created:
+                    # A retried frame: the message and its reply were handled the first time
+                    logger.info(f"Ignoring duplicate message {message_id} in conversation {self.conversation_id}")
+                    return
+                if needs_attention:
+                    await self.mark_conversation_attention(conversation, True)
             
             # Update conversation metadata if provided
             if metadata:
                 await self.update_conversation_metadata(conversation, metadata)
             
             # Notify dashboard about new user message
-            await self.notify_dashboard_new_message(conversation, user_msg)
-            
-            # Send automatic response to user
-            auto_response = "Thank you for your message. A support agent will respond to you shortly."
-            
-            # Save auto response
-            # assistant_msg = await self.save_message(conversation, 'assistant', auto_response, {
-            #     'is_auto': True,
-            #     'auto_response_type': 'acknowledgment'
-            # })
+            await self.notify_dashboard_new_message(state, user_msg)
             
+            if chatbot.enabled:
+                if MessageWriteBehind.enabled():
+                    # The prompt history is read from the database
+                    await MessageWriteBehind.for_loop().flush()
+                await self.stream_ai_response(state, chatbot, user_message)
             
             logger.info(f"Processed user message in conversation {self.conversation_id}")
             
         except Exception as e:
             logger.error(f"Error processing chat message: {e}")
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Sorry, I encountered an error. Please try again.',
                 'role': 'assistant',
@@ -298,38 +456,108 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
 
 
+    @metrics.timed_handler('chat.stream_ai_response')
+    async def stream_ai_response(self, state, chatbot, user_message):
+        """Stream the AI reply to the visitor as chat_chunk frames, then save it"""
+        conversation = state.conversation
+        message_id = uuid.uuid4()
+        parts = []
+        
+        try:
+            history = await database_sync_to_async(chatbot.prepare_conversation_history)(
+                conversation, user_message
+            )
+            async for delta in chatbot.stream_response(history):
+                parts.append(delta)
+                await self.send(text_data=codec.dumps({
+                    'type': 'chat_chunk',
+                    'message_id': str(message_id),
+                    'delta': delta,
+                    'index': len(parts) - 1,
+                    'conversation_id': str(self.conversation_id)
+                }))
+            content = ''.join(parts).strip()
+            is_error = not content
+        except Exception as e:
+            logger.error(f"Error generating AI response: {e}")
+            is_error = True
+        
+        if is_error:
+            # Hand the conversation over to an agent
+            content = chatbot.get_error_response()
+            if not conversation.requires_attention:
+                await self.mark_conversation_attention(conversation, True)
+        
+        assistant_msg = await self.save_message(
+            conversation, 'assistant', content,
+            id=message_id,
+            is_error=is_error,
+            ai_model_used=state.conversation.website.ai_model,
+            response_time_ms=chatbot.response_time_ms,
+            tokens_used=chatbot.tokens_used
+        )
+        
+        # The final frame carries the full text, so clients may replace what they streamed
+        frame = NotificationService.chat_message_frame(
+            assistant_msg, is_error=is_error, is_cached=chatbot.cache_hit, response_time_ms=chatbot.response_time_ms
+        )
+        await self.send(text_data=codec.dumps(frame))
+        await self.record_replay_frame(frame)
+        await self.notify_dashboard_new_message(state, assistant_msg)
+    
     async def handle_typing_indicator(self, message_data):
         """Handle typing indicator"""
         is_typing = message_data.get('isTyping', False)
-        metadata = message_data.get('metadata', {})
+        self.typing_metadata = message_data.get('metadata', {})
         
         try:
-            conversation = await self.get_conversation(self.conversation_id)
-            if not conversation:
-                return
-                
-            # Broadcast typing indicator to dashboard
-            await self.channel_layer.group_send(
-                f'dashboard_website_{conversation.website.id}',
-                {
-                    'type': 'typing_indicator',
-                    'is_typing': is_typing,
-                    'conversation_id': str(self.conversation_id),
-                    'user_type': 'visitor',
-                    'metadata': metadata
-                }
-            )
+            # Only start/stop transitions reach the dashboard
+            await self.typing.update(str(self.conversation_id), bool(is_typing))
         except Exception as e:
             logger.error(f"Error handling typing indicator: {e}")
     
+    async def publish_typing(self, conversation_id, is_typing):
+        """Broadcast a visitor typing transition to the website's dashboards"""
+        state = await self.get_state()
+        if not state:
+            return
+        await NotificationService.apublish(
+            *NotificationService.typing_event(state, conversation_id, is_typing, self.typing_metadata)
+        )
+    
     async def handle_ping(self, message_data):
         """Handle ping for connection keep-alive"""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=codec.dumps({
             'type': 'pong',
             'timestamp': message_data.get('timestamp'),
             'conversation_id': str(self.conversation_id)
         }))
     
+    async def handle_resume(self, message_data):
+        """Replay the replies a reconnecting visitor missed since its last seen message
+        
+        Replies published between the reconnect and this frame may arrive
+        both live and replayed; clients skip message ids they already have.
+        """
+        last_seq = message_data.get('lastSeq')
+        if isinstance(last_seq, int) and not isinstance(last_seq, bool) and last_seq >= 0:
+            frames, source, complete = await self.get_missed_frames(last_seq=last_seq)
+        else:
+            try:
+                last_message_id = str(uuid.UUID(str(message_data.get('lastMessageId'))))
+            except ValueError:
+                frames, source, complete = [], None, False
+            else:
+                frames, source, complete = await self.get_missed_frames(last_message_id=last_message_id)
+        
+        await self.send(text_data=codec.dumps({
+            'type': 'resumed',
+            'conversation_id': str(self.conversation_id),
+            'messages': frames,
+            'source': source,
+            'complete': complete
+        }))
+    
     async def handle_init_conversation(self, message_data):
         """Handle conversation initialization with additional data"""
         website_id = message_data.get('website_id', self.website_id)
@@ -337,7 +565,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         metadata = message_data.get('metadata', {})
         
         if not website_id:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'website_id is required',
                 'code': 'MISSING_WEBSITE_ID'
@@ -348,7 +576,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             # Validate UUID format for website_id
             uuid.UUID(str(website_id))
         except ValueError:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Invalid website_id format',
                 'code': 'INVALID_WEBSITE_ID'
@@ -360,11 +588,13 @@ class ChatConsumer(AsyncWebsocketConsumer):
         
         conversation = await self.get_or_create_conversation()
         if conversation:
+            await self.remember_state(ConversationState(conversation))
+            
             # Update conversation with additional metadata
             await self.update_conversation_metadata(conversation, metadata)
             await self.update_user_identifier(conversation, user_identifier)
             
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'conversation_initialized',
                 'conversation_id': str(self.conversation_id),
                 'website_id': str(website_id),
@@ -372,7 +602,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'status': 'success'
             }))
         else:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Failed to initialize conversation',
                 'code': 'INIT_ERROR'
@@ -380,24 +610,26 @@ class ChatConsumer(AsyncWebsocketConsumer):
     
     async def chat_message_from_dashboard(self, event):
         """Handle chat message sent from dashboard (agent response)"""
-        message = event['message']
-        message_id = event.get('message_id')
         role = event['role']
         conversation_id = event['conversation_id']
-        timestamp = event.get('timestamp')
-        is_manual = event.get('is_manual', True)
         
         # Only send to the specific conversation
         if conversation_id == str(self.conversation_id):
-            await self.send(text_data=json.dumps({
-                'type': 'chat_message',
-                'message': message,
-                'message_id': message_id,
-                'role': role,
-                'conversation_id': conversation_id,
-                'timestamp': timestamp or timezone.now().isoformat(),
-                'is_manual': is_manual
-            }))
+            if self.state:
+                # The dashboard cleared the attention flag and added a reply when saving this message
+                conversation = self.state.conversation
+                conversation.requires_attention = False
+                conversation.total_messages += 1
+                if role == 'assistant':
+                    conversation.bot_messages += 1
+            
+            # Forward the frame as built for the visitor, seq included, so
+            # resume has a position in agent-only conversations too
+            frame = {key: value for key, value in event.items() if key != 'agent_id'}
+            frame['type'] = 'chat_message'
+            frame.setdefault('timestamp', timezone.now().isoformat())
+            frame.setdefault('is_manual', True)
+            await self.send(text_data=codec.dumps(frame))
     
     async def typing_from_dashboard(self, event):
         """Handle typing indicator from dashboard"""
@@ -407,15 +639,59 @@ class ChatConsumer(AsyncWebsocketConsumer):
         
         # Only send to the specific conversation
         if conversation_id == str(self.conversation_id):
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'typing_indicator',
                 'is_typing': is_typing,
                 'conversation_id': conversation_id,
                 'user_type': user_type
             }))
+    
+    async def conversation_updated(self, event):
+        """Drop the cached conversation state so the next frame reloads it"""
+        self.state = None
+        self.chatbot = None
+    
+    async def website_updated(self, event):
+        """The website was edited or deleted: reload its settings and AI engine on the next frame"""
+        self.state = None
+        self.chatbot = None
+    
+    async def conversation_ended(self, event):
+        """Tell the visitor an agent ended the conversation"""
+        self.state = None
+        await self.send(text_data=event['frame'])
+    
+    @staticmethod
+    def parse_message_id(value):
+        """The client's id for a message if it is a valid UUID, else a fresh one"""
+        try:
+            return uuid.UUID(str(value))
+        except ValueError:
+            return uuid.uuid4()
+    
+    async def get_state(self):
+        """Return the cached conversation state, loading it on first use"""
+        if self.state is None:
+            await self.remember_state(await self.load_conversation_state(self.conversation_id))
+        return self.state
+    
+    async def remember_state(self, state):
+        """Cache the conversation state and follow changes to its website"""
+        self.state = state
+        if state is not None and self.website_group_name is None:
+            self.website_group_name = NotificationService.chat_website_group(state.website_id)
+            await self.channel_layer.group_add(self.website_group_name, self.channel_name)
+        return state
+    
+    async def get_chatbot(self, state):
+        """Return the response engine for this connection's website, resolving its provider once"""
+        if self.chatbot is None or self.chatbot.website.id != state.conversation.website_id:
+            self.chatbot = await database_sync_to_async(ChatbotService)(state.conversation.website)
+        return self.chatbot
 
     
     @database_sync_to_async
+    @metrics.timed_db('chat.get_or_create_conversation')
     def get_or_create_conversation(self):
         """Get or create conversation from database"""
 
@@ -423,10 +699,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         try:
             # First try to get existing conversation
             try:
-                conversation = Conversation.objects.get(id=self.conversation_id)
-                print(f"Found existing conversation: {self.conversation_id}")
-
-
+                conversation = Conversation.objects.select_related('website').get(id=self.conversation_id)
                 logger.info(f"Found existing conversation: {self.conversation_id}")
                 return conversation
             except Conversation.DoesNotExist:
@@ -455,12 +728,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return None
     
     @database_sync_to_async
-    def get_conversation(self, conversation_id):
-        """Get conversation by ID"""
+    @metrics.timed_db('chat.load_conversation_state')
+    def load_conversation_state(self, conversation_id):
+        """Load conversation and website details in a single query"""
         try:
-            return Conversation.objects.get(id=conversation_id)
+            conversation = Conversation.objects.select_related('website').get(id=conversation_id)
         except Conversation.DoesNotExist:
             return None
+        return ConversationState(conversation)
     
     # @database_sync_to_async
     # def save_message(self, conversation, role, content, metadata=None):
@@ -479,19 +754,18 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
 
     @database_sync_to_async
-    def save_message(self, conversation, role, content, metadata=None):
-        """Save message to database"""
+    @metrics.timed_db('chat.save_message')
+    def save_message(self, conversation, role, content, metadata=None, **fields):
+        """Save message to database; extra fields (AI metadata etc.) are passed to the model"""
         try:
             message = Message.objects.create(
                 conversation=conversation,
                 role=role,
                 content=content,
                 # metadata=metadata or {}
+                **fields
             )
-            # Update conversation total messages
-            conversation.total_messages = conversation.messages.count()
-            conversation.last_message_at = timezone.now()
-            conversation.save()
+            # Conversation counters are bumped atomically by Message.save()
             
             logger.info(f"Successfully saved message {message.id} for conversation {conversation.id}")
             return message
@@ -502,75 +776,77 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
 
     @database_sync_to_async
+    @metrics.timed_db('chat.save_message')
+    def save_user_message(self, conversation, content, message_id):
+        """Save a visitor message under its client-supplied id; returns (message, created)
+        
+        A retry of a message already saved in this conversation returns the
+        stored row. An id that belongs to another conversation's message is
+        replaced with a fresh one.
+        """
+        try:
+            return Message.objects.create(id=message_id, conversation=conversation, role='user', content=content), True
+        except IntegrityError:
+            stored = Message.objects.filter(id=message_id).first()
+            if stored is None:
+                raise
+            if stored.conversation_id == conversation.id:
+                return stored, False
+            logger.warning(f"Message id {message_id} is taken; saving the message under a new id")
+            return Message.objects.create(conversation=conversation, role='user', content=content), True
+    
+    @database_sync_to_async
+    @metrics.timed_db('chat.mark_conversation_attention')
     def mark_conversation_attention(self, conversation, requires_attention):
         """Mark conversation as requiring attention"""
         conversation.requires_attention = requires_attention
-        if requires_attention:
-            conversation.last_attention_required_at = timezone.now()
-        conversation.save()
+        conversation.save(update_fields=['requires_attention'])
     
     @database_sync_to_async
+    @metrics.timed_db('chat.update_conversation_metadata')
     def update_conversation_metadata(self, conversation, metadata):
         """Update conversation metadata"""
         if not conversation.metadata:
             conversation.metadata = {}
         
         conversation.metadata.update(metadata)
-        conversation.save()
+        conversation.save(update_fields=['metadata'])
     
     @database_sync_to_async
+    @metrics.timed_db('chat.update_user_identifier')
     def update_user_identifier(self, conversation, user_identifier):
         """Update user identifier"""
         if user_identifier and user_identifier != 'Anonymous':
             conversation.user_identifier = user_identifier
-            conversation.save()
+            # Never a full save: this connection's instance has stale counters
+            conversation.save(update_fields=['user_identifier'])
     
-    async def notify_dashboard_new_message(self, conversation, message):
+    async def notify_dashboard_new_message(self, state, message):
         """Notify dashboard about new message"""
+        conversation = state.conversation
         try:
-            # Send to all dashboard users for this website
-            await self.channel_layer.group_send(
-                f'dashboard_website_{conversation.website.id}',
-                {
-                    'type': 'new_message',
-                    'message': {
-                        'id': str(message.id),
-                        'content': message.content,
-                        'role': message.role,
-                        'conversation_id': str(conversation.id),
-                        'timestamp': message.timestamp.isoformat(),
-                        # 'metadata': message.metadata or {}
-                    },
-                    'conversation_id': str(conversation.id),
-                    'website_id': str(conversation.website.id)
-                }
-            )
+            # The connection state doubles as the notification route
+            await NotificationService.anotify_new_message(state, message)
             
             # Also send new conversation notification if this is the first message
             if conversation.total_messages == 1:
-                await self.channel_layer.group_send(
-                    f'dashboard_website_{conversation.website.id}',
-                    {
-                        'type': 'new_conversation',
-                        'conversation': {
-                            'id': str(conversation.id),
-                            'website_name': conversation.website.name,
-                            'website_id': str(conversation.website.id),
-                            'user_identifier': conversation.user_identifier,
-                            'started_at': conversation.started_at.isoformat(),
-                            'total_messages': conversation.total_messages,
-                            'requires_attention': conversation.requires_attention,
-                            # 'metadata': conversation.metadata or {}
-                        },
-                        'website_id': str(conversation.website.id)
-                    }
-                )
+                await NotificationService.anotify_new_conversation(state, conversation)
             
             logger.info(f"Notified dashboard about new message in conversation {conversation.id}")
         except Exception as e:
             logger.error(f"Error notifying dashboard: {e}")
 
     @database_sync_to_async
+    @metrics.timed_db('chat.get_missed_frames')
+    def get_missed_frames(self, last_seq=None, last_message_id=None):
+        return ReplayBuffer.resume(self.conversation_id, last_seq, last_message_id)
+    
+    @sync_to_async
+    def record_replay_frame(self, frame):
+        ReplayBuffer.record(self.conversation_id, frame)
+    
+    @database_sync_to_async
+    @metrics.timed_db('chat.validate_conversation_exists')
     def validate_conversation_exists(self, conversation_id):
         """Check if conversation exists in database"""
         try:
@@ -582,14 +858,21 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
 
 
-class DashboardConsumer(AsyncWebsocketConsumer):
+class DashboardConsumer(SocketMetricsMixin, AsyncWebsocketConsumer):
     """WebSocket consumer for dashboard real-time updates"""
     
+    metrics_label = 'dashboard'
+    FRAME_TYPES = (
+        'subscribe_websites', 'unsubscribe_websites', 'send_message', 'typing', 'ping', 'get_conversation_status'
+    )
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.user_id = None
         self.room_group_name = None
         self.subscribed_websites = set()
+        self.access = DashboardAccessCache()
+        self.typing = TypingCoalescer(self.publish_typing)
     
     async def connect(self):
         """Handle dashboard WebSocket connection"""
@@ -618,7 +901,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             logger.info(f"Dashboard WebSocket connected for user {user.id}")
             
             # Send connection confirmation
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'connection_established',
                 'message': 'Dashboard WebSocket connection established',
                 'user_id': user.id,
@@ -632,6 +915,8 @@ class DashboardConsumer(AsyncWebsocketConsumer):
     async def disconnect(self, close_code):
         """Handle dashboard WebSocket disconnection"""
         try:
+            await self.typing.close()
+            
             # Leave all website groups
             for website_id in self.subscribed_websites:
                 website_group = f'dashboard_website_{website_id}'
@@ -654,39 +939,43 @@ class DashboardConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         """Handle messages from dashboard WebSocket"""
         try:
-            text_data_json = json.loads(text_data)
+            text_data_json = codec.loads(text_data)
             message_type = text_data_json.get('type')
+            frame_logger.debug('Frame received', extra={
+                'consumer': 'dashboard', 'frame_type': message_type, 'user_id': self.user_id
+            })
             
-            if message_type == 'subscribe_websites':
-                await self.handle_subscribe_websites(text_data_json)
-            elif message_type == 'unsubscribe_websites':
-                await self.handle_unsubscribe_websites(text_data_json)
-            elif message_type == 'send_message':
-                await self.handle_send_message(text_data_json)
-            elif message_type == 'typing':
-                await self.handle_dashboard_typing(text_data_json)
-            elif message_type == 'ping':
-                await self.handle_ping(text_data_json)
-            elif message_type == 'get_conversation_status':
-                await self.handle_get_conversation_status(text_data_json)
-            else:
-                logger.warning(f"Unknown message type: {message_type}")
-                await self.send(text_data=json.dumps({
-                    'type': 'error',
-                    'message': f'Unknown message type: {message_type}',
-                    'code': 'UNKNOWN_MESSAGE_TYPE'
-                }))
+            with metrics.track_frame('dashboard', message_type if message_type in self.FRAME_TYPES else 'unknown'):
+                if message_type == 'subscribe_websites':
+                    await self.handle_subscribe_websites(text_data_json)
+                elif message_type == 'unsubscribe_websites':
+                    await self.handle_unsubscribe_websites(text_data_json)
+                elif message_type == 'send_message':
+                    await self.handle_send_message(text_data_json)
+                elif message_type == 'typing':
+                    await self.handle_dashboard_typing(text_data_json)
+                elif message_type == 'ping':
+                    await self.handle_ping(text_data_json)
+                elif message_type == 'get_conversation_status':
+                    await self.handle_get_conversation_status(text_data_json)
+                else:
+                    logger.warning(f"Unknown message type: {message_type}")
+                    await self.send(text_data=codec.dumps({
+                        'type': 'error',
+                        'message': f'Unknown message type: {message_type}',
+                        'code': 'UNKNOWN_MESSAGE_TYPE'
+                    }))
                 
-        except json.JSONDecodeError:
+        except codec.DecodeError:
             logger.error("Invalid JSON received in dashboard")
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Invalid message format',
                 'code': 'INVALID_JSON'
             }))
         except Exception as e:
             logger.error(f"Error handling dashboard WebSocket message: {e}")
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Internal server error',
                 'code': 'INTERNAL_ERROR'
@@ -706,8 +995,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             website_group = f'dashboard_website_{website_id}'
             
             # Check if user has access to this website
-            has_access = await self.check_website_access(website_id)
-            if not has_access:
+            if str(website_id) not in self.access.websites:
                 logger.warning(f"User {self.user_id} attempted to subscribe to unauthorized website {website_id}")
                 continue
             
@@ -720,7 +1008,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             self.subscribed_websites.add(website_id)
             logger.info(f"User {self.user_id} subscribed to website {website_id}")
         
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=codec.dumps({
             'type': 'subscription_update',
             'subscribed_websites': list(self.subscribed_websites),
             'status': 'success'
@@ -742,12 +1030,13 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             self.subscribed_websites.discard(website_id)
             logger.info(f"User {self.user_id} unsubscribed from website {website_id}")
         
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=codec.dumps({
             'type': 'subscription_update',
             'subscribed_websites': list(self.subscribed_websites),
             'status': 'success'
         }))
     
+    @metrics.timed_handler('dashboard.handle_send_message')
     async def handle_send_message(self, message_data):
         """Handle sending message from dashboard to chatbot"""
         conversation_id = message_data.get('conversation_id')
@@ -755,7 +1044,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         metadata = message_data.get('metadata', {})
         
         if not conversation_id:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Missing conversation_id',
                 'code': 'MISSING_CONVERSATION_ID'
@@ -763,7 +1052,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             return
         
         if not message_content:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Empty message',
                 'code': 'EMPTY_MESSAGE'
@@ -772,9 +1061,9 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         
         try:
             # Validate conversation access
-            has_access = await self.check_conversation_access(conversation_id)
-            if not has_access:
-                await self.send(text_data=json.dumps({
+            website_id = await self.get_accessible_website(conversation_id)
+            if website_id is None:
+                await self.send(text_data=codec.dumps({
                     'type': 'error',
                     'message': 'Access denied to conversation',
                     'code': 'ACCESS_DENIED'
@@ -782,46 +1071,18 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                 return
             
             # Save message to database
-            message = await self.save_dashboard_message(conversation_id, message_content, metadata)
+            message = await self.save_dashboard_message(conversation_id, website_id, message_content, metadata)
             
-            # Send message to the specific chatbot conversation
-            await self.channel_layer.group_send(
-                f'chat_{conversation_id}',
-                {
-                    'type': 'chat_message_from_dashboard',
-                    'message': message_content,
-                    'message_id': str(message.id),
-                    'role': 'assistant',
-                    'conversation_id': conversation_id,
-                    'timestamp': message.timestamp.isoformat(),
-                    'is_manual': True,
-                    'agent_id': self.user_id
-                }
-            )
+            # Send message to the specific chatbot conversation (and its replay buffer)
+            await NotificationService.anotify_agent_reply(message, agent_id=self.user_id)
             
             # Also notify all dashboard users for this website
-            website_id = await self.get_website_id_from_conversation(conversation_id)
-            if website_id:
-                await self.channel_layer.group_send(
-                    f'dashboard_website_{website_id}',
-                    {
-                        'type': 'new_message',
-                        'message': {
-                            'id': str(message.id),
-                            'content': message_content,
-                            'role': 'assistant',
-                            'conversation_id': conversation_id,
-                            'timestamp': message.timestamp.isoformat(),
-                            'is_manual': True,
-                            'agent_id': self.user_id,
-                            # 'metadata': metadata
-                        },
-                        'conversation_id': conversation_id,
-                        'website_id': str(website_id)
-                    }
-                )
+            await NotificationService.anotify_new_message(
+                NotificationRoute(website_id, self.access.websites[website_id], self.user_id), message,
+                agent_id=self.user_id
+            )
             
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'message_sent',
                 'conversation_id': conversation_id,
                 'message_id': str(message.id),
@@ -830,7 +1091,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             
         except Exception as e:
             logger.error(f"Error sending message from dashboard: {e}")
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Failed to send message',
                 'code': 'SEND_MESSAGE_ERROR'
@@ -846,37 +1107,42 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         
         try:
             # Validate conversation access
-            has_access = await self.check_conversation_access(conversation_id)
+            has_access = await self.has_conversation_access(conversation_id)
             if not has_access:
                 return
             
-            # Send typing indicator to the specific chatbot conversation
-            await self.channel_layer.group_send(
-                f'chat_{conversation_id}',
-                {
-                    'type': 'typing_from_dashboard',
-                    'is_typing': is_typing,
-                    'conversation_id': conversation_id,
-                    'agent_id': self.user_id
-                }
-            )
+            # Only start/stop transitions reach the visitor
+            await self.typing.update(conversation_id, bool(is_typing))
         except Exception as e:
             logger.error(f"Error handling dashboard typing: {e}")
     
+    async def publish_typing(self, conversation_id, is_typing):
+        """Send an agent typing transition to the specific chatbot conversation"""
+        await NotificationService.apublish(
+            NotificationService.chat_group(conversation_id),
+            {
+                'type': 'typing_from_dashboard',
+                'is_typing': is_typing,
+                'conversation_id': conversation_id,
+                'agent_id': self.user_id
+            }
+        )
+    
     async def handle_ping(self, message_data):
         """Handle ping for connection keep-alive"""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=codec.dumps({
             'type': 'pong',
             'timestamp': message_data.get('timestamp'),
             'user_id': self.user_id
         }))
     
+    @metrics.timed_handler('dashboard.handle_get_conversation_status')
     async def handle_get_conversation_status(self, message_data):
         """Handle request for conversation status"""
         conversation_id = message_data.get('conversation_id')
         
         if not conversation_id:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Missing conversation_id',
                 'code': 'MISSING_CONVERSATION_ID'
@@ -885,9 +1151,9 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         
         try:
             # Validate conversation access
-            has_access = await self.check_conversation_access(conversation_id)
+            has_access = await self.has_conversation_access(conversation_id)
             if not has_access:
-                await self.send(text_data=json.dumps({
+                await self.send(text_data=codec.dumps({
                     'type': 'error',
                     'message': 'Access denied to conversation',
                     'code': 'ACCESS_DENIED'
@@ -896,7 +1162,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             
             conversation_status = await self.get_conversation_status(conversation_id)
             
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'conversation_status',
                 'conversation_id': conversation_id,
                 'status': conversation_status,
@@ -905,149 +1171,122 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             
         except Exception as e:
             logger.error(f"Error getting conversation status: {e}")
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps({
                 'type': 'error',
                 'message': 'Failed to get conversation status',
                 'code': 'STATUS_ERROR'
             }))
     
     # Handler methods for different types of group messages
+    # (NotificationService events carry their frame pre-encoded)
     async def new_conversation(self, event):
         """Handle new conversation notification"""
-        # Ensure UUID objects are converted to strings for JSON serialization
-        conversation_data = event['conversation'].copy()
-        conversation_data['id'] = str(conversation_data['id'])
-        conversation_data['website_id'] = str(conversation_data['website_id'])
-        
-        await self.send(text_data=json.dumps({
-            'type': 'new_conversation',
-            'conversation': conversation_data,
-            'website_id': str(event['website_id']),
-            'timestamp': timezone.now().isoformat()
-        }))
+        await self.send(text_data=event['frame'])
     
     async def new_message(self, event):
         """Handle new message notification (from chatbot or other agents)"""
-        # Ensure UUID objects are converted to strings for JSON serialization
-        message_data = event['message'].copy()
-        message_data['id'] = str(message_data['id'])
-        message_data['conversation_id'] = str(message_data['conversation_id'])
-        
-        await self.send(text_data=json.dumps({
-            'type': 'new_message',
-            'message': message_data,
-            'conversation_id': str(event['conversation_id']),
-            'website_id': str(event['website_id']),
-            'timestamp': timezone.now().isoformat()
-        }))
+        await self.send(text_data=event['frame'])
 
     async def conversation_ended(self, event):
         """Handle conversation ended notification"""
-        await self.send(text_data=json.dumps({
-            'type': 'conversation_ended',
-            'conversation_id': str(event['conversation_id']),
-            'website_id': str(event['website_id']),
-            'timestamp': timezone.now().isoformat(),
-            'reason': event.get('reason', 'user_ended')
-        }))
+        await self.send(text_data=event['frame'])
 
     async def typing_indicator(self, event):
         """Handle typing indicator from chatbot"""
-        await self.send(text_data=json.dumps({
-            'type': 'typing_indicator',
-            'is_typing': event['is_typing'],
-            'conversation_id': str(event['conversation_id']),
-            'user_type': event['user_type'],
-            'timestamp': timezone.now().isoformat(),
-            'metadata': event.get('metadata', {})
-        }))
+        await self.send(text_data=event['frame'])
 
     async def conversation_updated(self, event):
         """Handle conversation update notification"""
-        await self.send(text_data=json.dumps({
-            'type': 'conversation_updated',
-            'conversation_id': str(event['conversation_id']),
-            'updates': event['updates'],
-            'timestamp': timezone.now().isoformat()
+        await self.send(text_data=event['frame'])
+    
+    async def website_access_changed(self, event):
+        """Apply a website ownership change (create, transfer or delete) to the access cache"""
+        website_id = event['website_id']
+        if not event.get('deleted') and event['owner_id'] == self.user_id:
+            self.access.grant(website_id, event['website_name'])
+            if website_id in self.subscribed_websites:
+                return
+            await self.channel_layer.group_add(f'dashboard_website_{website_id}', self.channel_name)
+            self.subscribed_websites.add(website_id)
+        else:
+            self.access.revoke(website_id, deleted=event.get('deleted', False))
+            if website_id not in self.subscribed_websites:
+                return
+            await self.channel_layer.group_discard(f'dashboard_website_{website_id}', self.channel_name)
+            self.subscribed_websites.discard(website_id)
+        
+        await self.send(text_data=codec.dumps({
+            'type': 'subscription_update',
+            'subscribed_websites': list(self.subscribed_websites),
+            'status': 'success'
         }))
     
     # Database operations
     @database_sync_to_async
+    @metrics.timed_db('dashboard.get_user_websites')
     def get_user_websites(self):
-        """Get all website IDs that belong to the user"""
+        """Get the ids and names of all websites that belong to the user"""
         try:
             user = self.scope.get('user')
             if not user or user.is_anonymous:
-                return []
+                return {}
             
             # Get websites where user is owner or has access
-            websites = Website.objects.filter(owner=user).values_list('id', flat=True)
-            return [str(website_id) for website_id in websites]
+            websites = Website.objects.filter(owner=user).values_list('id', 'name')
+            return {str(website_id): name for website_id, name in websites}
         except Exception as e:
             logger.error(f"Error getting user websites: {e}")
-            return []
+            return {}
     
-    @database_sync_to_async
-    def check_website_access(self, website_id):
-        """Check if user has access to a specific website"""
-        try:
-            user = self.scope.get('user')
-            if not user or user.is_anonymous:
-                return False
-            
-            return Website.objects.filter(id=website_id, owner=user).exists()
-        except Exception as e:
-            logger.error(f"Error checking website access: {e}")
-            return False
+    async def get_accessible_website(self, conversation_id):
+        """Website id of a conversation the user may access, or None
+        
+        The conversation's website is looked up once and kept in the
+        connection's access cache; ownership is checked against the cached
+        website set, so repeat frames run no queries.
+        """
+        conversation_id = str(conversation_id)
+        website_id = self.access.website_for(conversation_id)
+        if website_id is DashboardAccessCache.MISSING:
+            website_id = await self.get_conversation_website(conversation_id)
+            self.access.remember(conversation_id, website_id)
+        return website_id if website_id in self.access.websites else None
     
-    @database_sync_to_async
-    def check_conversation_access(self, conversation_id):
+    async def has_conversation_access(self, conversation_id):
         """Check if user has access to a specific conversation"""
-        try:
-            user = self.scope.get('user')
-            if not user or user.is_anonymous:
-                return False
-            
-            return Conversation.objects.filter(
-                id=conversation_id, 
-                website__owner=user
-            ).exists()
-        except Exception as e:
-            logger.error(f"Error checking conversation access: {e}")
-            return False
+        return await self.get_accessible_website(conversation_id) is not None
     
     @database_sync_to_async
-    def save_dashboard_message(self, conversation_id, content, metadata=None):
-        """Save message from dashboard to database"""
+    @metrics.timed_db('dashboard.get_conversation_website')
+    def get_conversation_website(self, conversation_id):
+        """Website id of a conversation, or None if it does not exist"""
         try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            message = Message.objects.create(
-                conversation=conversation,
-                role='assistant',
-                content=content,
-                # is_manual_response=True,
-                # metadata=metadata or {}
-            )
-            # Update conversation total messages and mark as not requiring attention
-            conversation.total_messages = conversation.messages.count()
-            conversation.last_message_at = timezone.now()
-            conversation.requires_attention = False
-            conversation.save()
-            return message
-        except Conversation.DoesNotExist:
-            logger.error(f"Conversation {conversation_id} not found")
-            raise Exception("Conversation not found")
+            website_id = Conversation.objects.filter(id=conversation_id).values_list('website_id', flat=True).first()
+            return str(website_id) if website_id else None
+        except (ValidationError, ValueError) as e:
+            logger.error(f"Error looking up conversation {conversation_id}: {e}")
+            return None
     
     @database_sync_to_async
-    def get_website_id_from_conversation(self, conversation_id):
-        """Get website ID from conversation"""
-        try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            return str(conversation.website.id)
-        except Conversation.DoesNotExist:
-            return None
+    @metrics.timed_db('dashboard.save_dashboard_message')
+    def save_dashboard_message(self, conversation_id, website_id, content, metadata=None):
+        """Save message from dashboard to database"""
+        # Access was already resolved, so the conversation row is not re-read;
+        # this instance only carries the key for the insert and counter update
+        conversation = Conversation(id=conversation_id, website_id=website_id)
+        message = Message.objects.create(
+            conversation=conversation,
+            role='assistant',
+            content=content,
+            is_manual=True,
+            # metadata=metadata or {}
+        )
+        # Counters are bumped by Message.save(); only clear the attention flag here
+        Conversation.objects.filter(id=conversation_id).update(requires_attention=False)
+        return message
     
     @database_sync_to_async
+    @metrics.timed_db('dashboard.get_conversation_status')
     def get_conversation_status(self, conversation_id):
         """Get conversation status"""
         try:
@@ -1067,6 +1306,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         """Auto-subscribe to all user's websites"""
         try:
             user_websites = await self.get_user_websites()
+            self.access.websites = user_websites
             for website_id in user_websites:
                 website_group = f'dashboard_website_{website_id}'
                 
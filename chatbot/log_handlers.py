@@ -0,0 +1,78 @@
+"""Logging building blocks for the hot paths (wired up in settings.LOGGING)
+
+- BackgroundFileHandler formats records in the calling thread and hands them
+  to a bounded queue; a listener thread does the file I/O. When the queue is
+  full, records are dropped and counted instead of blocking a request or
+  socket handler.
+- SampleFilter passes one in every `rate` records below WARNING, for
+  high-volume loggers such as chatbot.frames.
+- JSONFormatter writes one JSON object per line, including any `extra` fields.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+from .metrics import LOG_RECORDS_DROPPED
+
+
+# Attributes every LogRecord has; anything else came from `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Keep about `rate` of the records below WARNING (WARNING and above always pass)"""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+
+class BackgroundFileHandler(QueueHandler):
+    """FileHandler whose writes happen on a listener thread behind a bounded queue"""
+
+    def __init__(self, filename, maxsize=10000, encoding='utf-8'):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        target = logging.FileHandler(filename, encoding=encoding, delay=True)
+        # Records arrive already formatted by this handler
+        target.setFormatter(logging.Formatter('%(message)s'))
+        self.listener = QueueListener(self.queue, target)
+        self.listener.start()
+        self.running = True
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Write out queued records and stop the listener thread"""
+        if self.running:
+            self.running = False
+            self.listener.stop()
+
+    def close(self):
+        self.stop()
+        super().close()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
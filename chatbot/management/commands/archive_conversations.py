@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chatbot.services import ConversationArchiveService
+
+
+class Command(BaseCommand):
+    """Move the messages of old, ended conversations to the compressed transcript archive
+
+    Conversations qualify once they ended more than their website's
+    archive_after_days (default CHAT_ARCHIVE_AFTER_DAYS) ago. Each batch
+    commits on its own, so the command can be stopped and rerun at any time;
+    it carries on with whatever is still unarchived.
+    """
+
+    help = 'Archive ended conversations past their retention period to compressed JSONL files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--website', help='Only archive conversations of this website id')
+        parser.add_argument('--older-than-days', type=int, help='Override every retention period')
+        parser.add_argument(
+            '--batch-size', type=int, default=getattr(settings, 'CHAT_ARCHIVE_BATCH_SIZE', 200),
+            help='Conversations per archive file'
+        )
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+        parser.add_argument('--dry-run', action='store_true', help='Count due conversations without archiving')
+
+    def handle(self, *args, **options):
+        stats = ConversationArchiveService.run(
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            website_id=options['website'],
+            days=options['older_than_days'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f"{stats['conversations']} conversations are due for archiving")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Archived {stats['conversations']} conversations ({stats['messages']} messages) "
+                f"in {stats['files']} files"
+            ))
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import math
+import time
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from chatbot import codec
+from chatbot.consumers import ChatConsumer, DashboardConsumer
+from chatbot.models import Conversation, Website
+from chatbot.services import DashboardStatsService
+
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    """Simulate concurrent visitors and dashboard agents against the chat consumers in-process
+
+    Visitors send typing frames, chat messages and pings; agents send
+    typing frames, replies (send_message) and pings. Each operation is timed
+    until the consumer has handled it: the ping/pong that follows typing and
+    chat frames, the message_sent ack for agent replies, or the final AI
+    message with --ai. The consumers run through WebsocketCommunicator with
+    an in-memory channel layer against the configured database (SQLite or
+    PostgreSQL); the fixtures are deleted afterwards.
+    """
+
+    help = 'Load-test the WebSocket chat paths and report latency percentiles, throughput and queries per message'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--visitors', type=int, default=20, help='Concurrent visitor sockets')
+        parser.add_argument('--agents', type=int, default=2, help='Concurrent dashboard agent sockets')
+        parser.add_argument('--messages', type=int, default=10, help='Chat messages per visitor and replies per agent')
+        parser.add_argument('--ai', action='store_true', help='Answer visitors with the stub AI provider')
+        parser.add_argument('--write-behind', action='store_true', help='Enable CHAT_WRITE_BEHIND for visitor messages')
+        parser.add_argument('--timeout', type=float, default=10.0, help='Seconds to wait for any single response')
+        parser.add_argument('--json', action='store_true', help='Print only the JSON report')
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        self.timeout = options['timeout']
+        overrides = {
+            'CHANNEL_LAYERS': IN_MEMORY_CHANNEL_LAYERS,
+            'CHATBOT_DEFAULT_PROVIDER': 'stub' if options['ai'] else None,
+            'CHATBOT_STUB_DELAY': 0,
+            'CHAT_WRITE_BEHIND': options['write_behind'],
+        }
+        owner = User.objects.create_user(username=f'benchmark-{time.time_ns()}')
+        try:
+            with override_settings(**overrides):
+                report = self.run(owner, options)
+        finally:
+            owner.delete()
+            DashboardStatsService.invalidate(owner.id)
+
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(text + '\n')
+        if options['json']:
+            self.stdout.write(text)
+        else:
+            self.print_summary(report)
+
+    def run(self, owner, options):
+        website = Website.objects.create(name='Benchmark', url='https://benchmark.example.com', owner=owner)
+        conversations = [
+            Conversation.objects.create(website=website, user_identifier=f'visitor-{index}')
+            for index in range(options['visitors'])
+        ]
+        self.latencies = defaultdict(list)
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            async_to_sync(self.simulate)(owner, conversations, options)
+            elapsed = time.perf_counter() - started
+
+        visitor_messages = options['visitors'] * options['messages']
+        agent_messages = options['agents'] * options['messages'] if conversations else 0
+        messages = visitor_messages + agent_messages
+        operations = {}
+        for name, samples in sorted(self.latencies.items()):
+            samples.sort()
+            operations[name] = {
+                'count': len(samples),
+                'p50_ms': round(percentile(samples, 0.50) * 1000, 3),
+                'p95_ms': round(percentile(samples, 0.95) * 1000, 3),
+                'p99_ms': round(percentile(samples, 0.99) * 1000, 3),
+                'max_ms': round(samples[-1] * 1000, 3),
+            }
+        return {
+            'config': {
+                'visitors': options['visitors'],
+                'agents': options['agents'],
+                'messages': options['messages'],
+                'ai': options['ai'],
+                'write_behind': options['write_behind'],
+                'database': connection.vendor,
+                'channel_layer': 'InMemoryChannelLayer',
+                'codec': codec.get_codec().name,
+            },
+            'wall_time_s': round(elapsed, 4),
+            'messages': messages,
+            'messages_per_sec': round(messages / elapsed, 2),
+            'operations_per_sec': round(sum(len(s) for s in self.latencies.values()) / elapsed, 2),
+            'db_queries': len(queries),
+            'db_queries_per_message': round(len(queries) / messages, 3) if messages else None,
+            'operations': operations,
+        }
+
+    async def simulate(self, owner, conversations, options):
+        visitors = [self.visitor(conversation, options) for conversation in conversations]
+        agents = [
+            self.agent(owner, conversations[index::options['agents']], options)
+            for index in range(options['agents'])
+        ] if conversations else []
+        await asyncio.gather(*visitors, *agents)
+
+    async def timed(self, name, coroutine):
+        started = time.perf_counter()
+        result = await coroutine
+        self.latencies[name].append(time.perf_counter() - started)
+        return result
+
+    async def receive(self, communicator, frame_type, **match):
+        """Wait for a frame of the given type (and field values), skipping unrelated broadcasts"""
+        while True:
+            frame = await communicator.receive_json_from(timeout=self.timeout)
+            if frame.get('type') == frame_type and all(frame.get(k) == v for k, v in match.items()):
+                return frame
+
+    async def round_trip(self, communicator, *frames):
+        """Send frames followed by a ping; the pong means the consumer has handled them all"""
+        for frame in frames:
+            await communicator.send_json_to(frame)
+        await communicator.send_json_to({'type': 'ping'})
+        await self.receive(communicator, 'pong')
+
+    async def chat(self, communicator, frame, ai):
+        if ai:
+            await communicator.send_json_to(frame)
+            # Agent replies relayed to the visitor are chat_message frames too
+            await self.receive(communicator, 'chat_message', is_manual=False)
+        else:
+            await self.round_trip(communicator, frame)
+
+    async def visitor(self, conversation, options):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), f'/ws/chat/{conversation.id}/')
+        communicator.scope['url_route'] = {'kwargs': {'conversation_id': str(conversation.id)}}
+        await self.timed('connect_visitor', self.connect(communicator, 'connection_established'))
+        try:
+            for index in range(options['messages']):
+                await self.timed('typing', self.round_trip(communicator, {'type': 'typing', 'isTyping': True}))
+                await self.timed('chat_message', self.chat(
+                    communicator, {'type': 'chat_message', 'message': f'Question {index} about shipping'}, options['ai']
+                ))
+                await self.timed('ping', self.round_trip(communicator))
+        finally:
+            await communicator.disconnect()
+
+    async def agent(self, owner, conversations, options):
+        communicator = WebsocketCommunicator(DashboardConsumer.as_asgi(), '/ws/dashboard/')
+        communicator.scope['user'] = owner
+        await self.timed('connect_agent', self.connect(communicator, 'connection_established'))
+        try:
+            for index in range(options['messages']):
+                conversation_id = str(conversations[index % len(conversations)].id)
+                await self.timed('agent_typing', self.round_trip(
+                    communicator, {'type': 'typing', 'conversation_id': conversation_id, 'is_typing': True}
+                ))
+                await communicator.send_json_to({
+                    'type': 'send_message', 'conversation_id': conversation_id, 'message': f'Reply {index}'
+                })
+                await self.timed('send_message', self.receive(communicator, 'message_sent'))
+        finally:
+            await communicator.disconnect()
+
+    async def connect(self, communicator, frame_type):
+        connected, _ = await communicator.connect(timeout=self.timeout)
+        if not connected:
+            raise RuntimeError('WebSocket connection was rejected')
+        await self.receive(communicator, frame_type)
+
+    def print_summary(self, report):
+        config = report['config']
+        self.stdout.write(
+            f"{config['visitors']} visitors, {config['agents']} agents, {config['messages']} messages each "
+            f"on {config['database']} ({config['codec']} codec)"
+        )
+        self.stdout.write(f"{'operation':>16} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for name, stats in report['operations'].items():
+            self.stdout.write(
+                f"{name:>16} {stats['count']:>7} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                f"{stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['messages_per_sec']:.1f} messages/s, {report['db_queries_per_message']} queries/message "
+            f"({report['wall_time_s']:.2f}s)"
+        ))
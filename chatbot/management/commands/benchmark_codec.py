@@ -0,0 +1,74 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from chatbot import codec
+
+
+class Command(BaseCommand):
+    """Measure outgoing frames/sec for dashboard fan-out and incoming frame decoding"""
+
+    help = 'Benchmark JSON codecs: per-socket vs once-per-event encoding of group broadcasts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=20000, help='Group events per scenario')
+        parser.add_argument('--subscribers', type=int, default=10, help='Dashboard sockets per website group')
+
+    def handle(self, *args, **options):
+        events, subscribers = options['events'], options['subscribers']
+        frame = self.sample_frame()
+        text = codec.JSONCodec.dumps(frame)
+        codecs = [codec.CODECS[name] for name in ('json', 'orjson') if name == 'json' or codec.orjson is not None]
+        if codec.orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; only the json codec is measured'))
+
+        self.stdout.write(f'{events} events x {subscribers} subscribers, {len(text)} byte frame')
+        results = {}
+
+        # Before: every subscribed socket re-encoded the event
+        results['json per socket'] = self.measure(
+            events * subscribers, lambda: [codec.JSONCodec.dumps(frame) for _ in range(subscribers)], events
+        )
+        # After: the publisher encodes once and every socket forwards the text
+        for selected in codecs:
+            results[f'{selected.name} per event'] = self.measure(
+                events * subscribers, lambda: selected.dumps(frame), events
+            )
+        for selected in codecs:
+            results[f'{selected.name} decode'] = self.measure(events, lambda: selected.loads(text), events)
+
+        for name, rate in results.items():
+            self.stdout.write(f'{name:>18}: {rate:12.0f} frames/s')
+
+        best = max(results[f'{selected.name} per event'] for selected in codecs)
+        self.stdout.write(self.style.SUCCESS(
+            f"Fan-out speedup: {best / results['json per socket']:.1f}x (active codec: {codec.get_codec().name})"
+        ))
+
+    @staticmethod
+    def measure(frames, fn, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return frames / (time.perf_counter() - started)
+
+    @staticmethod
+    def sample_frame():
+        """A new_message frame as sent to dashboards"""
+        conversation_id = str(uuid.uuid4())
+        return {
+            'type': 'new_message',
+            'message': {
+                'id': str(uuid.uuid4()),
+                'content': 'Hi! Do you ship to Canada, and how long does delivery usually take? ' * 2,
+                'role': 'user',
+                'conversation_id': conversation_id,
+                'timestamp': timezone.now().isoformat(),
+                'is_manual': False,
+            },
+            'conversation_id': conversation_id,
+            'website_id': str(uuid.uuid4()),
+            'timestamp': timezone.now().isoformat(),
+        }
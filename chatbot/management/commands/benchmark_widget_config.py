@@ -0,0 +1,64 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from chatbot.models import Website
+from chatbot.services import WebsiteConfigCache
+from chatbot.views import get_website_config
+
+
+class Command(BaseCommand):
+    """Measure widget config requests/sec with the config cache cold, hot and revalidating"""
+
+    help = 'Benchmark the widget config endpoint with a cold vs hot config cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per scenario')
+        parser.add_argument('--website', help='Benchmark an existing website instead of a throwaway one')
+
+    def handle(self, *args, **options):
+        if options['website']:
+            self.run(options['website'], options['requests'])
+            return
+
+        # Create a throwaway website and roll it back afterwards
+        with transaction.atomic():
+            owner = User.objects.create_user(username=f'benchmark-{time.time_ns()}')
+            website = Website.objects.create(name='Benchmark', url='https://benchmark.example.com', owner=owner)
+            self.run(website.id, options['requests'])
+            transaction.set_rollback(True)
+        WebsiteConfigCache.invalidate(website.id)
+
+    def run(self, website_id, count):
+        factory = RequestFactory()
+        path = f'/api/config/{website_id}/'
+
+        def cold():
+            WebsiteConfigCache.invalidate(website_id)
+            return get_website_config(factory.get(path), website_id)
+
+        def hot():
+            return get_website_config(factory.get(path), website_id)
+
+        etag = hot()['ETag']
+
+        def revalidate():
+            return get_website_config(factory.get(path, HTTP_IF_NONE_MATCH=etag), website_id)
+
+        self.stdout.write(f'Cache backend: {caches["default"].__class__.__name__}, {count} requests per scenario')
+        results = {}
+        for name, fn, expected_status in (('cold', cold, 200), ('hot', hot, 200), ('hot 304', revalidate, 304)):
+            started = time.perf_counter()
+            for _ in range(count):
+                response = fn()
+            elapsed = time.perf_counter() - started
+            if response.status_code != expected_status:
+                self.stderr.write(f'{name}: unexpected status {response.status_code}')
+            results[name] = count / elapsed
+            self.stdout.write(f'{name:>8}: {results[name]:10.0f} req/s  ({elapsed * 1000 / count:.3f} ms/request)')
+
+        self.stdout.write(self.style.SUCCESS(f"Hot cache speedup: {results['hot'] / results['cold']:.1f}x"))
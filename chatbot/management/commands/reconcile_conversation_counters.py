@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from chatbot.models import Conversation
+
+
+class Command(BaseCommand):
+    """Recompute conversation message counters that have drifted from the Message table"""
+
+    help = 'Reconcile total_messages/user_messages/bot_messages on conversations with their actual messages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--website', help='Only reconcile conversations of this website id')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Conversations checked per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing fixes')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        conversations = Conversation.objects.order_by('pk')
+        if options['website']:
+            conversations = conversations.filter(website_id=options['website'])
+
+        conversations = conversations.annotate(
+            actual_total=Count('messages'),
+            actual_user=Count('messages', filter=Q(messages__role='user')),
+            actual_bot=Count('messages', filter=Q(messages__role='assistant')),
+        ).only('id', 'total_messages', 'user_messages', 'bot_messages')
+
+        checked = 0
+        fixed = 0
+        last_pk = None
+
+        # Walk the table in primary key order so the command can be stopped and rerun safely
+        while True:
+            batch_qs = conversations
+            if last_pk is not None:
+                batch_qs = batch_qs.filter(pk__gt=last_pk)
+            batch = list(batch_qs[:batch_size])
+            if not batch:
+                break
+
+            drifted = []
+            for conversation in batch:
+                if (
+                    conversation.total_messages != conversation.actual_total
+                    or conversation.user_messages != conversation.actual_user
+                    or conversation.bot_messages != conversation.actual_bot
+                ):
+                    conversation.total_messages = conversation.actual_total
+                    conversation.user_messages = conversation.actual_user
+                    conversation.bot_messages = conversation.actual_bot
+                    drifted.append(conversation)
+
+            if drifted and not dry_run:
+                with transaction.atomic():
+                    Conversation.objects.bulk_update(
+                        drifted, ['total_messages', 'user_messages', 'bot_messages']
+                    )
+
+            checked += len(batch)
+            fixed += len(drifted)
+            last_pk = batch[-1].pk
+
+        action = 'would fix' if dry_run else 'fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} conversations, {action} {fixed} with drifted counters'
+        ))
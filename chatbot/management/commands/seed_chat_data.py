@@ -0,0 +1,232 @@
+import gzip
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from chatbot import codec
+from chatbot.models import Conversation, Message, Website
+from chatbot.services import DashboardStatsService
+
+
+QUESTIONS = (
+    'Do you ship to {place}?', 'How long does delivery to {place} take?', 'Can I return the {item}?',
+    'Is the {item} in stock?', 'What does the {item} cost?', 'My {item} arrived damaged, what now?',
+    'Do you have a discount on the {item}?', 'How do I reset my password?', 'Can I talk to a human?',
+)
+ANSWERS = (
+    'Yes, we ship to {place} within 3-5 business days.', 'The {item} can be returned within 30 days.',
+    'The {item} is in stock and ships today.', 'Sorry to hear that! I have opened a replacement for your {item}.',
+    'You can reset it from the login page with "Forgot password".', 'Let me connect you with a member of our team.',
+)
+ITEMS = ('jacket', 'laptop stand', 'coffee grinder', 'backpack', 'headphones', 'desk lamp', 'running shoes')
+PLACES = ('Canada', 'Germany', 'Japan', 'Brazil', 'Australia', 'Kenya', 'Norway')
+MODELS = ('gpt-3.5-turbo', 'gpt-4o-mini')
+
+
+@contextmanager
+def explicit_timestamps():
+    """Let bulk_create write started_at/timestamp as set on the objects instead of now()"""
+    fields = [Conversation._meta.get_field('started_at'), Message._meta.get_field('timestamp')]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    """Generate synthetic chat data, or import a JSONL message export, with batched bulk inserts
+
+    Conversation counters and message seqs are computed in memory, so each
+    batch is one INSERT per table (of up to --batch-size rows) and no
+    per-message UPDATEs. Generated websites belong to --owner. Imports read
+    the messages dataset of /api/conversations/export/ (optionally .gz); the
+    rows must be grouped by conversation, as the export writes them, and get
+    new conversation and message ids.
+    """
+
+    help = 'Bulk-generate synthetic websites/conversations/messages or import a JSONL transcript export'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--websites', type=int, default=3, help='Websites to generate')
+        parser.add_argument('--conversations', type=int, default=1000, help='Conversations per website')
+        parser.add_argument('--messages', type=float, default=8, help='Mean messages per conversation')
+        parser.add_argument(
+            '--distribution', choices=('geometric', 'uniform', 'fixed'), default='geometric',
+            help='Distribution of messages per conversation around the mean'
+        )
+        parser.add_argument('--days', type=int, default=90, help='Spread conversation starts over this many days')
+        parser.add_argument('--active-rate', type=float, default=0.02, help='Share of conversations still active')
+        parser.add_argument('--attention-rate', type=float, default=0.05, help='Share flagged for attention')
+        parser.add_argument('--manual-rate', type=float, default=0.1, help='Share of replies sent by agents')
+        parser.add_argument('--owner', default='seed', help='Username owning generated websites (created if missing)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT')
+        parser.add_argument('--seed', type=int, help='Random seed for reproducible data')
+        parser.add_argument('--import', dest='import_path', help='Import this JSONL (or .jsonl.gz) export instead')
+        parser.add_argument('--website', help='Website id for imported conversations (default: from each row)')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.random = random.Random(options['seed'])
+        self.conversation_batch, self.message_batch = [], []
+        self.totals = {'websites': 0, 'conversations': 0, 'messages': 0}
+        owners = set()
+
+        started = time.perf_counter()
+        with explicit_timestamps():
+            if options['import_path']:
+                owners = self.import_file(options['import_path'], options['website'])
+            else:
+                owner, _ = User.objects.get_or_create(username=options['owner'])
+                owners = {owner.id}
+                self.generate(owner, options)
+            self.flush()
+        elapsed = time.perf_counter() - started
+
+        for owner_id in owners:
+            DashboardStatsService.invalidate(owner_id)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {self.totals['websites']} websites, {self.totals['conversations']} conversations and "
+            f"{self.totals['messages']} messages in {elapsed:.1f}s "
+            f"({self.totals['messages'] / max(elapsed, 1e-9):.0f} messages/s)"
+        ))
+
+    # Batching
+
+    def add(self, conversation, messages):
+        """Queue a conversation with its messages, filling in seqs and counters"""
+        for seq, message in enumerate(messages, start=1):
+            message.conversation = conversation
+            message.seq = seq
+        conversation.last_message_seq = len(messages)
+        conversation.total_messages = len(messages)
+        conversation.user_messages = sum(message.role == 'user' for message in messages)
+        conversation.bot_messages = sum(message.role == 'assistant' for message in messages)
+        self.conversation_batch.append(conversation)
+        self.message_batch.extend(messages)
+        if len(self.message_batch) >= self.batch_size or len(self.conversation_batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.conversation_batch:
+            return
+        with transaction.atomic():
+            Conversation.objects.bulk_create(self.conversation_batch, batch_size=self.batch_size)
+            Message.objects.bulk_create(self.message_batch, batch_size=self.batch_size)
+        self.totals['conversations'] += len(self.conversation_batch)
+        self.totals['messages'] += len(self.message_batch)
+        self.conversation_batch, self.message_batch = [], []
+
+    # Synthetic data
+
+    def generate(self, owner, options):
+        suffix = time.time_ns()
+        # Few enough for create(), which lets connected dashboards know about them
+        websites = [
+            Website.objects.create(name=f'Seed site {index}', url=f'https://seed-{suffix}-{index}.example.com', owner=owner)
+            for index in range(options['websites'])
+        ]
+        self.totals['websites'] = len(websites)
+
+        now = timezone.now()
+        span = options['days'] * 86400
+        for website in websites:
+            for index in range(options['conversations']):
+                started_at = now - timedelta(seconds=self.random.uniform(0, span))
+                messages = self.messages(started_at, self.message_count(options), options['manual_rate'])
+                active = self.random.random() < options['active_rate']
+                self.add(Conversation(
+                    website=website,
+                    user_identifier=f'visitor-{index}',
+                    ip_address=f'10.{self.random.randrange(256)}.{self.random.randrange(256)}.{self.random.randrange(1, 255)}',
+                    started_at=started_at,
+                    ended_at=None if active else messages[-1].timestamp + timedelta(minutes=5),
+                    is_active=active,
+                    requires_attention=self.random.random() < options['attention_rate'],
+                ), messages)
+
+    def message_count(self, options):
+        mean = max(options['messages'], 1)
+        if options['distribution'] == 'fixed':
+            return round(mean)
+        if options['distribution'] == 'uniform':
+            return self.random.randint(1, max(1, round(2 * mean - 1)))
+        # Geometric-like: many short conversations, a long tail of long ones
+        return 1 + int(self.random.expovariate(1 / (mean - 1))) if mean > 1 else 1
+
+    def messages(self, started_at, count, manual_rate):
+        messages, timestamp = [], started_at
+        for index in range(count):
+            words = {'item': self.random.choice(ITEMS), 'place': self.random.choice(PLACES)}
+            timestamp += timedelta(seconds=self.random.uniform(2, 90))
+            if index % 2 == 0:
+                messages.append(Message(role='user', content=self.random.choice(QUESTIONS).format(**words), timestamp=timestamp))
+                continue
+            manual = self.random.random() < manual_rate
+            messages.append(Message(
+                role='assistant',
+                content=self.random.choice(ANSWERS).format(**words),
+                timestamp=timestamp,
+                is_manual=manual,
+                ai_model_used=None if manual else self.random.choice(MODELS),
+                response_time_ms=None if manual else self.random.randint(300, 4000),
+                tokens_used=None if manual else self.random.randint(20, 400),
+            ))
+        return messages
+
+    # Import
+
+    def import_file(self, path, website_id):
+        opener = gzip.open if path.endswith('.gz') else open
+        owners = {}
+        with opener(path, 'rt', encoding='utf-8') as handle:
+            key, header, messages = None, None, []
+            for number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = codec.loads(line)
+                    message = Message(
+                        role=row['role'], content=row['content'], timestamp=parse_datetime(row['timestamp']),
+                        is_error=row.get('is_error', False), is_welcome=row.get('is_welcome', False),
+                        is_manual=row.get('is_manual', False), ai_model_used=row.get('ai_model_used'),
+                        response_time_ms=row.get('response_time_ms'), tokens_used=row.get('tokens_used'),
+                    )
+                    row_key = row['conversation_id']
+                    target = website_id or row['website_id']
+                except (codec.DecodeError, KeyError, TypeError, ValueError) as e:
+                    raise CommandError(f'{path}:{number}: not a message export row ({e})')
+                if message.timestamp is None:
+                    raise CommandError(f'{path}:{number}: invalid timestamp')
+                if target not in owners:
+                    owner_id = Website.objects.filter(pk=target).values_list('owner_id', flat=True).first()
+                    if owner_id is None:
+                        raise CommandError(f'{path}:{number}: website {target} does not exist')
+                    owners[target] = owner_id
+
+                if row_key != key:
+                    self.add_imported(header, messages)
+                    key, header, messages = row_key, {**row, 'website_id': target}, []
+                messages.append(message)
+            self.add_imported(header, messages)
+        return set(owners.values())
+
+    def add_imported(self, header, messages):
+        if not messages:
+            return
+        self.add(Conversation(
+            website_id=header['website_id'],
+            user_identifier=header.get('user_identifier'),
+            started_at=messages[0].timestamp,
+            ended_at=messages[-1].timestamp,
+            is_active=False,
+        ), messages)
@@ -0,0 +1,223 @@
+"""In-process metrics for the chat hot paths, exposed in Prometheus text format
+
+Metrics live in the worker process that records them; scrape each ASGI/WSGI
+process (or put them behind a per-process port) to get the full picture.
+
+    FRAMES.inc(consumer='chat', type='ping')
+    with HANDLER_SECONDS.time(handler='chat.receive'):
+        ...
+
+Per-frame database query counts work through a context variable: track_frame()
+opens a counter for the frame being handled and a connection wrapper, installed
+on every new database connection, adds to it. database_sync_to_async copies
+the context into its worker thread, so queries made there are counted too.
+"""
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, _labels(self.label_names, key), value) for key, value in sorted(self.values.items())]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(f'{name}{labels} {_number(value)}' for name, labels, value in self.samples())
+        return '\n'.join(lines)
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                counts = self.values[key] = [0] * len(self.buckets) + [0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            counts[-2] += value
+            counts[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            items = sorted((key, list(counts)) for key, counts in self.values.items())
+        for key, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _labels(self.label_names, key, [('le', _number(float(bound)))])
+                samples.append((f'{self.name}_bucket', labels, cumulative))
+            samples.append((f'{self.name}_bucket', _labels(self.label_names, key, [('le', '+Inf')]), counts[-1]))
+            samples.append((f'{self.name}_sum', _labels(self.label_names, key), counts[-2]))
+            samples.append((f'{self.name}_count', _labels(self.label_names, key), counts[-1]))
+        return samples
+
+
+def render():
+    """All metrics in Prometheus text exposition format"""
+    return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
+
+
+FRAMES = Counter('chatbot_ws_frames_total', 'WebSocket frames received, by consumer and frame type', ['consumer', 'type'])
+FRAME_SECONDS = Histogram(
+    'chatbot_ws_frame_seconds', 'Time to handle one received WebSocket frame', ['consumer', 'type']
+)
+FRAME_QUERIES = Histogram(
+    'chatbot_ws_frame_db_queries', 'Database queries run while handling one WebSocket frame', ['consumer'],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 20, 50),
+)
+HANDLER_SECONDS = Histogram('chatbot_handler_seconds', 'Time spent in instrumented consumer handlers', ['handler'])
+DB_CALL_SECONDS = Histogram('chatbot_db_call_seconds', 'Time spent in instrumented database helpers', ['call'])
+PUBLISH_SECONDS = Histogram('chatbot_channel_publish_seconds', 'Channel layer group_send latency', ['event'])
+OPEN_SOCKETS = Gauge('chatbot_ws_open_sockets', 'Currently open WebSocket connections', ['consumer'])
+NOTIFICATIONS_DROPPED = Counter(
+    'chatbot_notifications_dropped_total', 'Notifications dropped because the publish buffer was full'
+)
+WRITE_BEHIND_PENDING = Gauge('chatbot_write_behind_pending', 'Messages queued for write-behind persistence')
+LOG_RECORDS_DROPPED = Counter('chatbot_log_records_dropped_total', 'Log records dropped because the log queue was full')
+
+
+def timed(histogram, **labels):
+    """Decorator observing a sync or async function's duration in `histogram`"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with histogram.time(**labels):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with histogram.time(**labels):
+                    return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed_handler(name):
+    return timed(HANDLER_SECONDS, handler=name)
+
+
+def timed_db(name):
+    """For the sync functions wrapped by database_sync_to_async (apply it underneath)"""
+    return timed(DB_CALL_SECONDS, call=name)
+
+
+# Per-frame query counting
+
+_frame_queries = ContextVar('chatbot_frame_queries', default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _frame_queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(sender=None, connection=None, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+connection_created.connect(install_query_counter, dispatch_uid='chatbot_metrics_query_counter')
+
+
+@contextmanager
+def track_frame(consumer, frame_type):
+    """Count, time and tally the queries of one received frame"""
+    FRAMES.inc(consumer=consumer, type=frame_type)
+    counter = [0]
+    token = _frame_queries.set(counter)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        FRAME_SECONDS.observe(time.perf_counter() - started, consumer=consumer, type=frame_type)
+        FRAME_QUERIES.observe(counter[0], consumer=consumer)
+        _frame_queries.reset(token)
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:25
+
+from django.db import migrations, models
+import django.db.models.functions.datetime
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0003_message_is_manual'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['website', '-started_at'], name='conv_website_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['website', '-started_at'], name='conv_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(condition=models.Q(('is_active', True), ('requires_attention', True)), fields=['website', '-started_at'], name='conv_attention_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(django.db.models.functions.datetime.TruncDate('started_at'), models.F('website'), name='conv_started_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'timestamp'], name='msg_conv_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'role'], name='msg_conv_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(django.db.models.functions.datetime.TruncDate('timestamp'), name='msg_timestamp_date_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+
+# The search_vector column only exists on PostgreSQL and is not declared on the
+# Message model, so ordinary message reads never load it. A trigger keeps it in
+# step with content for every write path, bulk_create and raw SQL included.
+# SQLite falls back to substring matching (see ConversationSearchService).
+FORWARD_SQL = [
+    "ALTER TABLE chatbot_message ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION chatbot_message_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' OR NEW.content IS DISTINCT FROM OLD.content THEN
+            NEW.search_vector := to_tsvector('english', coalesce(NEW.content, ''));
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER chatbot_message_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON chatbot_message
+    FOR EACH ROW EXECUTE FUNCTION chatbot_message_search_vector_update()
+    """,
+    "UPDATE chatbot_message SET search_vector = to_tsvector('english', content)",
+    "CREATE INDEX msg_search_vector_idx ON chatbot_message USING gin (search_vector)",
+]
+
+REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS chatbot_message_search_vector_trigger ON chatbot_message",
+    "DROP FUNCTION IF EXISTS chatbot_message_search_vector_update()",
+    "ALTER TABLE chatbot_message DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run_on_postgresql(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0005_rollupwatermark'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_postgresql(FORWARD_SQL), run_on_postgresql(REVERSE_SQL)),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:10
+
+from django.db import migrations, models
+
+
+# Existing messages are numbered in (timestamp, id) order within their
+# conversation; both PostgreSQL and SQLite (3.33+) run these statements.
+NUMBER_MESSAGES_SQL = [
+    """
+    UPDATE chatbot_message SET seq = numbered.n
+    FROM (
+        SELECT id, ROW_NUMBER() OVER (PARTITION BY conversation_id ORDER BY timestamp, id) AS n
+        FROM chatbot_message
+    ) AS numbered
+    WHERE chatbot_message.id = numbered.id
+    """,
+    """
+    UPDATE chatbot_conversation SET last_message_seq = COALESCE(
+        (SELECT MAX(seq) FROM chatbot_message WHERE chatbot_message.conversation_id = chatbot_conversation.id), 0
+    )
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0006_message_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_seq',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='seq',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.RunSQL(NUMBER_MESSAGES_SQL, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name='message',
+            name='seq',
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='message',
+            constraint=models.UniqueConstraint(fields=('conversation', 'seq'), name='msg_conv_seq_uniq'),
+        ),
+    ]
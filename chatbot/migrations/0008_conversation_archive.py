@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0007_message_seq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationArchive',
+            fields=[
+                ('conversation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archive', serialize=False, to='chatbot.conversation')),
+                ('file', models.CharField(max_length=255)),
+                ('offset', models.BigIntegerField()),
+                ('length', models.IntegerField()),
+                ('message_count', models.IntegerField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='archive_after_days',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['website', 'ended_at'], name='conv_ended_idx'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 import uuid
-from django.db import models
+from collections import defaultdict
+from django.db import connection, models, transaction
+from django.db.models import Q
+from django.db.models.functions import TruncDate
 from django.contrib.auth.models import User
 from django.utils import timezone
 
@@ -53,6 +56,10 @@ class Website(models.Model):
         default="You are a helpful AI assistant. Be friendly, helpful, and concise in your responses."
     )
     
+    # Retention: ended conversations older than this move to the transcript
+    # archive (blank uses settings.CHAT_ARCHIVE_AFTER_DAYS)
+    archive_after_days = models.PositiveIntegerField(blank=True, null=True)
+    
     # Status
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -100,6 +107,8 @@ class Conversation(models.Model):
     total_messages = models.IntegerField(default=0)
     user_messages = models.IntegerField(default=0)
     bot_messages = models.IntegerField(default=0)
+    # Highest Message.seq handed out in this conversation
+    last_message_seq = models.PositiveIntegerField(default=0, editable=False)
 
     requires_attention = models.BooleanField(default=False)
     
@@ -110,6 +119,25 @@ class Conversation(models.Model):
     
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            # Conversation lists per website, newest first
+            models.Index(fields=['website', '-started_at'], name='conv_website_started_idx'),
+            # Live chat sidebar and active counters only ever look at open conversations
+            models.Index(
+                fields=['website', '-started_at'],
+                condition=Q(is_active=True),
+                name='conv_active_idx',
+            ),
+            models.Index(
+                fields=['website', '-started_at'],
+                condition=Q(is_active=True, requires_attention=True),
+                name='conv_attention_idx',
+            ),
+            # started_at__date lookups in the dashboard and analytics views
+            models.Index(TruncDate('started_at'), 'website', name='conv_started_date_idx'),
+            # Archival candidates: ended conversations per website, oldest first
+            models.Index(fields=['website', 'ended_at'], condition=Q(is_active=False), name='conv_ended_idx'),
+        ]
         
     def __str__(self):
         return f"Conversation {self.id} - {self.website.name}"
@@ -118,7 +146,7 @@ class Conversation(models.Model):
         """Mark conversation as ended"""
         self.ended_at = timezone.now()
         self.is_active = False
-        self.save()
+        self.save(update_fields=['ended_at', 'is_active'])
     
     @property
     def duration(self):
@@ -126,6 +154,65 @@ class Conversation(models.Model):
         if self.ended_at:
             return self.ended_at - self.started_at
         return timezone.now() - self.started_at
+    
+    @classmethod
+    def reserve_message_seqs(cls, conversation_id, count, counts=None):
+        """Reserve `count` message sequence numbers and return the last one
+        
+        `counts` ({role: count}) bumps the message counters in the same
+        UPDATE ... RETURNING. The row lock it takes is held until the
+        surrounding transaction ends, so concurrent inserts into one
+        conversation are numbered one after the other; call it inside
+        transaction.atomic() together with the insert.
+        """
+        columns = {'last_message_seq': count}
+        if counts:
+            columns['total_messages'] = sum(counts.values())
+            columns['user_messages'] = counts.get('user', 0)
+            columns['bot_messages'] = counts.get('assistant', 0)
+        quote = connection.ops.quote_name
+        assignments = ', '.join(f'{quote(column)} = {quote(column)} + %s' for column in columns)
+        sql = (
+            f'UPDATE {quote(cls._meta.db_table)} SET {assignments} '
+            f'WHERE {quote(cls._meta.pk.column)} = %s RETURNING {quote("last_message_seq")}'
+        )
+        params = [*columns.values(), cls._meta.pk.get_db_prep_value(conversation_id, connection)]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        if row is None:
+            raise cls.DoesNotExist(f'Conversation {conversation_id} does not exist')
+        return row[0]
+    
+    def count_messages(self, role, count=1):
+        """Bump the in-memory counters only (the row is updated elsewhere)"""
+        self.total_messages += count
+        if role == 'user':
+            self.user_messages += count
+        elif role == 'assistant':
+            self.bot_messages += count
+
+
+class MessageQuerySet(models.QuerySet):
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """bulk_create() that numbers messages without a seq, one UPDATE per conversation
+        
+        Conversation counters are left alone, as with any bulk_create().
+        """
+        objs = list(objs)
+        pending = defaultdict(list)
+        for message in objs:
+            if message.seq is None:
+                pending[message.conversation_id].append(message)
+        if not pending:
+            return super().bulk_create(objs, *args, **kwargs)
+        with transaction.atomic():
+            for conversation_id, messages in pending.items():
+                last = Conversation.reserve_message_seqs(conversation_id, len(messages))
+                for seq, message in enumerate(messages, start=last - len(messages) + 1):
+                    message.seq = seq
+            return super().bulk_create(objs, *args, **kwargs)
 
 
 class Message(models.Model):
@@ -141,6 +228,8 @@ class Message(models.Model):
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
     content = models.TextField()
+    # Per-conversation insert order (1, 2, ...), assigned when the row is inserted
+    seq = models.PositiveIntegerField(editable=False)
     
     # Metadata
     timestamp = models.DateTimeField(auto_now_add=True)
@@ -153,19 +242,38 @@ class Message(models.Model):
     is_manual = models.BooleanField(default=False)
     tokens_used = models.IntegerField(blank=True, null=True)
     
+    objects = MessageQuerySet.as_manager()
+    
     class Meta:
         ordering = ['timestamp']
+        constraints = [
+            # Also the index for resume, pagination and "since seq" reads
+            models.UniqueConstraint(fields=['conversation', 'seq'], name='msg_conv_seq_uniq'),
+        ]
+        indexes = [
+            # Transcript reads in timestamp order
+            models.Index(fields=['conversation', 'timestamp'], name='msg_conv_timestamp_idx'),
+            # Per-role counts and the conversation history used for AI prompts
+            models.Index(fields=['conversation', 'role'], name='msg_conv_role_idx'),
+            # timestamp__date lookups in the dashboard and analytics views
+            models.Index(TruncDate('timestamp'), name='msg_timestamp_date_idx'),
+        ]
         
     def __str__(self):
         return f"{self.role}: {self.content[:50]}..."
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update conversation statistics
-        self.conversation.total_messages = self.conversation.messages.count()
-        self.conversation.user_messages = self.conversation.messages.filter(role='user').count()
-        self.conversation.bot_messages = self.conversation.messages.filter(role='assistant').count()
-        self.conversation.save()
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        
+        # New rows take the next sequence number and bump the conversation
+        # statistics in one UPDATE, committed together with the insert
+        with transaction.atomic():
+            self.seq = Conversation.reserve_message_seqs(self.conversation_id, 1, {self.role: 1})
+            super().save(*args, **kwargs)
+        # Keep the in-memory conversation in step without re-reading the row
+        self.conversation.last_message_seq = self.seq
+        self.conversation.count_messages(self.role)
 
 
 class ChatbotAnalytics(models.Model):
@@ -194,6 +302,35 @@ class ChatbotAnalytics(models.Model):
         return f"Analytics for {self.website.name} on {self.date}"
 
 
+class ConversationArchive(models.Model):
+    """Where an archived conversation's transcript lives
+    
+    The messages were moved to a gzip member of a JSONL archive file (see
+    ConversationArchiveService); offset and length locate that member.
+    """
+    conversation = models.OneToOneField(
+        Conversation, on_delete=models.CASCADE, primary_key=True, related_name='archive'
+    )
+    file = models.CharField(max_length=255)
+    offset = models.BigIntegerField()
+    length = models.IntegerField()
+    message_count = models.IntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Archive of {self.conversation_id} in {self.file}"
+
+
+class RollupWatermark(models.Model):
+    """Point in time up to which a periodic rollup has processed activity"""
+    name = models.CharField(max_length=100, unique=True)
+    value = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} @ {self.value.isoformat()}"
+
+
 class APIKey(models.Model):
     """Model to store API keys for different AI providers"""
     website = models.ForeignKey(Website, on_delete=models.CASCADE, related_name='api_keys')
@@ -0,0 +1,91 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+# Unique ordering keys, served by the (website, -started_at) index and the
+# unique (conversation, seq) constraint
+CONVERSATION_KEYSET = ('started_at', 'id')
+MESSAGE_KEYSET = ('seq',)
+
+MESSAGE_PAGE_SIZE = 50
+MAX_MESSAGE_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded or applied"""
+
+
+def encode_cursor(*values):
+    """Opaque, URL-safe cursor for a row's ordering key"""
+    values = [
+        value.isoformat() if isinstance(value, datetime) else str(value) if isinstance(value, uuid.UUID) else value
+        for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, size=None):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list) or (size is not None and len(values) != size):
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+def keyset_filter(fields, values, descending):
+    """Q for rows strictly after `values` in lexicographic (fields) order"""
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for index, field in enumerate(fields):
+        equal = {name: value for name, value in zip(fields[:index], values[:index])}
+        condition |= Q(**equal, **{f'{field}__{lookup}': values[index]})
+    return condition
+
+
+def keyset_page(queryset, fields, limit, before=None, after=None):
+    """One page of a queryset ordered on a unique key such as (started_at, id)
+
+    Without cursors this is the newest `limit` rows. `before` walks back to
+    older rows and `after` forward to newer ones; no COUNT or OFFSET is run.
+    Returns (rows in walk order, i.e. newest first unless `after` is given,
+    and whether more rows lie further in that direction).
+    """
+    descending = after is None
+    cursor = after if after is not None else before
+    if cursor is not None:
+        try:
+            queryset = queryset.filter(keyset_filter(fields, decode_cursor(cursor, len(fields)), descending))
+        except (ValidationError, ValueError, TypeError):
+            raise InvalidCursor('Invalid cursor')
+
+    ordering = [f'-{field}' if descending else field for field in fields]
+    rows = list(queryset.order_by(*ordering)[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def cursor_for(row, fields):
+    return encode_cursor(*(getattr(row, field) for field in fields))
+
+
+def keyset_window(queryset, fields, limit, before=None, after=None):
+    """keyset_page() in ascending key order, with cursors for the neighbouring pages"""
+    rows, has_more = keyset_page(queryset, fields, limit, before=before, after=after)
+    if after is None:
+        rows.reverse()
+    has_older = has_more if after is None else True
+    has_newer = has_more if after is not None else before is not None
+    return {
+        'rows': rows,
+        'before': cursor_for(rows[0], fields) if rows and has_older else None,
+        # With nothing newer yet, keep polling from the same position
+        'after': cursor_for(rows[-1], fields) if rows else after,
+        'has_older': has_older,
+        'has_newer': has_newer,
+    }
@@ -11,7 +11,7 @@ class WebsiteSerializer(serializers.ModelSerializer):
             'id', 'name', 'url', 'bot_name', 'welcome_message', 'theme', 'position',
             'enable_sound', 'show_typing_indicator', 'show_avatar', 'allow_minimize',
             'allow_close', 'auto_connect', 'max_messages', 'ai_model', 'ai_temperature',
-            'ai_max_tokens', 'system_prompt', 'is_active', 'created_at', 'updated_at'
+            'ai_max_tokens', 'system_prompt', 'archive_after_days', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
@@ -62,10 +62,10 @@ class MessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Message
         fields = [
-            'id', 'role', 'content', 'timestamp', 'is_error', 'is_welcome',
+            'id', 'seq', 'role', 'content', 'timestamp', 'is_error', 'is_welcome',
             'ai_model_used', 'response_time_ms', 'tokens_used','is_manual'
         ]
-        read_only_fields = ['id', 'timestamp', 'ai_model_used', 'response_time_ms', 'tokens_used']
+        read_only_fields = ['id', 'seq', 'timestamp', 'ai_model_used', 'response_time_ms', 'tokens_used']
 
 
 class ConversationSerializer(serializers.ModelSerializer):
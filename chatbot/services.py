@@ -1,138 +1,361 @@
+import asyncio
+import atexit
+import csv
+import gzip
+import hashlib
+import os
+import re
+import threading
 import time
 import logging
-import openai
+import uuid
+import weakref
+import zlib
+from collections import Counter, OrderedDict, defaultdict
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
 from django.conf import settings
-from .models import ChatbotAnalytics, Website, Conversation, Message, APIKey
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVectorField
+from django.db import connection, transaction
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.html import escape
+from . import codec, metrics
+from .models import ChatbotAnalytics, Website, Conversation, ConversationArchive, Message, APIKey
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+try:
+    import openai
+except ImportError:  # Optional: only needed for the 'openai' provider
+    openai = None
+
+try:
+    import numpy as np
+except ImportError:  # Optional: enables similarity lookups in ResponseCache
+    np = None
 
 logger = logging.getLogger(__name__)
 
 
-# class ChatbotService:
-#     """Service for handling AI chatbot responses"""
+class LLMProvider:
+    """Base class for streaming completion backends, keyed by APIKey.provider"""
     
-#     def __init__(self, website):
-#         self.website = website
-#         self.client = None
-#         self._setup_ai_client()
+    name = None
     
-#     def _setup_ai_client(self):
-#         """Setup AI client based on website configuration"""
-#         try:
-#             # Try to get API key from database
-#             api_key_obj = APIKey.objects.filter(
-#                 website=self.website,
-#                 provider='openai',
-#                 is_active=True
-#             ).first()
-            
-#             if api_key_obj:
-#                 api_key = api_key_obj.api_key
-#             else:
-#                 # Fallback to environment variable
-#                 api_key = getattr(settings, 'OPENAI_API_KEY', None)
-            
-#             if api_key:
-#                 openai.api_key = api_key
-#                 self.client = openai
-#                 logger.info(f"OpenAI client initialized for website {self.website.id}")
-#             else:
-#                 logger.warning(f"No OpenAI API key found for website {self.website.id}")
-                
-#         except Exception as e:
-#             logger.error(f"Error setting up AI client: {e}")
-    
-#     def generate_response(self, user_message, conversation):
-#         """Generate AI response for user message"""
-#         start_time = time.time()
-        
-#         try:
-#             if not self.client:
-#                 return self._get_fallback_response()
-            
-#             # Prepare conversation history
-#             messages = self._prepare_conversation_history(conversation, user_message)
-            
-#             # Generate response using OpenAI
-#             response = self.client.chat.completions.create(
-#                 model=self.website.ai_model,
-#                 messages=messages,
-#                 temperature=self.website.ai_temperature,
-#                 max_tokens=self.website.ai_max_tokens,
-#             )
-            
-#             ai_response = response.choices[0].message.content.strip()
-#             response_time = int((time.time() - start_time) * 1000)
-#             logger.info(f"Generated AI response in {response_time}ms")
-
-#             if not ai_response or ai_response.strip() == "":
-#                 conversation.requires_attention = True
-#                 conversation.save()
-#                 NotificationService.notify_conversation_updated(conversation)
-            
-#             return ai_response
-            
-#         except Exception as e:
-#             logger.error(f"Error generating AI response: {e}")
-#             conversation.requires_attention = True
-#             conversation.save()
-#             NotificationService.notify_conversation_updated(conversation)
-#             return self._get_error_response()
-    
-#     def _prepare_conversation_history(self, conversation, current_message):
-#         """Prepare conversation history for AI model"""
-#         messages = [
-#             {"role": "system", "content": self.website.system_prompt}
-#         ]
-        
-#         # Get recent messages from conversation (limit to save tokens)
-#         recent_messages = conversation.messages.filter(
-#             role__in=['user', 'assistant']
-#         ).order_by('-timestamp')[:10]
-        
-#         # Add messages in chronological order
-#         for msg in reversed(recent_messages):
-#             messages.append({
-#                 "role": msg.role,
-#                 "content": msg.content
-#             })
-        
-#         # Add current user message
-#         messages.append({
-#             "role": "user",
-#             "content": current_message
-#         })
-        
-#         return messages
-    
-#     def _get_fallback_response(self):
-#             """Return fallback response when manual chat is enabled"""
-#             return "Thank you for your message. A support agent will respond to you shortly."
-        
-#     def _get_error_response(self):
-#         """Return error response"""
-#         return "I apologize, but I'm having trouble processing your request right now. Please try again later."
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+        self.tokens_used = None
+    
+    async def stream(self, messages, model, temperature, max_tokens):
+        """Yield the completion as text deltas; set self.tokens_used when known"""
+        raise NotImplementedError
+        yield  # pragma: no cover
 
 
-import time
-import logging
-from django.conf import settings
-from .models import ChatbotAnalytics, Website, Conversation, Message, APIKey
+class StubProvider(LLMProvider):
+    """Local provider that echoes the visitor word by word; used in tests and development"""
+    
+    name = 'stub'
+    
+    async def stream(self, messages, model, temperature, max_tokens):
+        prompt = messages[-1]['content']
+        words = f"You said: {prompt}".split(' ')[:max_tokens]
+        delay = getattr(settings, 'CHATBOT_STUB_DELAY', 0)
+        for index, word in enumerate(words):
+            await asyncio.sleep(delay)
+            yield word if index == 0 else f' {word}'
+        self.tokens_used = sum(len(m['content'].split()) for m in messages) + len(words)
 
-logger = logging.getLogger(__name__)
+
+class OpenAIProvider(LLMProvider):
+    """Streams chat completions from the OpenAI API without blocking the event loop"""
+    
+    name = 'openai'
+    
+    # One client (and HTTP connection pool) per API key for the life of the process
+    _clients = {}
+    
+    def _get_client(self):
+        if openai is None:
+            raise RuntimeError("The 'openai' package is not installed")
+        client = self._clients.get(self.api_key)
+        if client is None:
+            client = self._clients[self.api_key] = openai.AsyncOpenAI(api_key=self.api_key)
+        return client
+    
+    async def stream(self, messages, model, temperature, max_tokens):
+        response = await self._get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={'include_usage': True},
+        )
+        async for chunk in response:
+            if chunk.usage:
+                self.tokens_used = chunk.usage.total_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+LLM_PROVIDERS = {
+    provider.name: provider for provider in (StubProvider, OpenAIProvider)
+}
+
+
+class ResponseCache:
+    """Per-website, in-process LRU cache of AI answers keyed by the visitor's question
+    
+    Keys combine the normalized question with the system prompt, the model
+    and a hash of the earlier turns of the conversation, so configuration
+    changes never serve stale answers and an answer that depends on one
+    visitor's conversation ("yes", "what was my email again?") is only reused
+    after the very same history. Entries expire after RESPONSE_CACHE_TTL
+    seconds and the least recently used are evicted past
+    RESPONSE_CACHE_MAX_ENTRIES; at most RESPONSE_CACHE_MAX_WEBSITES websites
+    keep a cache. When RESPONSE_CACHE_SIMILARITY is set (and NumPy is
+    installed) a miss falls back to a cosine search over hashed bag-of-words
+    vectors of the cached questions with the same context. Caches are shared
+    by the threads of a process; counters are per process.
+    """
+    
+    EMBEDDING_DIMENSIONS = 512
+    
+    _instances = OrderedDict()
+    _instances_lock = threading.Lock()
+    
+    def __init__(self, max_entries, ttl, similarity=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity if np is not None else None
+        # key -> (expires_at, context, answer, tokens_used, question vector)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self._matrix = None
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+    
+    @classmethod
+    def for_website(cls, website_id):
+        """Return the cache for a website, or None when caching is disabled"""
+        max_entries = getattr(settings, 'RESPONSE_CACHE_MAX_ENTRIES', 256)
+        if not max_entries:
+            return None
+        with cls._instances_lock:
+            instance = cls._instances.get(website_id)
+            if instance is None:
+                instance = cls._instances[website_id] = cls(
+                    max_entries,
+                    getattr(settings, 'RESPONSE_CACHE_TTL', 3600),
+                    getattr(settings, 'RESPONSE_CACHE_SIMILARITY', None),
+                )
+                while len(cls._instances) > getattr(settings, 'RESPONSE_CACHE_MAX_WEBSITES', 1000):
+                    cls._instances.popitem(last=False)
+            else:
+                cls._instances.move_to_end(website_id)
+        return instance
+    
+    @classmethod
+    def stats(cls, website_id):
+        """Hit/miss counters for a website's cache in this process"""
+        instance = cls._instances.get(website_id)
+        hits = instance.hits + instance.similar_hits if instance else 0
+        misses = instance.misses if instance else 0
+        return {
+            'entries': len(instance.entries) if instance else 0,
+            'hits': hits,
+            'similar_hits': instance.similar_hits if instance else 0,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            'tokens_saved': instance.tokens_saved if instance else 0,
+        }
+    
+    @staticmethod
+    def normalize(text):
+        """Case-fold and strip whitespace and trailing punctuation from a question"""
+        return re.sub(r'\s+', ' ', text.casefold()).strip().rstrip('?!. ')
+    
+    @staticmethod
+    def make_context(system_prompt, model, history=()):
+        """Hash of everything besides the question that the answer depends on
+        
+        history is the conversation's earlier turns as sent to the provider
+        ({'role', 'content'} dicts, without the system prompt).
+        """
+        digest = hashlib.sha1(f'{model}\x1f{system_prompt}'.encode())
+        for turn in history:
+            digest.update(f"\x1e{turn['role']}\x1f{turn['content']}".encode())
+        return digest.hexdigest()
+    
+    @classmethod
+    def embed(cls, normalized):
+        """Hashed bag of words and bigrams, L2-normalized"""
+        vector = np.zeros(cls.EMBEDDING_DIMENSIONS, dtype=np.float32)
+        words = re.findall(r'\w+', normalized)
+        for token in words + [f'{a} {b}' for a, b in zip(words, words[1:])]:
+            vector[zlib.crc32(token.encode()) % cls.EMBEDDING_DIMENSIONS] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def get(self, question, system_prompt, model, history=()):
+        """Return (answer, tokens_used) for a cached question, or None"""
+        normalized = self.normalize(question)
+        context = self.make_context(system_prompt, model, history)
+        with self.lock:
+            return self._get(f'{context}:{normalized}', normalized, context)
+    
+    def _get(self, key, normalized, context):
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        if entry and entry[0] <= now:
+            self._remove(key)
+            entry = None
+        if entry:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        elif self.similarity:
+            key = self._most_similar(normalized, context, now)
+            if key:
+                entry = self.entries[key]
+                self.entries.move_to_end(key)
+                self.similar_hits += 1
+        
+        if not entry:
+            self.misses += 1
+            return None
+        self.tokens_saved += entry[3] or 0
+        return entry[2], entry[3]
+    
+    def put(self, question, system_prompt, model, answer, tokens_used, history=()):
+        normalized = self.normalize(question)
+        context = self.make_context(system_prompt, model, history)
+        vector = self.embed(normalized) if self.similarity else None
+        key = f'{context}:{normalized}'
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, context, answer, tokens_used, vector)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._matrix = None
+    
+    def _remove(self, key):
+        del self.entries[key]
+        self._matrix = None
+    
+    def _most_similar(self, normalized, context, now):
+        """Key of the closest live cached question in the same context, if above the threshold"""
+        if self._matrix is None:
+            keys = [key for key, entry in self.entries.items() if entry[4] is not None]
+            if not keys:
+                return None
+            self._matrix = (keys, np.vstack([self.entries[key][4] for key in keys]))
+        keys, matrix = self._matrix
+        
+        scores = matrix @ self.embed(normalized)
+        for index in np.argsort(scores)[::-1]:
+            if scores[index] < self.similarity:
+                break
+            entry = self.entries.get(keys[index])
+            if entry and entry[1] == context and entry[0] > now:
+                return keys[index]
+        return None
 
 
 class ChatbotService:
-    """Service for handling chatbot responses - AI disabled for manual chat"""
+    """Service for generating chatbot responses through a pluggable provider
+    
+    Providers come from the website's active APIKey rows (first registered
+    provider wins), falling back to settings.CHATBOT_DEFAULT_PROVIDER. With
+    no provider the website is in manual mode and agents reply from the
+    dashboard. Construction and history loading hit the database and must run
+    in a sync context; stream_response() is a coroutine-friendly async generator.
+    """
+    
+    HISTORY_LIMIT = 10
     
     def __init__(self, website):
         self.website = website
+        self.provider_class, self.api_key = self._resolve_provider()
+        
+        self.response_cache = ResponseCache.for_website(website.id)
+        
+        # Metrics for the most recent stream_response() call
+        self.response_time_ms = None
+        self.first_token_ms = None
+        self.tokens_used = None
+        self.cache_hit = False
+    
+    @property
+    def enabled(self):
+        return self.provider_class is not None
+    
+    def _resolve_provider(self):
+        """Pick the provider class and API key for this website"""
+        for api_key in APIKey.objects.filter(website=self.website, is_active=True).order_by('created_at'):
+            provider_class = LLM_PROVIDERS.get(api_key.provider)
+            if provider_class:
+                return provider_class, api_key.api_key
+        
+        default = getattr(settings, 'CHATBOT_DEFAULT_PROVIDER', None)
+        if default:
+            if default in LLM_PROVIDERS:
+                return LLM_PROVIDERS[default], getattr(settings, f'{default.upper()}_API_KEY', None)
+            logger.warning(f"Unknown CHATBOT_DEFAULT_PROVIDER '{default}'")
+        return None, None
     
-    def generate_response(self, user_message, conversation):
-        """Manual response generation - AI is disabled"""
-        # Return a placeholder message instead of None
-        return self._get_fallback_response()
+    async def stream_response(self, messages):
+        """Yield the response as text deltas, recording latency and token usage"""
+        provider = self.provider_class(self.api_key)
+        self.first_token_ms = self.response_time_ms = self.tokens_used = None
+        self.cache_hit = False
+        question = messages[-1]['content']
+        # The answer depends on the earlier turns too, so they are part of the cache key
+        history = [message for message in messages[:-1] if message['role'] != 'system']
+        
+        start_time = time.monotonic()
+        cached = self.response_cache and self.response_cache.get(
+            question, self.website.system_prompt, self.website.ai_model, history
+        )
+        if cached:
+            # Answered without an LLM round trip
+            self.cache_hit = True
+            self.tokens_used = 0
+            self.first_token_ms = self.response_time_ms = int((time.monotonic() - start_time) * 1000)
+            yield cached[0]
+            return
+        
+        parts = []
+        async for delta in provider.stream(
+            messages,
+            model=self.website.ai_model,
+            temperature=self.website.ai_temperature,
+            max_tokens=self.website.ai_max_tokens,
+        ):
+            if self.first_token_ms is None:
+                self.first_token_ms = int((time.monotonic() - start_time) * 1000)
+            parts.append(delta)
+            yield delta
+        
+        self.response_time_ms = int((time.monotonic() - start_time) * 1000)
+        self.tokens_used = provider.tokens_used
+        answer = ''.join(parts).strip()
+        if self.response_cache is not None and answer:
+            self.response_cache.put(
+                question, self.website.system_prompt, self.website.ai_model, answer, self.tokens_used, history
+            )
+        logger.info(
+            f"Generated {provider.name} response in {self.response_time_ms}ms "
+            f"(first token {self.first_token_ms}ms)"
+        )
     
-    def _prepare_conversation_history(self, conversation, current_message):
+    def prepare_conversation_history(self, conversation, current_message):
         """Prepare conversation history for AI model"""
         messages = [
             {"role": "system", "content": self.website.system_prompt}
@@ -141,10 +364,13 @@ class ChatbotService:
         # Get recent messages from conversation (limit to save tokens)
         recent_messages = conversation.messages.filter(
             role__in=['user', 'assistant']
-        ).order_by('-timestamp')[:10]
+        ).order_by('-timestamp')[:self.HISTORY_LIMIT]
         
-        # Add messages in chronological order
-        for msg in reversed(recent_messages):
+        # Add messages in chronological order, skipping the current one if already saved
+        history = list(reversed(recent_messages))
+        if history and history[-1].role == 'user' and history[-1].content == current_message:
+            history.pop()
+        for msg in history:
             messages.append({
                 "role": msg.role,
                 "content": msg.content
@@ -158,97 +384,191 @@ class ChatbotService:
         
         return messages
     
-    def _get_fallback_response(self):
+    def get_fallback_response(self):
         """Return fallback response when manual chat is enabled"""
         return "Thank you for your message. A support agent will respond to you shortly."
         
-    def _get_error_response(self):
+    def get_error_response(self):
         """Return error response"""
         return "I apologize, but I'm having trouble processing your request right now. Please try again later."
 
 
-
-
+class WebsiteConfigCache:
+    """Cache of the public widget configuration, keyed by website id.
+    
+    Entries hold the serialized JSON body together with a strong ETag and the
+    Last-Modified time derived from Website.updated_at, so the config endpoint
+    can answer both 200s and 304s without touching the database. Entries are
+    dropped by the Website save/delete signal handlers.
+    """
+    
+    KEY_PREFIX = 'website_config'
+    MISSING = 'missing'
+    
+    @staticmethod
+    def _key(website_id):
+        return f'{WebsiteConfigCache.KEY_PREFIX}:{website_id}'
+    
+    @staticmethod
+    def build_entry(website):
+        """Serialize a website's widget config into a cache entry"""
+        body = codec.dumps(website.get_config())
+        version = f'{website.id}:{website.updated_at.isoformat()}:{body}'
+        return {
+            'body': body,
+            'etag': '"%s"' % hashlib.sha1(version.encode()).hexdigest(),
+            'last_modified': website.updated_at.timestamp(),
+        }
+    
+    @staticmethod
+    def get(website_id):
+        """Return the cache entry for an active website, or None if there is none"""
+        from django.core.cache import cache
+        
+        key = WebsiteConfigCache._key(website_id)
+        entry = cache.get(key)
+        if entry is None:
+            website = Website.objects.filter(id=website_id, is_active=True).first()
+            entry = WebsiteConfigCache.build_entry(website) if website else WebsiteConfigCache.MISSING
+            # Unknown ids are remembered briefly so bad embeds cannot hammer the database
+            timeout = getattr(settings, 'WEBSITE_CONFIG_CACHE_TIMEOUT', 3600)
+            cache.set(key, entry, timeout if website else min(timeout, 60))
+        
+        if entry == WebsiteConfigCache.MISSING:
+            return None
+        return entry
+    
+    @staticmethod
+    def invalidate(website_id):
+        from django.core.cache import cache
+        
+        cache.delete(WebsiteConfigCache._key(website_id))
 
 
 #######################################################################################################################################################################################
 class AnalyticsService:
     """Service for handling analytics calculations"""
     
+    ROLLUP_FIELDS = [
+        'total_conversations', 'total_messages', 'unique_visitors', 'avg_conversation_length',
+        'avg_response_time_ms', 'conversations_with_multiple_messages', 'bounce_rate',
+    ]
+    
     @staticmethod
     def calculate_daily_analytics(website, date):
         """Calculate analytics for a specific website and date"""
-        from django.db.models import Avg, Count
-        from .models import ChatbotAnalytics
+        AnalyticsService.rollup_daily_analytics([(website.id, date)])
+        return ChatbotAnalytics.objects.get(website=website, date=date)
+    
+    @staticmethod
+    def find_dirty_pairs(since=None, until=None):
+        """Return the (website_id, date) pairs whose daily analytics changed in [since, until)"""
+        from django.db.models.functions import TruncDate
         
-        conversations = Conversation.objects.filter(
-            website=website,
-            started_at__date=date
-        )
+        conversations = Conversation.objects.all()
+        messages = Message.objects.all()
+        if since is not None:
+            conversations = conversations.filter(started_at__gte=since)
+            messages = messages.filter(timestamp__gte=since)
+        if until is not None:
+            conversations = conversations.filter(started_at__lt=until)
+            messages = messages.filter(timestamp__lt=until)
         
-        messages = Message.objects.filter(
-            conversation__website=website,
-            timestamp__date=date
+        pairs = set(
+            conversations.annotate(date=TruncDate('started_at'))
+            .values_list('website_id', 'date').distinct().order_by()
+        )
+        # A message changes its own day's totals and, through the conversation
+        # counters, the length/bounce metrics of the day the conversation started
+        pairs.update(
+            messages.annotate(date=TruncDate('timestamp'))
+            .values_list('conversation__website_id', 'date').distinct().order_by()
         )
+        pairs.update(
+            messages.annotate(date=TruncDate('conversation__started_at'))
+            .values_list('conversation__website_id', 'date').distinct().order_by()
+        )
+        return sorted(pairs)
+    
+    @staticmethod
+    def rollup_daily_analytics(pairs):
+        """Recompute and upsert ChatbotAnalytics rows for (website_id, date) pairs.
         
-        # Calculate metrics
-        total_conversations = conversations.count()
-        total_messages = messages.count()
-        unique_visitors = conversations.values('user_identifier').distinct().count()
-        
-        # Average conversation length (in messages)
-        avg_conversation_length = conversations.aggregate(
-            avg_length=Avg('total_messages')
-        )['avg_length'] or 0
-        
-        # Average response time (from Message model)
-        avg_response_time = messages.filter(
-            role='assistant',
-            response_time_ms__isnull=False
-        ).aggregate(
-            avg_time=Avg('response_time_ms')
-        )['avg_time'] or 0
-        
-        # Conversations with multiple messages
-        conversations_with_multiple = conversations.filter(
-            total_messages__gt=1
-        ).count()
+        Uses one grouped query per table for the whole batch and a single
+        idempotent bulk upsert, so reruns simply overwrite the same rows.
+        """
+        from datetime import datetime, time, timedelta
+        from django.db.models import Avg, Count, Q
+        from django.db.models.functions import TruncDate
+        from django.utils import timezone
         
-        # Bounce rate (single message conversations)
-        bounce_rate = 0
-        if total_conversations > 0:
-            single_message_conversations = conversations.filter(
-                total_messages=1
-            ).count()
-            bounce_rate = (single_message_conversations / total_conversations) * 100
+        pairs = set(pairs)
+        if not pairs:
+            return 0
         
-        # Create or update analytics record
-        analytics, created = ChatbotAnalytics.objects.get_or_create(
-            website=website,
-            date=date,
-            defaults={
-                'total_conversations': total_conversations,
-                'total_messages': total_messages,
-                'unique_visitors': unique_visitors,
-                'avg_conversation_length': avg_conversation_length,
-                'avg_response_time_ms': avg_response_time,
-                'conversations_with_multiple_messages': conversations_with_multiple,
-                'bounce_rate': bounce_rate,
-            }
-        )
+        # Skip websites deleted since their activity was recorded
+        website_ids = set(Website.objects.filter(
+            id__in={website_id for website_id, _ in pairs}
+        ).values_list('id', flat=True))
+        pairs = {(website_id, date) for website_id, date in pairs if website_id in website_ids}
+        if not pairs:
+            return 0
         
-        if not created:
-            # Update existing record
-            analytics.total_conversations = total_conversations
-            analytics.total_messages = total_messages
-            analytics.unique_visitors = unique_visitors
-            analytics.avg_conversation_length = avg_conversation_length
-            analytics.avg_response_time_ms = avg_response_time
-            analytics.conversations_with_multiple_messages = conversations_with_multiple
-            analytics.bounce_rate = bounce_rate
-            analytics.save()
+        dates = [date for _, date in pairs]
+        start = timezone.make_aware(datetime.combine(min(dates), time.min))
+        end = timezone.make_aware(datetime.combine(max(dates) + timedelta(days=1), time.min))
+        
+        conversation_rows = Conversation.objects.filter(
+            website_id__in=website_ids, started_at__gte=start, started_at__lt=end
+        ).annotate(date=TruncDate('started_at')).values('website_id', 'date').annotate(
+            total_conversations=Count('pk'),
+            unique_visitors=Count('user_identifier', distinct=True),
+            avg_conversation_length=Avg('total_messages'),
+            conversations_with_multiple_messages=Count('pk', filter=Q(total_messages__gt=1)),
+            single_message_conversations=Count('pk', filter=Q(total_messages=1)),
+        ).order_by()
+        
+        message_rows = Message.objects.filter(
+            conversation__website_id__in=website_ids, timestamp__gte=start, timestamp__lt=end
+        ).annotate(date=TruncDate('timestamp')).values('conversation__website_id', 'date').annotate(
+            total_messages=Count('pk'),
+            avg_response_time_ms=Avg(
+                'response_time_ms', filter=Q(role='assistant', response_time_ms__isnull=False)
+            ),
+        ).order_by()
+        
+        conversations_by_pair = {(row['website_id'], row['date']): row for row in conversation_rows}
+        messages_by_pair = {(row['conversation__website_id'], row['date']): row for row in message_rows}
+        
+        analytics = []
+        for website_id, date in pairs:
+            conversation_stats = conversations_by_pair.get((website_id, date), {})
+            message_stats = messages_by_pair.get((website_id, date), {})
+            
+            total_conversations = conversation_stats.get('total_conversations', 0)
+            bounce_rate = 0
+            if total_conversations > 0:
+                bounce_rate = (conversation_stats['single_message_conversations'] / total_conversations) * 100
+            
+            analytics.append(ChatbotAnalytics(
+                website_id=website_id,
+                date=date,
+                total_conversations=total_conversations,
+                total_messages=message_stats.get('total_messages', 0),
+                unique_visitors=conversation_stats.get('unique_visitors', 0),
+                avg_conversation_length=conversation_stats.get('avg_conversation_length') or 0,
+                avg_response_time_ms=message_stats.get('avg_response_time_ms') or 0,
+                conversations_with_multiple_messages=conversation_stats.get('conversations_with_multiple_messages', 0),
+                bounce_rate=bounce_rate,
+            ))
         
-        return analytics
+        ChatbotAnalytics.objects.bulk_create(
+            analytics,
+            update_conflicts=True,
+            unique_fields=['website', 'date'],
+            update_fields=AnalyticsService.ROLLUP_FIELDS,
+        )
+        return len(analytics)
     
     @staticmethod
     def get_website_summary(website, days=30):
@@ -285,168 +605,1282 @@ class AnalyticsService:
         }
 
 
-class NotificationService:
-    """Service for handling real-time notifications"""
+class DashboardStatsService:
+    """Per-owner dashboard counters, cached and kept fresh with deltas
+    
+    A cold read computes every counter in two queries with conditional
+    aggregation. Each counter then lives under its own cache key so new
+    conversations and messages can be applied with atomic cache increments
+    from the notification paths. Counters without a delta hook (attention,
+    active) converge when the entries expire after
+    DASHBOARD_STATS_CACHE_TIMEOUT seconds.
+    """
+    
+    KEY_PREFIX = 'dashboard_stats'
+    TOTAL_FIELDS = (
+        'total_websites', 'total_conversations', 'active_conversations',
+        'conversations_needing_attention', 'total_messages',
+    )
+    TODAY_FIELDS = ('today_conversations', 'today_messages')
+    
+    @classmethod
+    def _keys(cls, owner_id, today):
+        """Map cache key -> field; today's counters are keyed by date so they reset at midnight"""
+        keys = {f'{cls.KEY_PREFIX}:{owner_id}:{field}': field for field in cls.TOTAL_FIELDS}
+        keys.update({f'{cls.KEY_PREFIX}:{owner_id}:{today}:{field}': field for field in cls.TODAY_FIELDS})
+        return keys
     
     @staticmethod
-    def notify_new_conversation(conversation):
-        """Notify dashboard about new conversation"""
-        from channels.layers import get_channel_layer
-        from asgiref.sync import async_to_sync
+    def compute(owner_id, today):
+        """Compute all counters for an owner in two queries"""
+        from django.db.models import Count, Q, Sum
+        from django.db.models.functions import Coalesce
         
-        channel_layer = get_channel_layer()
+        stats = Website.objects.filter(owner_id=owner_id).aggregate(
+            total_websites=Count('pk', distinct=True),
+            total_conversations=Count('conversations'),
+            active_conversations=Count('conversations', filter=Q(conversations__is_active=True)),
+            conversations_needing_attention=Count(
+                'conversations',
+                filter=Q(conversations__is_active=True, conversations__requires_attention=True)
+            ),
+            today_conversations=Count('conversations', filter=Q(conversations__started_at__date=today)),
+            # Maintained by Message.save(), so no scan of the message table
+            total_messages=Coalesce(Sum('conversations__total_messages'), 0),
+        )
+        stats['today_messages'] = Message.objects.filter(
+            conversation__website__owner_id=owner_id,
+            timestamp__date=today
+        ).count()
+        return stats
+    
+    @classmethod
+    def get(cls, owner_id):
+        """Return the dashboard counters for an owner"""
+        from django.core.cache import cache
+        from django.utils import timezone
         
-        # Notify website owner
-        group_name = f'dashboard_{conversation.website.owner.id}'
+        today = timezone.now().date()
+        keys = cls._keys(owner_id, today)
+        cached = cache.get_many(keys)
+        if len(cached) == len(keys):
+            return {keys[key]: value for key, value in cached.items()}
         
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            {
-                'type': 'new_conversation',
-                'conversation': {
-                    'id': str(conversation.id),
-                    'website_name': conversation.website.name,
-                    'started_at': conversation.started_at.isoformat(),
-                    'user_identifier': conversation.user_identifier,
-                },
-                'website_id': str(conversation.website.id)
-            }
+        stats = cls.compute(owner_id, today)
+        cache.set_many(
+            {key: stats[field] for key, field in keys.items()},
+            getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 60)
         )
+        return stats
+    
+    @classmethod
+    def record_activity(cls, owner_id, conversations=0, messages=0):
+        """Apply new conversations/messages to cached counters; cold caches are left alone"""
+        from django.core.cache import cache
+        from django.utils import timezone
+        
+        prefix = f'{cls.KEY_PREFIX}:{owner_id}'
+        today = timezone.now().date()
+        deltas = {}
+        if conversations:
+            deltas.update({
+                f'{prefix}:total_conversations': conversations,
+                f'{prefix}:active_conversations': conversations,
+                f'{prefix}:{today}:today_conversations': conversations,
+            })
+        if messages:
+            deltas.update({
+                f'{prefix}:total_messages': messages,
+                f'{prefix}:{today}:today_messages': messages,
+            })
+        for key, delta in deltas.items():
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                # Not cached (or expired); the next read recomputes it
+                pass
+    
+    @classmethod
+    def invalidate(cls, owner_id):
+        from django.core.cache import cache
+        from django.utils import timezone
+        
+        cache.delete_many(list(cls._keys(owner_id, timezone.now().date())))
+
+
+class TimeSeriesService:
+    """Bucketed time-series aggregation with a constant number of queries per range"""
+    
+    GRANULARITIES = ('hour', 'day', 'week')
+    # Longest range per granularity, which bounds the number of buckets
+    MAX_DAYS = {'hour': 31, 'day': 730, 'week': 3650}
+    
+    @staticmethod
+    def get_buckets(days, granularity='day'):
+        """Return the aware bucket start times covering the last `days` days, oldest first
+        
+        `days` is clamped to 1..MAX_DAYS[granularity].
+        """
+        from datetime import datetime, time, timedelta
+        from django.utils import timezone
+        
+        if granularity not in TimeSeriesService.GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        
+        days = min(max(int(days), 1), TimeSeriesService.MAX_DAYS[granularity])
+        now = timezone.localtime()
+        
+        if granularity == 'hour':
+            current = now.replace(minute=0, second=0, microsecond=0)
+            return [current - timedelta(hours=i) for i in reversed(range(days * 24))]
+        
+        today = now.date()
+        if granularity == 'day':
+            dates = [today - timedelta(days=i) for i in reversed(range(days))]
+        else:
+            this_week = today - timedelta(days=today.weekday())
+            weeks = (days + 6) // 7
+            dates = [this_week - timedelta(weeks=i) for i in reversed(range(weeks))]
+        
+        return [timezone.make_aware(datetime.combine(date, time.min)) for date in dates]
     
     @staticmethod
-    def notify_new_message(message):
-        """Notify dashboard about new message"""
-        from channels.layers import get_channel_layer
-        from asgiref.sync import async_to_sync
+    def aggregate(queryset, field, buckets, granularity='day', **aggregates):
+        """Group `queryset` by `field` truncated to `granularity` in one query.
+        
+        Returns a dict mapping each bucket start to a dict of aggregate values,
+        zero-filled for buckets without rows.
+        """
+        from datetime import timedelta
+        from django.db.models import Count
+        from django.db.models.functions import Trunc
+        
+        if not aggregates:
+            aggregates = {'count': Count('pk')}
         
-        channel_layer = get_channel_layer()
+        step = timedelta(hours=1) if granularity == 'hour' else timedelta(days=7 if granularity == 'week' else 1)
+        # Plain range filters keep the (website, started_at)/(timestamp) indexes usable
+        rows = queryset.filter(**{
+            f'{field}__gte': buckets[0],
+            f'{field}__lt': buckets[-1] + step,
+        }).annotate(
+            bucket=Trunc(field, granularity)
+        ).values('bucket').annotate(**aggregates).order_by()
+        
+        series = {bucket: {name: 0 for name in aggregates} for bucket in buckets}
+        for row in rows:
+            bucket = row.pop('bucket')
+            if bucket in series:
+                series[bucket] = row
+        return series
+    
+    @staticmethod
+    def format_bucket(bucket, granularity='day'):
+        """Label a bucket the way the charts expect it"""
+        if granularity == 'hour':
+            return bucket.isoformat()
+        return bucket.date().isoformat()
+    
+    @staticmethod
+    def get_activity_series(conversations, messages, days=30, granularity='day'):
+        """Conversations, visitors and messages per bucket for pre-filtered querysets"""
+        from django.db.models import Count
         
-        # Notify website owner
-        group_name = f'dashboard_{message.conversation.website.owner.id}'
+        buckets = TimeSeriesService.get_buckets(days, granularity)
+        conversation_series = TimeSeriesService.aggregate(
+            conversations, 'started_at', buckets, granularity,
+            conversations=Count('pk'),
+            visitors=Count('user_identifier', distinct=True),
+        )
+        message_series = TimeSeriesService.aggregate(
+            messages, 'timestamp', buckets, granularity,
+            messages=Count('pk'),
+        )
         
-        async_to_sync(channel_layer.group_send)(
-            group_name,
+        return [
             {
-                'type': 'new_message',
-                'message': {
-                    'id': str(message.id),
-                    'role': message.role,
-                    'content': message.content,
-                    'timestamp': message.timestamp.isoformat(),
-                },
-                'conversation_id': str(message.conversation.id),
-                'website_id': str(message.conversation.website.id)
+                'date': TimeSeriesService.format_bucket(bucket, granularity),
+                'conversations': conversation_series[bucket]['conversations'],
+                'messages': message_series[bucket]['messages'],
+                'visitors': conversation_series[bucket]['visitors'],
             }
+            for bucket in buckets
+        ]
+
+
+class ConversationSummaryService:
+    """Sidebar summaries for conversation lists without loading transcripts"""
+    
+    PREVIEW_CHARS = 100
+    
+    @classmethod
+    def annotate_summaries(cls, conversations):
+        """Annotate the last message and unread count onto a Conversation queryset
+        
+        Everything is computed with correlated subqueries on the
+        (conversation, timestamp) and (conversation, role) indexes, so the list
+        is a single statement no matter how long the transcripts are. Unread
+        means visitor messages newer than the last assistant reply.
+        """
+        from datetime import datetime, timezone as dt_timezone
+        from django.db.models import Count, DateTimeField, OuterRef, Subquery, Value
+        from django.db.models.functions import Coalesce, Substr
+        
+        messages = Message.objects.filter(conversation=OuterRef('pk'))
+        last_message = messages.order_by('-timestamp', '-id')
+        last_reply = messages.filter(role='assistant').order_by('-timestamp')
+        unread = messages.filter(
+            role='user',
+            timestamp__gt=Coalesce(
+                OuterRef('last_reply_at'),
+                Value(datetime(1970, 1, 1, tzinfo=dt_timezone.utc), output_field=DateTimeField()),
+            ),
+        ).values('conversation').annotate(count=Count('pk')).values('count')
+        
+        return conversations.annotate(
+            last_message_preview=Subquery(
+                last_message.annotate(preview=Substr('content', 1, cls.PREVIEW_CHARS)).values('preview')[:1]
+            ),
+            last_message_role=Subquery(last_message.values('role')[:1]),
+            last_message_at=Subquery(last_message.values('timestamp')[:1]),
+            last_reply_at=Subquery(last_reply.values('timestamp')[:1]),
+        ).annotate(
+            unread_count=Coalesce(Subquery(unread), 0),
         )
 
 
-##################################################################################################
+class ConversationSearchService:
+    """Full-text search over message content, returning ranked snippets
+    
+    On PostgreSQL this matches the trigger-maintained search_vector column
+    (GIN indexed, see migration 0006) with websearch_to_tsquery, ranks with
+    ts_rank_cd and builds snippets with ts_headline. Other databases fall
+    back to case-insensitive substring matching, newest first. Pages are
+    keyset-paginated with an opaque cursor over (rank, id) or (timestamp, id).
+    """
+    
+    CONFIG = 'english'  # Must match the text search config used by the trigger
+    PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+    SNIPPET_CHARS = 80
+    
+    # Highlight sentinels, swapped for <mark> after the snippet is HTML-escaped
+    START_SEL = '\x02'
+    STOP_SEL = '\x03'
+    
+    RESULT_FIELDS = (
+        'id', 'conversation_id', 'conversation__website_id', 'conversation__website__name',
+        'conversation__user_identifier', 'role', 'timestamp',
+    )
+    
+    @classmethod
+    def search(cls, messages, query, cursor=None, limit=PAGE_SIZE):
+        """Search a Message queryset; returns (hits, next_cursor)"""
+        limit = max(1, min(limit, cls.MAX_PAGE_SIZE))
+        if connection.vendor == 'postgresql':
+            hits = cls._search_postgresql(messages, query, cursor, limit)
+        else:
+            hits = cls._search_fallback(messages, query, cursor, limit)
+        
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            last = hits[-1]
+            key = last['rank'] if connection.vendor == 'postgresql' else last['timestamp'].isoformat()
+            next_cursor = encode_cursor(key, last['id'])
+        return [cls._format_hit(hit) for hit in hits], next_cursor
+    
+    @classmethod
+    def _search_postgresql(cls, messages, query, cursor, limit):
+        search_query = SearchQuery(query, search_type='websearch', config=cls.CONFIG)
+        queryset = messages.alias(
+            document=RawSQL('"chatbot_message"."search_vector"', [], output_field=SearchVectorField())
+        ).filter(document=search_query).annotate(
+            # float8 so the rank round-trips through the cursor exactly
+            rank=Cast(SearchRank('document', search_query, cover_density=True), FloatField()),
+            snippet=SearchHeadline(
+                'content', search_query, config=cls.CONFIG,
+                start_sel=cls.START_SEL, stop_sel=cls.STOP_SEL,
+                max_words=30, min_words=10, max_fragments=2,
+            ),
+        )
+        if cursor:
+            rank, last_id = decode_cursor(cursor, 2)
+            if isinstance(rank, bool) or not isinstance(rank, (int, float)):
+                raise InvalidCursor('Invalid cursor')
+            last_id = cls._cursor_id(last_id)
+            queryset = queryset.filter(Q(rank__lt=rank) | Q(rank=rank, id__gt=last_id))
+        return list(
+            queryset.order_by('-rank', 'id').values(*cls.RESULT_FIELDS, 'rank', 'snippet')[:limit + 1]
+        )
+    
+    @classmethod
+    def _search_fallback(cls, messages, query, cursor, limit):
+        terms = query.split()
+        queryset = messages
+        for term in terms:
+            queryset = queryset.filter(content__icontains=term)
+        if cursor:
+            timestamp, last_id = decode_cursor(cursor, 2)
+            timestamp = parse_datetime(timestamp) if isinstance(timestamp, str) else None
+            if timestamp is None:
+                raise InvalidCursor('Invalid cursor')
+            last_id = cls._cursor_id(last_id)
+            queryset = queryset.filter(
+                Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=last_id)
+            )
+        
+        hits = list(queryset.order_by('-timestamp', '-id').values(*cls.RESULT_FIELDS, 'content')[:limit + 1])
+        for hit in hits:
+            hit['rank'] = None
+            hit['snippet'] = cls._make_snippet(hit.pop('content'), terms)
+        return hits
+    
+    @staticmethod
+    def _cursor_id(value):
+        """The message id of a decoded cursor; cursors are client input"""
+        try:
+            return uuid.UUID(value)
+        except (AttributeError, TypeError, ValueError):
+            raise InvalidCursor('Invalid cursor')
+    
+    @classmethod
+    def _make_snippet(cls, content, terms):
+        """Window of content around the first matching term, with every term highlighted"""
+        pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+        match = pattern.search(content)
+        start = max(0, match.start() - cls.SNIPPET_CHARS // 2) if match else 0
+        window = content[start:start + cls.SNIPPET_CHARS * 2]
+        snippet = pattern.sub(lambda m: f'{cls.START_SEL}{m.group(0)}{cls.STOP_SEL}', window)
+        if start > 0:
+            snippet = '...' + snippet
+        if start + len(window) < len(content):
+            snippet += '...'
+        return snippet
+    
+    @classmethod
+    def _format_hit(cls, hit):
+        return {
+            'message_id': str(hit['id']),
+            'conversation_id': str(hit['conversation_id']),
+            'website_id': str(hit['conversation__website_id']),
+            'website_name': hit['conversation__website__name'],
+            'user_identifier': hit['conversation__user_identifier'],
+            'role': hit['role'],
+            'timestamp': hit['timestamp'].isoformat(),
+            'rank': hit['rank'],
+            'snippet': escape(hit['snippet']).replace(cls.START_SEL, '<mark>').replace(cls.STOP_SEL, '</mark>'),
+        }
 
 
-# In services.py, update or add NotificationService
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+class NotificationRoute:
+    """Routing data a notification needs, resolved by the caller up front
+    
+    Anything with website_id, website_name and owner_id attributes can be
+    used as a route (the visitor socket passes its ConversationState).
+    """
+    
+    __slots__ = ('website_id', 'website_name', 'owner_id')
+    
+    def __init__(self, website_id, website_name, owner_id):
+        self.website_id = str(website_id)
+        self.website_name = website_name
+        self.owner_id = owner_id
+    
+    @classmethod
+    def for_website(cls, website):
+        return cls(website.id, website.name, website.owner_id)
 
-class NotificationService:
-    @staticmethod
-    def notify_new_message(message):
-        """Notify dashboard about new message"""
+
+class NotificationPublisher:
+    """Fire-and-forget channel layer sends for synchronous callers
+    
+    Events are handed to a background event loop thread, so HTTP views never
+    wait on the channel layer. At most NOTIFICATION_BUFFER_SIZE sends may be
+    in flight; beyond that events are dropped (and counted) rather than
+    queued without bound. With NOTIFICATION_BACKGROUND_PUBLISH off, sends run
+    inline instead.
+    """
+    
+    _lock = threading.Lock()
+    _loop = None
+    _pid = None
+    pending = 0
+    dropped = 0
+    
+    @classmethod
+    def submit(cls, group, event):
+        if not getattr(settings, 'NOTIFICATION_BACKGROUND_PUBLISH', True):
+            try:
+                with metrics.PUBLISH_SECONDS.time(event=event['type']):
+                    async_to_sync(get_channel_layer().group_send)(group, event)
+            except Exception as e:
+                logger.error(f"Error publishing {event['type']} to {group}: {e}")
+            return
+        
+        with cls._lock:
+            if cls.pending >= getattr(settings, 'NOTIFICATION_BUFFER_SIZE', 1000):
+                cls.dropped += 1
+                metrics.NOTIFICATIONS_DROPPED.inc()
+                logger.warning(f"Notification buffer full; dropped {event['type']} for {group}")
+                return
+            cls.pending += 1
+            loop = cls._get_loop()
+        asyncio.run_coroutine_threadsafe(cls._send(group, event), loop)
+    
+    @classmethod
+    async def _send(cls, group, event):
         try:
-            channel_layer = get_channel_layer()
-            conversation = message.conversation
-            
-            async_to_sync(channel_layer.group_send)(
-                f'dashboard_{conversation.website.owner.id}',
-                {
-                    'type': 'send_notification',
-                    'message': {
-                        'type': 'new_message',
-                        'conversation_id': str(conversation.id),
-                        'message': {
-                            'id': str(message.id),
-                            'role': message.role,
-                            'content': message.content,
-                            'timestamp': message.timestamp.isoformat(),
-                            'is_manual': message.is_manual
-                        }
-                    }
-                }
-            )
+            with metrics.PUBLISH_SECONDS.time(event=event['type']):
+                await get_channel_layer().group_send(group, event)
         except Exception as e:
-            logger.error(f"Error sending notification: {e}")
+            logger.error(f"Error publishing {event['type']} to {group}: {e}")
+        finally:
+            with cls._lock:
+                cls.pending -= 1
+    
+    @classmethod
+    def _get_loop(cls):
+        """Start the publisher thread on first use (and again in forked workers)"""
+        if cls._loop is None or cls._pid != os.getpid():
+            cls._loop = asyncio.new_event_loop()
+            cls._pid = os.getpid()
+            cls.pending = 1  # Only the send being submitted survives a fork
+            threading.Thread(
+                target=cls._loop.run_forever, name='notification-publisher', daemon=True
+            ).start()
+        return cls._loop
+    
+    @classmethod
+    def flush(cls, timeout=5.0):
+        """Wait for in-flight sends; returns False if some are still pending after timeout"""
+        deadline = time.monotonic() + timeout
+        while cls.pending and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return not cls.pending
+
+
+atexit.register(NotificationPublisher.flush, 2.0)
 
+
+class NotificationService:
+    """Real-time notifications to dashboards and visitor sockets
+    
+    Every notification has an async entry point (a*) for consumers, which
+    awaits the channel layer directly, and a sync entry point for views and
+    tasks, which publishes fire-and-forget through NotificationPublisher.
+    Callers pass a route (see NotificationRoute) and already-loaded objects,
+    so building events never touches the database. New conversations and
+    messages also update the cached dashboard counters.
+    """
+    
+    @staticmethod
+    def website_group(website_id):
+        """Group joined by every dashboard subscribed to a website"""
+        return f'dashboard_website_{website_id}'
+    
+    @staticmethod
+    def user_group(user_id):
+        """Group joined by every dashboard connection of a user"""
+        return f'dashboard_user_{user_id}'
+    
+    @staticmethod
+    def chat_group(conversation_id):
+        """Group joined by the visitor socket(s) of a conversation"""
+        return f'chat_{conversation_id}'
+    
+    @staticmethod
+    def chat_website_group(website_id):
+        """Group joined by every visitor socket of a website"""
+        return f'chat_website_{website_id}'
+    
+    # Events
+    
+    @staticmethod
+    def encoded(event):
+        """Group event carrying its client frame already encoded
+        
+        The frame (the event plus a timestamp) is serialized once here and
+        every subscribed socket forwards the same text.
+        """
+        frame = {**event, 'timestamp': timezone.now().isoformat()}
+        return {'type': event['type'], 'frame': codec.dumps(frame)}
+    
+    @classmethod
+    def new_message_event(cls, route, message, **extra):
+        conversation_id = str(message.conversation_id)
+        return cls.website_group(route.website_id), cls.encoded({
+            'type': 'new_message',
+            'message': {
+                'id': str(message.id),
+                # None for write-behind messages until their batch is written
+                'seq': message.seq,
+                'content': message.content,
+                'role': message.role,
+                'conversation_id': conversation_id,
+                'timestamp': message.timestamp.isoformat(),
+                'is_manual': message.is_manual,
+                **extra
+            },
+            'conversation_id': conversation_id,
+            'website_id': route.website_id
+        })
+    
+    @classmethod
+    def new_conversation_event(cls, route, conversation):
+        return cls.website_group(route.website_id), cls.encoded({
+            'type': 'new_conversation',
+            'conversation': {
+                'id': str(conversation.id),
+                'website_name': route.website_name,
+                'website_id': route.website_id,
+                'user_identifier': conversation.user_identifier,
+                'started_at': conversation.started_at.isoformat(),
+                'total_messages': conversation.total_messages,
+                'requires_attention': conversation.requires_attention,
+            },
+            'website_id': route.website_id
+        })
+    
+    @staticmethod
+    def chat_message_frame(message, **extra):
+        """The chat_message frame a visitor socket receives for a message"""
+        return {
+            'type': 'chat_message',
+            'message': message.content,
+            'message_id': str(message.id),
+            'seq': message.seq,
+            'role': message.role,
+            'conversation_id': str(message.conversation_id),
+            'timestamp': message.timestamp.isoformat(),
+            'is_manual': message.is_manual,
+            **extra
+        }
+    
+    @classmethod
+    def agent_reply_event(cls, message, agent_id):
+        """An agent's reply, for the visitor socket(s) of its conversation"""
+        return cls.chat_group(message.conversation_id), {
+            **cls.chat_message_frame(message),
+            'type': 'chat_message_from_dashboard',
+            'agent_id': agent_id
+        }
+    
+    @classmethod
+    def conversation_updated_events(cls, route, conversation_id, **updates):
+        """A conversation changed outside its chat sockets
+        
+        Dashboards get the updates; the visitor sockets drop their cached
+        conversation state and reload it on the next frame.
+        """
+        conversation_id = str(conversation_id)
+        return [
+            (cls.chat_group(conversation_id), {
+                'type': 'conversation_updated',
+                'conversation_id': conversation_id
+            }),
+            (cls.website_group(route.website_id), cls.encoded({
+                'type': 'conversation_updated',
+                'conversation_id': conversation_id,
+                'updates': updates
+            })),
+        ]
+    
+    @classmethod
+    def typing_event(cls, route, conversation_id, is_typing, metadata=None):
+        """Visitor typing transition, for the website's dashboards"""
+        return cls.website_group(route.website_id), cls.encoded({
+            'type': 'typing_indicator',
+            'is_typing': is_typing,
+            'conversation_id': str(conversation_id),
+            'user_type': 'visitor',
+            'metadata': metadata or {}
+        })
+    
+    @classmethod
+    def conversation_ended_events(cls, route, conversation_id, reason='agent_ended'):
+        conversation_id = str(conversation_id)
+        return [
+            (cls.chat_group(conversation_id), cls.encoded({
+                'type': 'conversation_ended',
+                'conversation_id': conversation_id,
+                'message': 'This conversation has been ended by an agent.',
+                'reason': reason
+            })),
+            (cls.website_group(route.website_id), cls.encoded({
+                'type': 'conversation_ended',
+                'conversation_id': conversation_id,
+                'website_id': route.website_id,
+                'reason': reason
+            })),
+        ]
+    
+    @classmethod
+    def website_access_changed_events(cls, website, created=False, deleted=False, previous_owner_id=None):
+        """Ownership changes, for the dashboard access caches
+        
+        The owner's connections gain (or refresh) the website, or drop it when
+        it is deleted; other connections subscribed to it drop it. On a
+        transfer the previous owner's connections drop it too, including any
+        that unsubscribed from the website's group.
+        """
+        event = {
+            'type': 'website_access_changed',
+            'website_id': str(website.id),
+            'website_name': website.name,
+            'owner_id': website.owner_id,
+            'deleted': deleted
+        }
+        groups = [cls.user_group(website.owner_id)]
+        if previous_owner_id is not None and previous_owner_id != website.owner_id:
+            groups.append(cls.user_group(previous_owner_id))
+        if not created:
+            groups.append(cls.website_group(website.id))
+        return [(group, event) for group in groups]
+    
+    @classmethod
+    def website_updated_event(cls, website):
+        """A website was edited or deleted, for its visitor sockets' cached settings"""
+        return cls.chat_website_group(website.id), {'type': 'website_updated', 'website_id': str(website.id)}
+    
+    # Async entry points
+    
     @staticmethod
-    def notify_new_conversation(conversation):
-        """Notify dashboard about new conversation"""
+    async def apublish(group, event):
+        with metrics.PUBLISH_SECONDS.time(event=event['type']):
+            await get_channel_layer().group_send(group, event)
+    
+    @classmethod
+    async def anotify_new_message(cls, route, message, **extra):
+        await sync_to_async(DashboardStatsService.record_activity)(route.owner_id, messages=1)
+        await cls.apublish(*cls.new_message_event(route, message, **extra))
+    
+    @classmethod
+    async def anotify_agent_reply(cls, message, agent_id):
+        await sync_to_async(ReplayBuffer.record)(message.conversation_id, cls.chat_message_frame(message))
+        await cls.apublish(*cls.agent_reply_event(message, agent_id))
+    
+    @classmethod
+    async def anotify_new_conversation(cls, route, conversation):
+        await sync_to_async(DashboardStatsService.record_activity)(route.owner_id, conversations=1)
+        await cls.apublish(*cls.new_conversation_event(route, conversation))
+    
+    @classmethod
+    async def anotify_conversation_updated(cls, route, conversation_id, **updates):
+        for group, event in cls.conversation_updated_events(route, conversation_id, **updates):
+            await cls.apublish(group, event)
+    
+    @classmethod
+    async def anotify_conversation_ended(cls, route, conversation_id, reason='agent_ended'):
+        for group, event in cls.conversation_ended_events(route, conversation_id, reason):
+            await cls.apublish(group, event)
+    
+    # Sync entry points (fire-and-forget)
+    
+    @staticmethod
+    def publish(group, event):
+        NotificationPublisher.submit(group, event)
+    
+    @classmethod
+    def notify_new_message(cls, route, message, **extra):
+        DashboardStatsService.record_activity(route.owner_id, messages=1)
+        cls.publish(*cls.new_message_event(route, message, **extra))
+    
+    @classmethod
+    def notify_agent_reply(cls, message, agent_id):
+        ReplayBuffer.record(message.conversation_id, cls.chat_message_frame(message))
+        cls.publish(*cls.agent_reply_event(message, agent_id))
+    
+    @classmethod
+    def notify_new_conversation(cls, route, conversation):
+        DashboardStatsService.record_activity(route.owner_id, conversations=1)
+        cls.publish(*cls.new_conversation_event(route, conversation))
+    
+    @classmethod
+    def notify_conversation_updated(cls, route, conversation_id, **updates):
+        for group, event in cls.conversation_updated_events(route, conversation_id, **updates):
+            cls.publish(group, event)
+    
+    @classmethod
+    def notify_conversation_ended(cls, route, conversation_id, reason='agent_ended'):
+        for group, event in cls.conversation_ended_events(route, conversation_id, reason):
+            cls.publish(group, event)
+    
+    @classmethod
+    def notify_website_updated(cls, website):
+        cls.publish(*cls.website_updated_event(website))
+    
+    @classmethod
+    def notify_website_access_changed(cls, website, created=False, deleted=False, previous_owner_id=None):
+        for group, event in cls.website_access_changed_events(website, created, deleted, previous_owner_id):
+            cls.publish(group, event)
+
+
+class ReplayBuffer:
+    """Recent visitor-facing messages per conversation, for resuming dropped sockets
+    
+    Every assistant message sent to a visitor socket (AI and agent replies)
+    is recorded as its chat_message frame in a ring of
+    CHAT_REPLAY_BUFFER_SIZE slots in the shared cache: an atomic counter
+    numbers the frames and frame n lives in slot n % size, so any process
+    can record and any process can replay. A resume walks back from the
+    newest frame to the client's last seen message; when the ring cannot
+    show an unbroken run back to it (expired or evicted slots, a write still
+    in flight, a cursor older than the ring) the messages are read from the
+    database instead, along the unique (conversation, seq) index.
+    """
+    
+    KEY_PREFIX = 'chat_replay'
+    
+    @classmethod
+    def _head_key(cls, conversation_id):
+        return f'{cls.KEY_PREFIX}:{conversation_id}:head'
+    
+    @classmethod
+    def _slot_key(cls, conversation_id, number, size):
+        return f'{cls.KEY_PREFIX}:{conversation_id}:{number % size}'
+    
+    @classmethod
+    def record(cls, conversation_id, frame):
+        """Append a frame; its message must already be saved"""
+        from django.core.cache import cache
+        
+        size = getattr(settings, 'CHAT_REPLAY_BUFFER_SIZE', 50)
+        if not size:
+            return
+        timeout = getattr(settings, 'CHAT_REPLAY_BUFFER_TTL', 3600)
+        head_key = cls._head_key(conversation_id)
         try:
-            channel_layer = get_channel_layer()
-            
-            async_to_sync(channel_layer.group_send)(
-                f'dashboard_{conversation.website.owner.id}',
-                {
-                    'type': 'send_notification',
-                    'message': {
-                        'type': 'new_conversation',
-                        'conversation': {
-                            'id': str(conversation.id),
-                            'website': {
-                                'id': str(conversation.website.id),
-                                'name': conversation.website.name
-                            },
-                            'user_identifier': conversation.user_identifier,
-                            'started_at': conversation.started_at.isoformat(),
-                            'total_messages': conversation.messages.count(),
-                            'requires_attention': conversation.requires_attention
-                        }
-                    }
-                }
-            )
+            cache.add(head_key, 0, timeout)
+            number = cache.incr(head_key)
+            # The counter outlives every slot, so numbers are never reused while slots remain
+            cache.touch(head_key, timeout)
+            cache.set(cls._slot_key(conversation_id, number, size), (number, frame), timeout)
         except Exception as e:
-            logger.error(f"Error sending conversation notification: {e}")
+            # Resumes fall back to the database
+            logger.warning(f"Could not record replay frame for conversation {conversation_id}: {e}")
+    
+    @classmethod
+    def since(cls, conversation_id, last_seq=None, last_message_id=None):
+        """Frames recorded after the cursor, oldest first, or None if the ring cannot tell"""
+        from django.core.cache import cache
+        
+        size = getattr(settings, 'CHAT_REPLAY_BUFFER_SIZE', 50)
+        if not size:
+            return None
+        head = cache.get(cls._head_key(conversation_id))
+        if not head:
+            return None
+        numbers = range(head, max(head - size, 0), -1)
+        keys = [cls._slot_key(conversation_id, number, size) for number in numbers]
+        slots = cache.get_many(keys)
+        frames = []
+        for number, key in zip(numbers, keys):
+            entry = slots.get(key)
+            if entry is None or entry[0] != number:
+                return None
+            frame = entry[1]
+            if last_seq is not None:
+                if frame.get('seq') is None:
+                    return None
+                if frame['seq'] <= last_seq:
+                    break
+            elif frame['message_id'] == last_message_id:
+                break
+            frames.append(frame)
+        else:
+            return None
+        frames.reverse()
+        return frames
+    
+    @staticmethod
+    def missed_messages(conversation_id, limit, last_seq=None, last_message_id=None):
+        """Assistant messages after the cursor from the database, or None for an unknown message id"""
+        if last_seq is None:
+            last_seq = Message.objects.filter(
+                conversation_id=conversation_id, id=last_message_id
+            ).values_list('seq', flat=True).first()
+            if last_seq is None:
+                return None
+        return list(
+            Message.objects.filter(conversation_id=conversation_id, seq__gt=last_seq)
+            .exclude(role='user')
+            .order_by('seq')[:limit + 1]
+        )
+    
+    @staticmethod
+    def history(website_id, conversation_id, limit):
+        """The latest `limit` frames of a conversation, oldest first, for an incomplete resume"""
+        messages = list(
+            Message.objects.filter(
+                conversation_id=conversation_id, conversation__website_id=website_id,
+                conversation__website__is_active=True
+            ).exclude(role='system').order_by('-seq')[:limit]
+        )
+        messages.reverse()
+        return [NotificationService.chat_message_frame(message) for message in messages]
+    
+    @classmethod
+    def resume(cls, conversation_id, last_seq=None, last_message_id=None):
+        """Return (frames, source, complete) for a reconnecting visitor
+        
+        The cursor is the seq of the last seen message or, from older
+        clients, its id. complete is False when the id is unknown or more
+        than CHAT_RESUME_MAX_MESSAGES were missed; the client then reloads
+        the history over HTTP.
+        """
+        frames = cls.since(conversation_id, last_seq, last_message_id)
+        if frames is not None:
+            return frames, 'buffer', True
+        
+        limit = getattr(settings, 'CHAT_RESUME_MAX_MESSAGES', 200)
+        messages = cls.missed_messages(conversation_id, limit, last_seq, last_message_id)
+        if messages is None:
+            return [], 'database', False
+        frames = [NotificationService.chat_message_frame(message) for message in messages[:limit]]
+        return frames, 'database', len(messages) <= limit
+
 
+class MessageWriteBehind:
+    """Batched, asynchronous persistence of chat messages (CHAT_WRITE_BEHIND)
+    
+    Consumers enqueue unsaved Message instances and carry on; one writer task
+    per event loop inserts them with bulk_create every
+    CHAT_WRITE_BEHIND_INTERVAL seconds, together with the conversation
+    counter and attention updates. Message ids are assigned up front (by the
+    client where it sends one). A client id is claimed in the shared cache
+    before its message is published, so a retried frame is dropped instead
+    of being answered twice; a retried batch skips rows that already exist
+    in the same conversation, and an id already taken by another
+    conversation's message is replaced with a fresh one. Failed batches are
+    retried with backoff, then written row by row; flush() drains the queue
+    and anything left at exit is written synchronously.
+    
+    The stored timestamp is the insert time, a few milliseconds after the
+    one published to dashboards.
+    """
+    
+    _writers = weakref.WeakKeyDictionary()
+    
+    def __init__(self):
+        self.interval = getattr(settings, 'CHAT_WRITE_BEHIND_INTERVAL', 0.005)
+        self.batch_size = getattr(settings, 'CHAT_WRITE_BEHIND_BATCH_SIZE', 500)
+        self.retries = getattr(settings, 'CHAT_WRITE_BEHIND_RETRIES', 5)
+        self.pending = []  # (message, requires_attention)
+        self.task = None
+    
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'CHAT_WRITE_BEHIND', False)
+    
+    @classmethod
+    def for_loop(cls):
+        """The writer for the running event loop"""
+        loop = asyncio.get_running_loop()
+        writer = cls._writers.get(loop)
+        if writer is None:
+            writer = cls._writers[loop] = cls()
+        return writer
+    
     @staticmethod
-    def notify_conversation_updated(conversation):
-        """Notify dashboard about conversation update"""
+    async def claim(conversation_id, message_id):
+        """Whether a client message id is new in its conversation (False for a retried frame)"""
+        from django.core.cache import cache
+        
+        key = f'chat_message_id:{conversation_id}:{message_id}'
         try:
-            channel_layer = get_channel_layer()
-            
-            async_to_sync(channel_layer.group_send)(
-                f'dashboard_{conversation.website.owner.id}',
-                {
-                    'type': 'send_notification',
-                    'message': {
-                        'type': 'conversation_updated',
-                        'conversation_id': str(conversation.id),
-                        'requires_attention': conversation.requires_attention
-                    }
-                }
-            )
+            return await cache.aadd(key, 1, getattr(settings, 'CHAT_WRITE_BEHIND_CLAIM_TTL', 3600))
         except Exception as e:
-            logger.error(f"Error sending conversation update: {e}")
+            # The batch writer still skips ids already stored in the conversation
+            logger.warning(f"Could not claim message id {message_id}: {e}")
+            return True
+    
+    def enqueue(self, message, requires_attention=False):
+        """Queue an unsaved message; its conversation's in-memory counters are bumped now"""
+        message.conversation.count_messages(message.role)
+        if requires_attention:
+            message.conversation.requires_attention = True
+        self.pending.append((message, requires_attention))
+        metrics.WRITE_BEHIND_PENDING.inc()
+        if self.task is None:
+            self.task = asyncio.ensure_future(self._run())
+    
+    async def flush(self):
+        """Wait until everything queued so far is written"""
+        while self.task is not None:
+            await asyncio.shield(self.task)
+    
+    async def _run(self):
+        try:
+            while self.pending:
+                await asyncio.sleep(self.interval)
+                batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+                await self._write(batch)
+                metrics.WRITE_BEHIND_PENDING.dec(len(batch))
+        finally:
+            self.task = None
+    
+    async def _write(self, batch):
+        for attempt in range(self.retries):
+            try:
+                await database_sync_to_async(self.write_batch)(batch)
+                return
+            except Exception as e:
+                logger.warning(f"Write-behind batch of {len(batch)} failed (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(min(self.interval * 2 ** attempt, 1.0))
+        
+        # Isolate the rows that keep failing rather than losing the whole batch
+        for entry in batch:
+            try:
+                await database_sync_to_async(self.write_batch)([entry])
+            except Exception as e:
+                logger.error(f"Dropping message {entry[0].id} for conversation {entry[0].conversation_id}: {e}")
+    
+    @staticmethod
+    def write_batch(batch):
+        """Insert a batch idempotently and apply its counter and attention updates"""
+        messages = {}
+        for message, _ in batch:
+            messages.setdefault((message.id, message.conversation_id), message)
+        with transaction.atomic():
+            stored = set(Message.objects.filter(id__in={key[0] for key in messages}).values_list('id', 'conversation_id'))
+            taken = {message_id for message_id, _ in stored}
+            new = []
+            for key, message in messages.items():
+                if key in stored:
+                    continue  # Written by an earlier attempt
+                if message.id in taken:
+                    # Client-supplied id of another conversation's message
+                    logger.warning(f"Message id {message.id} is taken; saving the message under a new id")
+                    message.id = uuid.uuid4()
+                taken.add(message.id)
+                new.append(message)
+            
+            # One UPDATE per conversation numbers its messages and bumps its counters
+            # (numbers from a rolled-back attempt are replaced)
+            by_conversation = defaultdict(list)
+            for message in new:
+                by_conversation[message.conversation_id].append(message)
+            for conversation_id, conversation_messages in by_conversation.items():
+                roles = Counter(message.role for message in conversation_messages)
+                last = Conversation.reserve_message_seqs(conversation_id, len(conversation_messages), roles)
+                for seq, message in enumerate(conversation_messages, start=last - len(conversation_messages) + 1):
+                    message.seq = seq
+            Message.objects.bulk_create(new)
+            
+            attention = {message.conversation_id for message, requires_attention in batch if requires_attention}
+            if attention:
+                Conversation.objects.filter(pk__in=attention).update(requires_attention=True)
+    
+    @classmethod
+    def flush_all(cls):
+        """Synchronously write whatever is still queued (process exit)"""
+        for writer in list(cls._writers.values()):
+            batch, writer.pending = writer.pending, []
+            metrics.WRITE_BEHIND_PENDING.dec(len(batch))
+            if batch:
+                try:
+                    cls.write_batch(batch)
+                except Exception as e:
+                    logger.error(f"Lost {len(batch)} queued messages at exit: {e}")
+
+
+atexit.register(MessageWriteBehind.flush_all)
 
+
+class ConversationArchiveService:
+    """Move the messages of old, ended conversations to compressed JSONL files
+    
+    A conversation is archived once it ended more than its website's
+    archive_after_days (default CHAT_ARCHIVE_AFTER_DAYS, unset by default)
+    ago. Each batch writes one file to the CHAT_ARCHIVE_STORAGE storage in
+    which every conversation is its own gzip member: a header line, then
+    one line per message in seq order. The file reads with zcat, and a
+    single transcript is read back from its offset and length
+    (ConversationArchive).
+    
+    Batches run in a transaction that locks the conversation rows (so no
+    message can be added while they are copied), writes the file, records
+    the archive rows and deletes the messages. A run stopped at any point
+    leaves each conversation either untouched, to be picked up by the next
+    run, or fully archived; at worst an unreferenced file remains. The
+    conversation rows and their counters stay.
+    """
+    
+    MESSAGE_FIELDS = (
+        'id', 'seq', 'role', 'content', 'timestamp', 'is_error', 'is_welcome',
+        'ai_model_used', 'response_time_ms', 'tokens_used', 'is_manual',
+    )
+    
     @staticmethod
-    def notify_dashboard_message(message):
-        """Notify dashboard about manual message (for UI update only)"""
-        try:
-            channel_layer = get_channel_layer()
-            conversation = message.conversation
+    def storage():
+        from django.core.files.storage import storages
+        
+        return storages[getattr(settings, 'CHAT_ARCHIVE_STORAGE', 'chat_archive')]
+    
+    @staticmethod
+    def cutoffs(now, website_id=None, days=None):
+        """(website_id, cutoff) for every website with a retention period"""
+        from datetime import timedelta
+        
+        default = getattr(settings, 'CHAT_ARCHIVE_AFTER_DAYS', None)
+        websites = Website.objects.order_by('pk')
+        if website_id:
+            websites = websites.filter(pk=website_id)
+        for pk, own_days in websites.values_list('pk', 'archive_after_days'):
+            after = days if days is not None else own_days if own_days is not None else default
+            if after is not None:
+                yield pk, now - timedelta(days=after)
+    
+    @staticmethod
+    def candidates(website_id, cutoff):
+        """Ended, unarchived conversations of a website that ended before cutoff, oldest first"""
+        return Conversation.objects.filter(
+            website_id=website_id, is_active=False, ended_at__lt=cutoff, archive__isnull=True
+        ).order_by('ended_at', 'pk')
+    
+    @classmethod
+    def run(cls, batch_size=200, max_batches=None, website_id=None, days=None, dry_run=False):
+        """Archive due conversations in batches; returns counts for the run"""
+        now = timezone.now()
+        stats = {'conversations': 0, 'messages': 0, 'files': 0}
+        for site_id, cutoff in cls.cutoffs(now, website_id, days):
+            candidates = cls.candidates(site_id, cutoff)
+            if dry_run:
+                stats['conversations'] += candidates.count()
+                continue
+            while max_batches is None or stats['files'] < max_batches:
+                archived, messages = cls.archive_batch(candidates, batch_size)
+                if not archived:
+                    break
+                stats['conversations'] += archived
+                stats['messages'] += messages
+                stats['files'] += 1
+        return stats
+    
+    @classmethod
+    def archive_batch(cls, candidates, batch_size):
+        """Archive the next batch of candidates; returns (conversations, messages) archived"""
+        with transaction.atomic():
+            conversations = list(
+                candidates.select_for_update(of=('self',)).only(
+                    'id', 'website_id', 'user_identifier', 'started_at', 'ended_at', 'total_messages'
+                )[:batch_size]
+            )
+            if not conversations:
+                return 0, 0
+            ids = [conversation.pk for conversation in conversations]
+            transcripts = defaultdict(list)
+            rows = Message.objects.filter(conversation_id__in=ids).order_by('conversation_id', 'seq')
+            for row in rows.values('conversation_id', *cls.MESSAGE_FIELDS).iterator(chunk_size=2000):
+                # isoformat() keeps the microseconds the JSON encoder would drop
+                row['timestamp'] = row['timestamp'].isoformat()
+                transcripts[row.pop('conversation_id')].append(row)
             
-            async_to_sync(channel_layer.group_send)(
-                f'dashboard_{conversation.website.owner.id}',
-                {
-                    'type': 'send_notification',
-                    'message': {
-                        'type': 'dashboard_message',
-                        'conversation_id': str(conversation.id),
-                        'message': {
-                            'id': str(message.id),
-                            'role': message.role,
-                            'content': message.content,
-                            'timestamp': message.timestamp.isoformat(),
-                            'is_manual': message.is_manual
-                        }
-                    }
-                }
+            members, archives, offset = [], [], 0
+            for conversation in conversations:
+                lines = [codec.dumps({
+                    'conversation_id': conversation.pk,
+                    'website_id': conversation.website_id,
+                    'user_identifier': conversation.user_identifier,
+                    'started_at': conversation.started_at.isoformat(),
+                    'ended_at': conversation.ended_at.isoformat(),
+                    'total_messages': conversation.total_messages,
+                })]
+                lines.extend(codec.dumps(row) for row in transcripts[conversation.pk])
+                member = gzip.compress(('\n'.join(lines) + '\n').encode())
+                members.append(member)
+                archives.append(ConversationArchive(
+                    conversation=conversation, offset=offset, length=len(member),
+                    message_count=len(lines) - 1
+                ))
+                offset += len(member)
+            
+            from django.core.files.base import ContentFile
+            
+            now = timezone.now()
+            name = cls.storage().save(
+                f'{now:%Y/%m}/{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.jsonl.gz', ContentFile(b''.join(members))
             )
-        except Exception as e:
-            logger.error(f"Error sending dashboard message notification: {e}")
\ No newline at end of file
+            for archive in archives:
+                archive.file = name
+            ConversationArchive.objects.bulk_create(archives)
+            Message.objects.filter(conversation_id__in=ids).delete()
+        
+        message_count = sum(archive.message_count for archive in archives)
+        logger.info(f"Archived {len(archives)} conversations ({message_count} messages) to {name}")
+        return len(archives), message_count
+    
+    @classmethod
+    def read(cls, archive):
+        """(header, message rows) of an archived conversation"""
+        with cls.storage().open(archive.file, 'rb') as handle:
+            handle.seek(archive.offset)
+            member = handle.read(archive.length)
+        header, *rows = [codec.loads(line) for line in gzip.decompress(member).decode().splitlines()]
+        return header, rows
+    
+    @classmethod
+    def load_messages(cls, archive):
+        """The archived messages as unsaved Message instances, in seq order"""
+        _, rows = cls.read(archive)
+        return [
+            Message(conversation_id=archive.conversation_id, **{**row, 'timestamp': parse_datetime(row['timestamp'])})
+            for row in rows
+        ]
+
+
+class _Echo:
+    """File-like object for csv.writer that hands each written line back"""
+    
+    def write(self, value):
+        return value
+
+
+class TranscriptExportService:
+    """Stream transcripts and analytics as CSV or JSONL in constant memory
+    
+    Datasets:
+    - messages: one row per message, grouped by conversation in seq order,
+      with archived transcripts read back from their archive files
+    - conversations: one row per conversation with its counters
+    - analytics: the daily ChatbotAnalytics rows
+    
+    Rows come from .iterator(chunk_size=CHUNK_SIZE), which uses a server-side
+    cursor on PostgreSQL, and are encoded into ~64 KB pieces, optionally
+    gzipped on the fly, for a StreamingHttpResponse.
+    """
+    
+    DATASETS = ('messages', 'conversations', 'analytics')
+    FORMATS = ('csv', 'jsonl')
+    CHUNK_SIZE = 2000
+    BUFFER_SIZE = 64 * 1024
+    
+    COLUMNS = {
+        'messages': (
+            'conversation_id', 'website_id', 'user_identifier', 'seq', 'id', 'timestamp', 'role', 'content',
+            'is_manual', 'is_error', 'is_welcome', 'ai_model_used', 'response_time_ms', 'tokens_used',
+        ),
+        'conversations': (
+            'id', 'website_id', 'website_name', 'user_identifier', 'started_at', 'ended_at', 'is_active',
+            'requires_attention', 'total_messages', 'user_messages', 'bot_messages', 'archived',
+        ),
+        'analytics': (
+            'website_id', 'date', 'total_conversations', 'total_messages', 'unique_visitors',
+            'avg_conversation_length', 'avg_response_time_ms', 'conversations_with_multiple_messages',
+            'bounce_rate',
+        ),
+    }
+    
+    @classmethod
+    def rows(cls, dataset, conversations, analytics):
+        """Row dicts of a dataset; conversations and analytics are already filtered querysets"""
+        if dataset == 'messages':
+            return cls.message_rows(conversations)
+        if dataset == 'conversations':
+            return cls.conversation_rows(conversations)
+        return analytics.order_by('website_id', 'date').values(*cls.COLUMNS['analytics']).iterator(
+            chunk_size=cls.CHUNK_SIZE
+        )
+    
+    @classmethod
+    def conversation_rows(cls, conversations):
+        rows = conversations.order_by('started_at', 'id').values(
+            'id', 'website_id', 'user_identifier', 'started_at', 'ended_at', 'is_active', 'requires_attention',
+            'total_messages', 'user_messages', 'bot_messages', 'website__name', 'archive__file',
+        )
+        for row in rows.iterator(chunk_size=cls.CHUNK_SIZE):
+            row['website_name'] = row.pop('website__name')
+            row['archived'] = row.pop('archive__file') is not None
+            yield row
+    
+    @classmethod
+    def message_rows(cls, conversations):
+        """Live messages merged with archived transcripts, both ordered by conversation id
+        
+        Ordering by (conversation, seq) lets PostgreSQL walk msg_conv_seq_uniq
+        instead of sorting the whole export before the first row.
+        """
+        fields = ('conversation__website_id', 'conversation__user_identifier', *ConversationArchiveService.MESSAGE_FIELDS)
+        live = Message.objects.filter(conversation__in=conversations).order_by('conversation_id', 'seq')
+        live = iter(live.values('conversation_id', *fields).iterator(chunk_size=cls.CHUNK_SIZE))
+        archived = conversations.filter(archive__isnull=False).order_by('id').values(
+            'id', 'website_id', 'user_identifier', 'archive__file', 'archive__offset', 'archive__length'
+        )
+        
+        pending = next(live, None)
+        for conversation in archived.iterator(chunk_size=cls.CHUNK_SIZE):
+            while pending is not None and pending['conversation_id'] < conversation['id']:
+                yield cls.live_row(pending)
+                pending = next(live, None)
+            archive = ConversationArchive(
+                conversation_id=conversation['id'], file=conversation['archive__file'],
+                offset=conversation['archive__offset'], length=conversation['archive__length'],
+            )
+            _, rows = ConversationArchiveService.read(archive)
+            for row in rows:
+                yield {
+                    'conversation_id': conversation['id'], 'website_id': conversation['website_id'],
+                    'user_identifier': conversation['user_identifier'], **row,
+                }
+            # Messages saved after the conversation was archived follow its transcript
+            while pending is not None and pending['conversation_id'] == conversation['id']:
+                yield cls.live_row(pending)
+                pending = next(live, None)
+        while pending is not None:
+            yield cls.live_row(pending)
+            pending = next(live, None)
+    
+    @staticmethod
+    def live_row(row):
+        row['website_id'] = row.pop('conversation__website_id')
+        row['user_identifier'] = row.pop('conversation__user_identifier')
+        return row
+    
+    @classmethod
+    def encode(cls, dataset, rows, file_format):
+        """Encode rows as CSV or JSONL text lines"""
+        columns = cls.COLUMNS[dataset]
+        if file_format == 'jsonl':
+            for row in rows:
+                yield codec.dumps({column: cls.value(row[column]) for column in columns}) + '\n'
+            return
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([cls.value(row[column]) for column in columns])
+    
+    @staticmethod
+    def value(value):
+        # Full-precision ISO timestamps in both formats (the JSON encoder keeps milliseconds only)
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return value
+    
+    @classmethod
+    def stream(cls, dataset, rows, file_format, compress=False):
+        """Encoded byte chunks of about BUFFER_SIZE, gzipped when compress is set"""
+        chunks = cls.buffered(cls.encode(dataset, rows, file_format))
+        if not compress:
+            yield from chunks
+            return
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    
+    @classmethod
+    def buffered(cls, lines):
+        buffer, size = [], 0
+        for line in lines:
+            buffer.append(line)
+            size += len(line)
+            if size >= cls.BUFFER_SIZE:
+                yield ''.join(buffer).encode()
+                buffer, size = [], 0
+        if buffer:
+            yield ''.join(buffer).encode()
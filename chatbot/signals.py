@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Website
+from .services import NotificationService, WebsiteConfigCache
+
+
+@receiver(post_save, sender=Website)
+@receiver(post_delete, sender=Website)
+def invalidate_website_config(sender, instance, **kwargs):
+    """Drop the cached widget config whenever a website changes"""
+    WebsiteConfigCache.invalidate(instance.id)
+
+
+@receiver(pre_save, sender=Website)
+def remember_website_owner(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Note the stored owner before a save that may transfer the website"""
+    instance._previous_owner_id = None
+    if raw or instance._state.adding or (update_fields is not None and 'owner' not in update_fields):
+        return
+    instance._previous_owner_id = Website.objects.filter(pk=instance.pk).values_list('owner_id', flat=True).first()
+
+
+@receiver(post_save, sender=Website)
+def publish_website_owner(sender, instance, created, update_fields=None, **kwargs):
+    """Keep connected dashboards' access caches in step with website ownership"""
+    if created or update_fields is None or {'owner', 'name'} & set(update_fields):
+        NotificationService.notify_website_access_changed(
+            instance, created=created, previous_owner_id=getattr(instance, '_previous_owner_id', None)
+        )
+
+
+@receiver(post_save, sender=Website)
+@receiver(post_delete, sender=Website)
+def publish_website_updated(sender, instance, created=False, **kwargs):
+    """Make open visitor sockets reload the website's prompt, model and provider"""
+    if not created:
+        NotificationService.notify_website_updated(instance)
+
+
+@receiver(post_delete, sender=Website)
+def publish_website_deleted(sender, instance, **kwargs):
+    NotificationService.notify_website_access_changed(instance, deleted=True)
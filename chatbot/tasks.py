@@ -0,0 +1,88 @@
+import logging
+import uuid
+from datetime import date, timedelta
+from itertools import groupby
+
+from celery import group, shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .models import RollupWatermark
+from .services import AnalyticsService, ConversationArchiveService
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_WATERMARK = 'daily_analytics'
+
+
+def _chunk_pairs_by_website(pairs, websites_per_chunk):
+    """Split sorted (website_id, date) pairs into chunks that never split a website"""
+    chunk = []
+    websites_in_chunk = 0
+    for _, website_pairs in groupby(pairs, key=lambda pair: pair[0]):
+        chunk.extend(website_pairs)
+        websites_in_chunk += 1
+        if websites_in_chunk >= websites_per_chunk:
+            yield chunk
+            chunk = []
+            websites_in_chunk = 0
+    if chunk:
+        yield chunk
+
+
+@shared_task
+def rollup_dirty_analytics():
+    """Roll up the (website, date) pairs touched since the last watermark.
+
+    Scheduled by celery beat. The watermark trails the scan time by a small lag
+    so rows committed just after the scan are picked up by the next run; the
+    overlap is harmless because the upserts are idempotent.
+    """
+    lag = timedelta(seconds=getattr(settings, 'ANALYTICS_ROLLUP_LAG_SECONDS', 300))
+    websites_per_chunk = getattr(settings, 'ANALYTICS_ROLLUP_WEBSITES_PER_CHUNK', 50)
+
+    scan_started = timezone.now()
+    watermark = RollupWatermark.objects.filter(name=ANALYTICS_WATERMARK).first()
+    since = watermark.value if watermark else None
+
+    pairs = AnalyticsService.find_dirty_pairs(since=since)
+
+    # Fan out across websites in parallel chunks; dates travel as ISO strings for the JSON serializer
+    chunks = [
+        [(str(website_id), day.isoformat()) for website_id, day in chunk]
+        for chunk in _chunk_pairs_by_website(pairs, websites_per_chunk)
+    ]
+    if chunks:
+        group(rollup_analytics_chunk.s(chunk) for chunk in chunks).apply_async()
+
+    # Advance only after dispatching; a crash before this line just re-rolls the same pairs
+    RollupWatermark.objects.update_or_create(
+        name=ANALYTICS_WATERMARK,
+        defaults={'value': scan_started - lag},
+    )
+
+    logger.info(f"Dispatched analytics rollup for {len(pairs)} website/day pairs in {len(chunks)} chunks")
+    return len(pairs)
+
+
+@shared_task(autoretry_for=(Exception,), retry_backoff=True, max_retries=5)
+def rollup_analytics_chunk(pairs):
+    """Recompute ChatbotAnalytics rows for a chunk of (website_id, ISO date) pairs"""
+    return AnalyticsService.rollup_daily_analytics(
+        (uuid.UUID(website_id), date.fromisoformat(day)) for website_id, day in pairs
+    )
+
+
+@shared_task
+def archive_old_conversations():
+    """Archive ended conversations past their website's retention period.
+
+    Scheduled by celery beat. Each run archives at most CHAT_ARCHIVE_MAX_BATCHES
+    batches; whatever is left is picked up by the next run.
+    """
+    stats = ConversationArchiveService.run(
+        batch_size=getattr(settings, 'CHAT_ARCHIVE_BATCH_SIZE', 200),
+        max_batches=getattr(settings, 'CHAT_ARCHIVE_MAX_BATCHES', 50),
+    )
+    logger.info(f"Archived {stats['conversations']} conversations ({stats['messages']} messages) in {stats['files']} files")
+    return stats
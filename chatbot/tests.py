@@ -1,3 +1,1891 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import skipIf
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Max, Min, Q, QuerySet
+from django.http import HttpResponse
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import codec, metrics
+from .consumers import ChatConsumer, DashboardAccessCache, DashboardConsumer
+from .log_handlers import BackgroundFileHandler, JSONFormatter, SampleFilter
+from .models import Website, Conversation, ConversationArchive, Message, ChatbotAnalytics
+from .pagination import encode_cursor
+from .services import (
+    AnalyticsService, ChatbotService, ConversationArchiveService, ConversationSummaryService, DashboardStatsService,
+    MessageWriteBehind, NotificationPublisher, NotificationRoute, NotificationService, ResponseCache,
+    TimeSeriesService, np,
+)
+from .tasks import archive_old_conversations
+
+
+IN_MEMORY_CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
+
+
+def frame_of(event):
+    """The client frame a NotificationService group event carries"""
+    return codec.loads(event['frame'])
+
+
+class ConsumerTestMixin:
+    """Fixtures and helpers for driving consumers through WebsocketCommunicator"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=self.owner)
+        self.conversation = Conversation.objects.create(website=self.website, user_identifier='visitor')
+
+    def make_communicator(self, conversation_id):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), f'/ws/chat/{conversation_id}/')
+        communicator.scope['url_route'] = {'kwargs': {'conversation_id': str(conversation_id)}}
+        return communicator
+
+    async def connect_dashboard(self, user):
+        communicator = WebsocketCommunicator(DashboardConsumer.as_asgi(), '/ws/dashboard/')
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.receive_json_from()
+        return communicator
+
+    def run_scenario(self, scenario):
+        """Run an async scenario with query capture enabled on the test thread's connection"""
+        with CaptureQueriesContext(connection):
+            async_to_sync(scenario)()
+
+    @staticmethod
+    @sync_to_async
+    def query_count():
+        return len(connection.queries_log)
+
+    async def round_trip(self, communicator, *frames):
+        """Send frames followed by a ping and wait for the pong so every frame was handled"""
+        for frame in frames:
+            await communicator.send_json_to(frame)
+        await communicator.send_json_to({'type': 'ping'})
+        response = await communicator.receive_json_from()
+        self.assertEqual(response['type'], 'pong')
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class ChatConsumerQueryCountTests(ConsumerTestMixin, TransactionTestCase):
+    """The visitor socket should not re-load the conversation for every frame"""
+
+    def test_typing_frames_use_cached_state(self):
+        async def scenario():
+            communicator = self.make_communicator(self.conversation.id)
+            before = await self.query_count()
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await communicator.receive_json_from()
+
+            # Connecting loads the conversation and website together
+            after_connect = await self.query_count()
+            self.assertEqual(after_connect - before, 1)
+
+            await self.round_trip(communicator, *[
+                {'type': 'typing', 'isTyping': is_typing} for is_typing in (True, False, True, False)
+            ])
+            self.assertEqual(await self.query_count() - after_connect, 0)
+
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+    def test_chat_message_queries_per_frame(self):
+        async def scenario():
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+
+            # Provider lookup, the insert transaction (BEGIN, seq and counter update,
+            # insert, COMMIT) and attention flag on the first message
+            before = await self.query_count()
+            await self.round_trip(communicator, {'type': 'chat_message', 'message': 'hello'})
+            self.assertEqual(await self.query_count() - before, 6)
+
+            # The attention flag is already set, so only the insert transaction remains
+            before = await self.query_count()
+            await self.round_trip(communicator, {'type': 'chat_message', 'message': 'anyone there?'})
+            self.assertEqual(await self.query_count() - before, 4)
+
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.total_messages, 2)
+        self.assertEqual(self.conversation.user_messages, 2)
+        self.assertTrue(self.conversation.requires_attention)
+
+    @override_settings(CHATBOT_DEFAULT_PROVIDER='stub')
+    def test_ai_reply_is_streamed_as_chunks(self):
+        async def scenario():
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+
+            await communicator.send_json_to({'type': 'chat_message', 'message': 'hello there'})
+            chunks = [await communicator.receive_json_from() for _ in range(4)]
+            self.assertEqual([chunk['type'] for chunk in chunks], ['chat_chunk'] * 4)
+            self.assertEqual(''.join(chunk['delta'] for chunk in chunks), 'You said: hello there')
+            self.assertEqual(len({chunk['message_id'] for chunk in chunks}), 1)
+
+            final = await communicator.receive_json_from()
+            self.assertEqual(final['type'], 'chat_message')
+            self.assertEqual(final['message'], 'You said: hello there')
+            self.assertEqual(final['message_id'], chunks[0]['message_id'])
+            self.assertFalse(final['is_error'])
+
+            await communicator.disconnect()
+            return final['message_id']
+
+        with CaptureQueriesContext(connection):
+            message_id = async_to_sync(scenario)()
+
+        reply = Message.objects.get(id=message_id)
+        self.assertEqual(reply.role, 'assistant')
+        self.assertEqual(reply.ai_model_used, self.website.ai_model)
+        self.assertIsNotNone(reply.response_time_ms)
+        self.assertEqual(reply.tokens_used, len(self.website.system_prompt.split()) + 2 + 4)
+
+        # The AI answered, so no agent is needed
+        self.conversation.refresh_from_db()
+        self.assertEqual((self.conversation.user_messages, self.conversation.bot_messages), (1, 1))
+        self.assertFalse(self.conversation.requires_attention)
+
+    @override_settings(CHATBOT_DEFAULT_PROVIDER='stub', NOTIFICATION_BACKGROUND_PUBLISH=False)
+    def test_website_edits_reach_open_sockets(self):
+        async def ask(communicator, text):
+            await communicator.send_json_to({'type': 'chat_message', 'message': text})
+            while True:
+                frame = await communicator.receive_json_from()
+                if frame['type'] == 'chat_message':
+                    return await sync_to_async(Message.objects.get)(id=frame['message_id'])
+
+        def edit_website():
+            self.website.ai_model = 'gpt-4o-mini'
+            self.website.save()
+
+        async def scenario():
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+
+            self.assertEqual((await ask(communicator, 'first question')).ai_model_used, self.website.ai_model)
+            await sync_to_async(edit_website)()
+            # The cached state and engine are dropped, so the next reply uses the new model
+            self.assertEqual((await ask(communicator, 'second question')).ai_model_used, 'gpt-4o-mini')
+
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+    @override_settings(CHAT_WRITE_BEHIND=True)
+    def test_write_behind_publishes_before_persisting(self):
+        message_id = '6f1c3e2a-9b4d-4c8e-8f0a-2d5b7e9c1a34'
+
+        async def scenario():
+            layer = get_channel_layer()
+            channel = await layer.new_channel()
+            await layer.group_add(f'dashboard_website_{self.website.id}', channel)
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+
+            # Only the provider lookup runs before the dashboard is notified
+            before = await self.query_count()
+            await self.round_trip(communicator, {'type': 'chat_message', 'message': 'hello', 'messageId': message_id})
+            self.assertEqual(await self.query_count() - before, 1)
+            event = frame_of(await layer.receive(channel))
+            self.assertEqual(event['message']['id'], message_id)
+            self.assertEqual((await layer.receive(channel))['type'], 'new_conversation')
+
+            # Disconnecting flushes the queue
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+        message = Message.objects.get(id=message_id)
+        self.assertEqual((message.role, message.content), ('user', 'hello'))
+        self.conversation.refresh_from_db()
+        self.assertEqual((self.conversation.total_messages, self.conversation.user_messages), (1, 1))
+        self.assertTrue(self.conversation.requires_attention)
+
+    @override_settings(CHAT_WRITE_BEHIND=True)
+    def test_write_behind_drops_retried_frames_before_publishing(self):
+        frame = {'type': 'chat_message', 'message': 'hello', 'messageId': str(uuid.uuid4())}
+
+        async def scenario():
+            layer = get_channel_layer()
+            channel = await layer.new_channel()
+            await layer.group_add(f'dashboard_website_{self.website.id}', channel)
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+
+            await self.round_trip(communicator, frame, frame)
+            self.assertEqual(frame_of(await layer.receive(channel))['type'], 'new_message')
+            self.assertEqual((await layer.receive(channel))['type'], 'new_conversation')
+            # The retry is neither published nor queued
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(layer.receive(channel), 0.1)
+
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+        self.assertEqual(Message.objects.filter(conversation=self.conversation).count(), 1)
+        self.conversation.refresh_from_db()
+        self.assertEqual((self.conversation.total_messages, self.conversation.last_message_seq), (1, 1))
+
+    def test_write_behind_batches_are_idempotent(self):
+        batch = [
+            (Message(conversation=self.conversation, role=role, content=content), role == 'user')
+            for role, content in (('user', 'hi'), ('assistant', 'Hello!'), ('user', 'prices?'))
+        ]
+        MessageWriteBehind.write_batch(batch)
+        # A retry after an ambiguous failure inserts and counts nothing twice
+        MessageWriteBehind.write_batch(batch)
+
+        self.assertEqual(
+            list(Message.objects.filter(conversation=self.conversation).order_by('seq').values_list('content', 'seq')),
+            [('hi', 1), ('Hello!', 2), ('prices?', 3)]
+        )
+        self.conversation.refresh_from_db()
+        self.assertEqual(
+            (self.conversation.total_messages, self.conversation.user_messages, self.conversation.bot_messages),
+            (3, 2, 1)
+        )
+        self.assertEqual(self.conversation.last_message_seq, 3)
+        self.assertTrue(self.conversation.requires_attention)
+
+    def test_write_behind_replaces_ids_of_other_conversations(self):
+        other = Conversation.objects.create(website=self.website, user_identifier='someone else')
+        taken = Message.objects.create(conversation=other, role='user', content='mine')
+        MessageWriteBehind.write_batch([
+            (Message(id=taken.id, conversation=self.conversation, role='user', content='hi'), False)
+        ])
+
+        saved = Message.objects.get(conversation=self.conversation)
+        self.assertEqual(saved.content, 'hi')
+        self.assertNotEqual(saved.id, taken.id)
+        self.assertEqual(Message.objects.get(id=taken.id).content, 'mine')
+
+    def test_retried_message_ids_are_saved_once(self):
+        other = Conversation.objects.create(website=self.website, user_identifier='someone else')
+        taken = Message.objects.create(conversation=other, role='user', content='mine')
+        message_id = str(uuid.uuid4())
+
+        async def scenario():
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+
+            # A retry is not an error and is not saved or counted again
+            frame = {'type': 'chat_message', 'message': 'hello', 'messageId': message_id}
+            await self.round_trip(communicator, frame, frame)
+            # Another conversation's id gets a fresh one
+            await self.round_trip(communicator, {'type': 'chat_message', 'message': 'again', 'messageId': str(taken.id)})
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+        self.assertEqual(
+            list(Message.objects.filter(conversation=self.conversation).order_by('seq').values_list('content', flat=True)),
+            ['hello', 'again']
+        )
+        self.assertEqual(str(Message.objects.get(content='hello').id), message_id)
+        self.conversation.refresh_from_db()
+        self.assertEqual((self.conversation.total_messages, self.conversation.last_message_seq), (2, 2))
+
+    @override_settings(NOTIFICATION_BACKGROUND_PUBLISH=False)
+    def test_conversation_updated_invalidates_state(self):
+        async def scenario():
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+
+            # A message over the HTTP fallback flags the conversation behind the socket's back
+            response = await sync_to_async(self.client.post)(
+                f'/api/chat/{self.website.id}/',
+                json.dumps({'message': 'hello?', 'conversationId': str(self.conversation.id)}),
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 200)
+
+            # The next frame after an invalidation reloads the state once
+            before = await self.query_count()
+            await self.round_trip(
+                communicator,
+                {'type': 'typing', 'isTyping': True},
+                {'type': 'typing', 'isTyping': False},
+            )
+            self.assertEqual(await self.query_count() - before, 1)
+
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS, TYPING_DEBOUNCE=0.05, TYPING_TIMEOUT=0.2)
+class TypingCoalescingTests(ConsumerTestMixin, TransactionTestCase):
+    """Typing frames reach the other side only as start/stop transitions"""
+
+    async def listen(self, group):
+        layer = get_channel_layer()
+        channel = await layer.new_channel()
+        await layer.group_add(group, channel)
+        return layer, channel
+
+    async def assert_no_event(self, layer, channel):
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(layer.receive(channel), 0.3)
+
+    def test_visitor_typing_is_deduped_and_debounced(self):
+        async def scenario():
+            layer, channel = await self.listen(f'dashboard_website_{self.website.id}')
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+
+            await self.round_trip(communicator, *[
+                {'type': 'typing', 'isTyping': is_typing} for is_typing in (True, True, False, True, True, False, False)
+            ])
+            start = frame_of(await layer.receive(channel))
+            self.assertEqual((start['type'], start['is_typing']), ('typing_indicator', True))
+            stop = frame_of(await asyncio.wait_for(layer.receive(channel), 1))
+            self.assertFalse(stop['is_typing'])
+            await self.assert_no_event(layer, channel)
+
+            # A start without further frames expires on its own
+            await self.round_trip(communicator, {'type': 'typing', 'isTyping': True})
+            self.assertTrue(frame_of(await layer.receive(channel))['is_typing'])
+            self.assertFalse(frame_of(await asyncio.wait_for(layer.receive(channel), 1))['is_typing'])
+
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+    def test_agent_typing_checks_access_once_per_connection(self):
+        async def scenario():
+            layer, channel = await self.listen(f'chat_{self.conversation.id}')
+            communicator = await self.connect_dashboard(self.owner)
+
+            before = await self.query_count()
+            await self.round_trip(communicator, *[
+                {'type': 'typing', 'conversation_id': str(self.conversation.id), 'is_typing': is_typing}
+                for is_typing in (True, True, True, True)
+            ])
+            self.assertEqual(await self.query_count() - before, 1)
+            self.assertTrue((await layer.receive(channel))['is_typing'])
+
+            # Disconnecting publishes the pending stop
+            await communicator.disconnect()
+            self.assertFalse((await asyncio.wait_for(layer.receive(channel), 1))['is_typing'])
+
+        self.run_scenario(scenario)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS, NOTIFICATION_BACKGROUND_PUBLISH=False)
+class DashboardAccessCacheTests(ConsumerTestMixin, TransactionTestCase):
+    """Dashboard frames resolve access from the per-connection cache"""
+
+    def send_frame(self, conversation):
+        return {'type': 'send_message', 'conversation_id': str(conversation.id), 'message': 'On it'}
+
+    async def assert_sent(self, communicator):
+        """The sender's own dashboard gets both the acknowledgement and the broadcast"""
+        frames = [await communicator.receive_json_from() for _ in range(2)]
+        self.assertEqual(sorted(frame['type'] for frame in frames), ['message_sent', 'new_message'])
+
+    def test_send_message_skips_repeat_lookups(self):
+        async def scenario():
+            communicator = await self.connect_dashboard(self.owner)
+
+            # Website lookup, the insert transaction (BEGIN, seq and counter update,
+            # insert, COMMIT) and attention flag
+            before = await self.query_count()
+            await communicator.send_json_to(self.send_frame(self.conversation))
+            await self.assert_sent(communicator)
+            self.assertEqual(await self.query_count() - before, 6)
+
+            before = await self.query_count()
+            await communicator.send_json_to(self.send_frame(self.conversation))
+            await self.assert_sent(communicator)
+            self.assertEqual(await self.query_count() - before, 5)
+
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.bot_messages, 2)
+        self.assertEqual(Message.objects.filter(conversation=self.conversation, is_manual=True).count(), 2)
+
+    def test_ownership_changes_reach_open_connections(self):
+        other = User.objects.create_user(username='other', password='secret')
+
+        async def scenario():
+            communicator = await self.connect_dashboard(self.owner)
+            await self.round_trip(communicator, {
+                'type': 'typing', 'conversation_id': str(self.conversation.id), 'is_typing': False
+            })
+
+            # Transferring the website revokes access without a new query per frame
+            self.website.owner = other
+            await database_sync_to_async(self.website.save)()
+            update = await communicator.receive_json_from()
+            self.assertEqual(update, {'type': 'subscription_update', 'subscribed_websites': [], 'status': 'success'})
+            before = await self.query_count()
+            await communicator.send_json_to(self.send_frame(self.conversation))
+            self.assertEqual((await communicator.receive_json_from())['code'], 'ACCESS_DENIED')
+            self.assertEqual(await self.query_count() - before, 0)
+
+            # A website created for the user is granted and subscribed
+            website = await database_sync_to_async(Website.objects.create)(
+                name='New', url='https://new.example.com', owner=self.owner
+            )
+            update = await communicator.receive_json_from()
+            self.assertEqual(update['subscribed_websites'], [str(website.id)])
+
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+    def test_transfer_revokes_unsubscribed_previous_owner(self):
+        other = User.objects.create_user(username='other', password='secret')
+
+        async def scenario():
+            communicator = await self.connect_dashboard(self.owner)
+            await communicator.send_json_to({'type': 'unsubscribe_websites', 'website_ids': [str(self.website.id)]})
+            self.assertEqual((await communicator.receive_json_from())['subscribed_websites'], [])
+
+            self.website.owner = other
+            await database_sync_to_async(self.website.save)()
+            await self.round_trip(communicator)
+            await communicator.send_json_to(self.send_frame(self.conversation))
+            self.assertEqual((await communicator.receive_json_from())['code'], 'ACCESS_DENIED')
+
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+        self.assertFalse(Message.objects.filter(conversation=self.conversation).exists())
+
+    def test_conversation_lookups_are_bounded(self):
+        access = DashboardAccessCache(max_conversations=2)
+        access.grant('w1', 'Shop')
+        for conversation_id in ('c1', 'c2', 'c3'):
+            access.remember(conversation_id, 'w1')
+        self.assertIs(access.website_for('c1'), DashboardAccessCache.MISSING)
+        self.assertEqual(access.website_for('c2'), 'w1')
+
+        access.revoke('w1', deleted=True)
+        self.assertEqual(access.websites, {})
+        self.assertEqual(len(access.conversations), 0)
+
+
+class CodecTests(TestCase):
+
+    def test_codecs_agree(self):
+        payload = {
+            'id': uuid.uuid4(),
+            'at': timezone.now(),
+            'price': Decimal('9.50'),
+            'content': 'caf\u00e9 <b>',
+            'nested': [1, 2.5, None, True],
+        }
+        encoded = {
+            name: codec.get_codec(name).dumps(payload)
+            for name in codec.CODECS if name == 'json' or codec.orjson is not None
+        }
+        decoded = [codec.JSONCodec.loads(text) for text in encoded.values()]
+        self.assertTrue(all(value == decoded[0] for value in decoded))
+        self.assertEqual(decoded[0]['id'], str(payload['id']))
+
+        with self.assertRaises(codec.DecodeError):
+            codec.loads('{not json')
+
+    def test_api_responses_use_the_codec(self):
+        owner = User.objects.create_user(username='owner', password='secret')
+        self.client.force_login(owner)
+        Website.objects.create(name='Shop', url='https://shop.example.com', owner=owner)
+        for name in codec.CODECS:
+            if name == 'orjson' and codec.orjson is None:
+                continue
+            with override_settings(JSON_CODEC=name):
+                response = self.client.get('/api/dashboard/stats/')
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertEqual(response.json()['total_websites'], 1)
+
+
+class BenchmarkChatCommandTests(TransactionTestCase):
+
+    def test_reports_machine_readable_results(self):
+        out = StringIO()
+        call_command('benchmark_chat', visitors=3, agents=1, messages=2, json=True, stdout=out, stderr=StringIO())
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report['messages'], 3 * 2 + 2)
+        self.assertEqual(report['operations']['chat_message']['count'], 6)
+        self.assertEqual(report['operations']['send_message']['count'], 2)
+        self.assertLessEqual(report['operations']['typing']['p50_ms'], report['operations']['typing']['p99_ms'])
+        self.assertGreater(report['db_queries_per_message'], 0)
+        # The fixtures are removed afterwards
+        self.assertFalse(Website.objects.exists())
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS, NOTIFICATION_BACKGROUND_PUBLISH=False)
+class ResumeTests(ConsumerTestMixin, TransactionTestCase):
+    """Reconnecting visitors get only the replies they missed"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def reply(self, text):
+        response = self.client.post(
+            '/api/send_manual_response/', {'conversation_id': str(self.conversation.id), 'message': text}
+        )
+        return response.json()['message_id']
+
+    def resume(self, last_message_id):
+        return self.resume_frame({'type': 'resume', 'lastMessageId': last_message_id})
+
+    def resume_frame(self, frame):
+        async def scenario():
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+            before = await self.query_count()
+            await communicator.send_json_to(frame)
+            self.resumed = await communicator.receive_json_from()
+            self.queries = await self.query_count() - before
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+        return self.resumed
+
+    def test_agent_replies_reach_the_connected_visitor(self):
+        async def scenario():
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+            message_id = await sync_to_async(self.reply)('Hello from support')
+            frame = await communicator.receive_json_from()
+            self.assertEqual((frame['type'], frame['message_id']), ('chat_message', message_id))
+            # The widget resumes from the seq of the last reply it saw
+            self.assertEqual(frame['seq'], 1)
+            self.assertNotIn('agent_id', frame)
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+    def test_missed_replies_are_replayed_from_the_buffer(self):
+        seen = self.reply('First')
+        missed = [self.reply('Second'), self.reply('Third')]
+
+        resumed = self.resume(seen)
+        self.assertEqual([frame['message_id'] for frame in resumed['messages']], missed)
+        self.assertEqual(resumed['messages'][0]['message'], 'Second')
+        self.assertEqual((resumed['source'], resumed['complete']), ('buffer', True))
+        self.assertEqual(self.queries, 0)
+
+        self.assertEqual(self.resume(missed[-1])['messages'], [])
+
+    def test_falls_back_to_the_database(self):
+        Message.objects.create(conversation=self.conversation, role='user', content='Are you there?')
+        seen = self.reply('First')
+        with override_settings(CHAT_REPLAY_BUFFER_SIZE=2):
+            missed = [self.reply(text) for text in ('Second', 'Third', 'Fourth')]
+
+            # The cursor is older than the ring
+            resumed = self.resume(seen)
+        self.assertEqual([frame['message_id'] for frame in resumed['messages']], missed)
+        self.assertEqual((resumed['source'], resumed['complete']), ('database', True))
+        self.assertEqual(self.queries, 2)
+
+        # Evicted slots are a gap too
+        cache.clear()
+        self.assertEqual([frame['message_id'] for frame in self.resume(missed[0])['messages']], missed[1:])
+
+        with override_settings(CHAT_RESUME_MAX_MESSAGES=2):
+            resumed = self.resume(seen)
+        self.assertEqual(len(resumed['messages']), 2)
+        self.assertFalse(resumed['complete'])
+
+    def test_resume_by_seq(self):
+        self.reply('First')
+        seen = Message.objects.get(conversation=self.conversation).seq
+        Message.objects.create(conversation=self.conversation, role='user', content='Thanks')
+        missed = self.reply('Second')
+
+        resumed = self.resume_frame({'type': 'resume', 'lastSeq': seen})
+        self.assertEqual([frame['message_id'] for frame in resumed['messages']], [missed])
+        self.assertEqual(resumed['messages'][0]['seq'], seen + 2)
+        self.assertEqual(resumed['source'], 'buffer')
+
+        # From the database it is a single range read on (conversation, seq)
+        cache.clear()
+        resumed = self.resume_frame({'type': 'resume', 'lastSeq': seen})
+        self.assertEqual([frame['message_id'] for frame in resumed['messages']], [missed])
+        self.assertEqual((resumed['source'], self.queries), ('database', 1))
+
+    def test_reconnecting_before_the_first_reply(self):
+        # The widget has no cursor yet and resumes from 0
+        Message.objects.create(conversation=self.conversation, role='user', content='Are you there?')
+        missed = self.reply('Yes!')
+
+        resumed = self.resume_frame({'type': 'resume', 'lastSeq': 0})
+        self.assertEqual([frame['message_id'] for frame in resumed['messages']], [missed])
+        self.assertEqual((resumed['messages'][0]['seq'], resumed['complete']), (2, True))
+
+        cache.clear()
+        resumed = self.resume_frame({'type': 'resume', 'lastSeq': 0})
+        self.assertEqual([frame['message_id'] for frame in resumed['messages']], [missed])
+        self.assertEqual((resumed['source'], resumed['complete']), ('database', True))
+
+    def test_unknown_cursor_asks_for_a_reload(self):
+        self.reply('First')
+        for cursor in (str(uuid.uuid4()), 'not-a-uuid'):
+            resumed = self.resume(cursor)
+            self.assertEqual((resumed['messages'], resumed['complete']), ([], False))
+
+    def test_incomplete_resumes_reload_the_history(self):
+        Message.objects.create(conversation=self.conversation, role='user', content='Are you there?')
+        replies = [self.reply(text) for text in ('First', 'Second', 'Third')]
+        url = f'/api/chat/{self.website.id}/{self.conversation.id}/history/'
+
+        self.client.logout()
+        with self.assertNumQueries(1):
+            history = self.client.get(url, {'limit': 2}).json()
+        self.assertEqual([frame['message_id'] for frame in history['messages']], replies[1:])
+        self.assertEqual([frame['seq'] for frame in history['messages']], [3, 4])
+        self.assertEqual(history['messages'][0]['message'], 'Second')
+
+        self.assertEqual(self.client.get(url, {'limit': 'all'}).status_code, 400)
+        other = Website.objects.create(name='Other', url='https://other.example.com', owner=self.owner)
+        self.assertEqual(self.client.get(f'/api/chat/{other.id}/{self.conversation.id}/history/').json()['messages'], [])
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class MetricsTests(ConsumerTestMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for metric in metrics.REGISTRY:
+            metric.clear()
+
+    def test_frames_are_counted_timed_and_query_tallied(self):
+        async def scenario():
+            communicator = self.make_communicator(self.conversation.id)
+            await communicator.connect()
+            await communicator.receive_json_from()
+            self.assertEqual(metrics.OPEN_SOCKETS.values[('chat',)], 1)
+
+            await self.round_trip(communicator, {'type': 'chat_message', 'message': 'hello'})
+            await communicator.send_json_to({'type': 'bogus'})
+            self.assertEqual((await communicator.receive_json_from())['code'], 'UNKNOWN_MESSAGE_TYPE')
+            await communicator.disconnect()
+
+        self.run_scenario(scenario)
+
+        self.assertEqual(metrics.OPEN_SOCKETS.values[('chat',)], 0)
+        self.assertEqual(metrics.FRAMES.values, {('chat', 'chat_message'): 1, ('chat', 'unknown'): 1, ('chat', 'ping'): 1})
+        self.assertEqual(metrics.FRAME_SECONDS.values[('chat', 'chat_message')][-1], 1)
+        # Provider lookup, seq and counter update, insert and attention flag (SQLite
+        # also sends its BEGIN as a statement); none for the other two frames
+        queries = metrics.FRAME_QUERIES.values[('chat',)]
+        self.assertEqual((queries[-2], queries[-1]), (4 + (connection.vendor == 'sqlite'), 3))
+        self.assertEqual(metrics.HANDLER_SECONDS.values[('chat.handle_chat_message',)][-1], 1)
+        self.assertEqual(metrics.DB_CALL_SECONDS.values[('chat.save_message',)][-1], 1)
+
+    def test_endpoint_requires_token_or_staff(self):
+        metrics.FRAMES.inc(consumer='chat', type='ping')
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        User.objects.filter(pk=self.owner.pk).update(is_staff=True)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE chatbot_ws_frames_total counter', body)
+        self.assertIn('chatbot_ws_frames_total{consumer="chat",type="ping"} 1', body)
+
+        self.client.logout()
+        with override_settings(METRICS_TOKEN='s3cret'):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram('test_seconds', 'Test', ['op'], buckets=(0.1, 1.0))
+        metrics.REGISTRY.remove(histogram)
+        for value in (0.05, 0.5, 0.5, 5):
+            histogram.observe(value, op='x')
+        self.assertEqual(histogram.samples(), [
+            ('test_seconds_bucket', '{op="x",le="0.1"}', 1),
+            ('test_seconds_bucket', '{op="x",le="1.0"}', 3),
+            ('test_seconds_bucket', '{op="x",le="+Inf"}', 4),
+            ('test_seconds_sum', '{op="x"}', 6.05),
+            ('test_seconds_count', '{op="x"}', 4),
+        ])
+
+
+class LogHandlerTests(TestCase):
+
+    def record(self, level=logging.DEBUG):
+        return logging.makeLogRecord({'name': 'chatbot.frames', 'levelno': level, 'msg': 'Frame received'})
+
+    def test_sample_filter_keeps_warnings(self):
+        never = SampleFilter(rate=0)
+        self.assertFalse(never.filter(self.record()))
+        self.assertTrue(never.filter(self.record(logging.WARNING)))
+        self.assertTrue(SampleFilter(rate=1).filter(self.record()))
+
+    def test_background_handler_drops_instead_of_blocking(self):
+        with tempfile.TemporaryDirectory() as directory:
+            handler = BackgroundFileHandler(os.path.join(directory, 'chat.log'), maxsize=1)
+            handler.setFormatter(JSONFormatter())
+            handler.stop()  # Nothing drains the queue now
+            metrics.LOG_RECORDS_DROPPED.clear()
+
+            handler.handle(self.record())
+            handler.handle(self.record())
+            self.assertEqual(metrics.LOG_RECORDS_DROPPED.values, {(): 1})
+
+            entry = json.loads(handler.queue.get_nowait().msg)
+            self.assertEqual((entry['logger'], entry['message']), ('chatbot.frames', 'Frame received'))
+            handler.close()
+
+
+class ResponseCacheTests(TestCase):
+
+    def test_exact_hits_are_normalized_and_scoped_to_prompt_and_model(self):
+        cache = ResponseCache(max_entries=10, ttl=60)
+        cache.put('What are your opening hours?', 'Be nice', 'gpt', '9 to 5', 42)
+
+        self.assertEqual(cache.get('  what are your   OPENING hours ', 'Be nice', 'gpt'), ('9 to 5', 42))
+        self.assertIsNone(cache.get('What are your opening hours?', 'Be terse', 'gpt'))
+        self.assertIsNone(cache.get('What are your opening hours?', 'Be nice', 'gpt-4'))
+        self.assertEqual((cache.hits, cache.misses, cache.tokens_saved), (1, 2, 42))
+
+    def test_ttl_and_lru_eviction(self):
+        cache = ResponseCache(max_entries=2, ttl=60)
+        cache.put('one', 'p', 'm', 'a1', 1)
+        cache.put('two', 'p', 'm', 'a2', 1)
+        cache.get('one', 'p', 'm')
+        cache.put('three', 'p', 'm', 'a3', 1)
+
+        # "two" was the least recently used
+        self.assertIsNone(cache.get('two', 'p', 'm'))
+        self.assertIsNotNone(cache.get('one', 'p', 'm'))
+
+        with patch('chatbot.services.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(cache.get('three', 'p', 'm'))
+        self.assertEqual(len(cache.entries), 1)
+
+    def test_answers_are_scoped_to_the_conversation_history(self):
+        cache = ResponseCache(max_entries=10, ttl=60, similarity=0.5 if np is not None else None)
+        alice = [{'role': 'user', 'content': 'Where is order 123?'}, {'role': 'assistant', 'content': 'Check it?'}]
+        bob = [{'role': 'user', 'content': 'Can I cancel order 456?'}, {'role': 'assistant', 'content': 'Sure?'}]
+        cache.put('yes', 'p', 'm', 'Order 123 ships tomorrow', 12, alice)
+
+        self.assertIsNone(cache.get('yes', 'p', 'm', bob))
+        self.assertIsNone(cache.get('yes', 'p', 'm'))
+        self.assertIsNone(cache.get('yes please', 'p', 'm', bob))
+        self.assertEqual(cache.get('Yes!', 'p', 'm', alice), ('Order 123 ships tomorrow', 12))
+
+    @override_settings(CHATBOT_DEFAULT_PROVIDER='stub')
+    def test_follow_ups_are_not_served_to_other_visitors(self):
+        owner = User.objects.create_user(username='owner')
+        website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=owner)
+        chatbot = ChatbotService(website)
+
+        async def answer(messages):
+            return ''.join([delta async for delta in chatbot.stream_response(messages)]), chatbot.cache_hit
+
+        with patch.dict(ResponseCache._instances, clear=True):
+            chatbot.response_cache = ResponseCache.for_website(website.id)
+            system = {'role': 'system', 'content': website.system_prompt}
+            noted = {'role': 'assistant', 'content': 'Noted'}
+            first = [system, {'role': 'user', 'content': 'My email is a@example.com'}, noted]
+            second = [system, {'role': 'user', 'content': 'My email is b@example.com'}, noted]
+            question = {'role': 'user', 'content': 'What was my email again?'}
+
+            self.assertFalse(async_to_sync(answer)([*first, question])[1])
+            self.assertFalse(async_to_sync(answer)([*second, question])[1])
+            self.assertTrue(async_to_sync(answer)([*first, question])[1])
+            # First-turn questions are still shared between visitors
+            async_to_sync(answer)([system, {'role': 'user', 'content': 'Do you ship to Canada?'}])
+            self.assertTrue(async_to_sync(answer)([system, {'role': 'user', 'content': 'do you ship to canada'}])[1])
+
+    @override_settings(RESPONSE_CACHE_MAX_WEBSITES=2)
+    def test_number_of_website_caches_is_capped(self):
+        with patch.dict(ResponseCache._instances, clear=True):
+            first = ResponseCache.for_website('a')
+            ResponseCache.for_website('b')
+            self.assertIs(ResponseCache.for_website('a'), first)
+            ResponseCache.for_website('c')
+            self.assertEqual(list(ResponseCache._instances), ['a', 'c'])
+
+    @skipIf(np is None, 'NumPy is not installed')
+    def test_similar_questions_hit_above_threshold(self):
+        cache = ResponseCache(max_entries=10, ttl=60, similarity=0.8)
+        cache.put('how much does shipping cost to canada', 'p', 'm', 'Ten dollars', 30)
+
+        self.assertEqual(cache.get('how much does shipping cost to Canada please', 'p', 'm'), ('Ten dollars', 30))
+        self.assertIsNone(cache.get('do you sell gift cards', 'p', 'm'))
+        self.assertIsNone(cache.get('how much does shipping cost to canada please', 'other', 'm'))
+        self.assertEqual((cache.similar_hits, cache.misses), (1, 2))
+
+
+def evaluate_context(request, template_name, context=None, *args, **kwargs):
+    """Stand-in for render() that only evaluates the querysets a template would read"""
+    for value in (context or {}).values():
+        if isinstance(value, QuerySet):
+            list(value)
+    return HttpResponse(template_name)
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN every query the hot dashboard and API views issue and reject sequential scans"""
+
+    CHECKED_TABLES = ('chatbot_conversation', 'chatbot_message', 'chatbot_website', 'chatbot_chatbotanalytics')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='secret')
+        other_owner = User.objects.create_user(username='other', password='secret')
+
+        websites = [
+            Website(name=f'Site {i}', url=f'https://site{i}.example.com', owner=owner)
+            for i, owner in enumerate([cls.owner, cls.owner, other_owner, other_owner])
+        ]
+        Website.objects.bulk_create(websites)
+        cls.website = websites[0]
+
+        conversations = [
+            Conversation(
+                website=websites[i % len(websites)],
+                user_identifier=f'visitor-{i}',
+                is_active=i % 3 != 0,
+                requires_attention=i % 5 == 0,
+            )
+            for i in range(400)
+        ]
+        Conversation.objects.bulk_create(conversations)
+        cls.conversation = conversations[0]
+
+        Message.objects.bulk_create([
+            Message(
+                conversation=conversation,
+                role='user' if n % 2 == 0 else 'assistant',
+                content=f'message {n}',
+            )
+            for conversation in conversations
+            for n in range(6)
+        ])
+
+    def setUp(self):
+        # Make cached views hit the database
+        cache.clear()
+        self.client.force_login(self.owner)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('ANALYZE')
+                # Seeded tables are small; make the planner prove an index path exists
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN {sql}')
+                return [row[0] for row in cursor.fetchall()]
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                return [row[-1] for row in cursor.fetchall()]
+        self.skipTest(f'No plan inspection for {connection.vendor}')
+
+    def is_sequential_scan(self, line):
+        for table in self.CHECKED_TABLES:
+            if connection.vendor == 'postgresql' and f'Seq Scan on {table}' in line:
+                return True
+            if connection.vendor == 'sqlite' and line.startswith(f'SCAN {table}') and 'USING' not in line:
+                return True
+        return False
+
+    def assert_no_sequential_scans(self, url):
+        with patch('chatbot.views.render', evaluate_context), \
+                patch('dashboard.views.render', evaluate_context), \
+                CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+        selects = [
+            query['sql'] for query in ctx.captured_queries
+            if query['sql'].startswith('SELECT') and any(table in query['sql'] for table in self.CHECKED_TABLES)
+        ]
+        self.assertTrue(selects, f'{url} issued no queries against chatbot tables')
+
+        for sql in selects:
+            plan = self.explain(sql)
+            offending = [line for line in plan if self.is_sequential_scan(line)]
+            self.assertFalse(offending, f'{url} falls back to a sequential scan:\n{sql}\n' + '\n'.join(plan))
+
+    def test_conversation_list(self):
+        self.assert_no_sequential_scans(f'/api/websites/{self.website.id}/conversations/')
+
+    def test_conversation_messages(self):
+        self.assert_no_sequential_scans(f'/api/conversations/{self.conversation.id}/messages/')
+
+    def test_active_conversations(self):
+        self.assert_no_sequential_scans('/api/active_conversations/')
+
+    def test_dashboard_stats(self):
+        self.assert_no_sequential_scans('/api/dashboard/stats/')
+
+    def test_website_analytics(self):
+        self.assert_no_sequential_scans(f'/api/websites/{self.website.id}/analytics/')
+
+    def test_live_chat_view(self):
+        self.assert_no_sequential_scans('/live-chat/')
+
+    def test_dashboard(self):
+        self.assert_no_sequential_scans('/dashboard/')
+
+    def test_website_detail(self):
+        self.assert_no_sequential_scans(f'/websites/{self.website.id}/')
+
+    def test_dashboard_analytics(self):
+        self.assert_no_sequential_scans('/analytics/?days=30')
+
+    def test_conversation_data(self):
+        self.assert_no_sequential_scans(f'/conversations/{self.conversation.id}/data/')
+
+
+class TimeSeriesServiceTests(TestCase):
+    """Analytics charts cost a constant number of queries and zero-fill empty buckets"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='secret')
+        cls.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=cls.owner)
+
+        now = timezone.now()
+        for days_ago, message_count in ((0, 3), (2, 1)):
+            conversation = Conversation.objects.create(website=cls.website, user_identifier=f'visitor-{days_ago}')
+            Conversation.objects.filter(pk=conversation.pk).update(started_at=now - timedelta(days=days_ago))
+            Message.objects.bulk_create([
+                Message(conversation=conversation, role='user', content='hi') for _ in range(message_count)
+            ])
+            Message.objects.filter(conversation=conversation).update(timestamp=now - timedelta(days=days_ago))
+
+    def series(self, days, granularity='day'):
+        return TimeSeriesService.get_activity_series(
+            Conversation.objects.filter(website=self.website),
+            Message.objects.filter(conversation__website=self.website),
+            days=days,
+            granularity=granularity,
+        )
+
+    def test_daily_series_is_zero_filled(self):
+        series = self.series(7)
+        self.assertEqual(len(series), 7)
+        self.assertEqual([bucket['conversations'] for bucket in series], [0, 0, 0, 0, 1, 0, 1])
+        self.assertEqual([bucket['messages'] for bucket in series], [0, 0, 0, 0, 1, 0, 3])
+        self.assertEqual(series[-1]['date'], timezone.localdate().isoformat())
+
+    def test_query_count_does_not_grow_with_range(self):
+        for days in (7, 90):
+            with self.assertNumQueries(2):
+                self.series(days)
+
+    def test_hourly_and_weekly_granularity(self):
+        hourly = self.series(2, 'hour')
+        self.assertEqual(len(hourly), 48)
+        self.assertEqual(sum(bucket['messages'] for bucket in hourly), 3)
+
+        weekly = self.series(14, 'week')
+        self.assertEqual(len(weekly), 2)
+        self.assertEqual(sum(bucket['conversations'] for bucket in weekly), 2)
+
+    def test_ranges_are_bounded(self):
+        self.assertEqual(len(self.series(10 ** 6, 'hour')), TimeSeriesService.MAX_DAYS['hour'] * 24)
+        self.assertEqual(len(self.series(10 ** 6)), TimeSeriesService.MAX_DAYS['day'])
+
+        self.client.force_login(self.owner)
+        url = f'/api/websites/{self.website.id}/analytics/'
+        self.assertEqual(self.client.get(url, {'days': 2, 'granularity': 'hour'}).status_code, 200)
+        for days in (10 ** 6, 0, 'all'):
+            self.assertEqual(self.client.get(url, {'days': days, 'granularity': 'hour'}).status_code, 400)
+
+        response = self.client.get('/analytics/', {'days': 10 ** 6, 'granularity': 'hour'})
+        self.assertEqual(response.context['days'], TimeSeriesService.MAX_DAYS['hour'])
+
+
+class AnalyticsRollupTests(TestCase):
+    """Daily rollups only touch dirty website/day pairs and can be rerun safely"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='secret')
+        cls.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=cls.owner)
+        cls.idle_website = Website.objects.create(name='Idle', url='https://idle.example.com', owner=cls.owner)
+
+        for visitor, message_count in (('a', 1), ('b', 3)):
+            conversation = Conversation.objects.create(website=cls.website, user_identifier=visitor)
+            for n in range(message_count):
+                Message.objects.create(conversation=conversation, role='user', content=f'message {n}')
+
+    def test_find_dirty_pairs_since_watermark(self):
+        today = timezone.localdate()
+        self.assertEqual(AnalyticsService.find_dirty_pairs(), [(self.website.id, today)])
+        self.assertEqual(AnalyticsService.find_dirty_pairs(since=timezone.now() + timedelta(minutes=1)), [])
+
+    def test_rollup_is_idempotent_upsert(self):
+        today = timezone.localdate()
+        pairs = AnalyticsService.find_dirty_pairs()
+
+        with self.assertNumQueries(4):
+            AnalyticsService.rollup_daily_analytics(pairs)
+        AnalyticsService.rollup_daily_analytics(pairs)
+
+        analytics = ChatbotAnalytics.objects.get()
+        self.assertEqual(analytics.website, self.website)
+        self.assertEqual(analytics.date, today)
+        self.assertEqual(analytics.total_conversations, 2)
+        self.assertEqual(analytics.total_messages, 4)
+        self.assertEqual(analytics.unique_visitors, 2)
+        self.assertEqual(analytics.avg_conversation_length, 2)
+        self.assertEqual(analytics.conversations_with_multiple_messages, 1)
+        self.assertEqual(analytics.bounce_rate, 50)
+
+        summary = AnalyticsService.get_website_summary(self.website, days=7)
+        self.assertEqual(summary['total_messages'], 4)
+
+
+class SearchConversationsViewTests(TestCase):
+    """Runs against the tsvector index on PostgreSQL and the substring fallback elsewhere"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.client.force_login(self.owner)
+        website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=self.owner)
+        self.conversation = Conversation.objects.create(website=website, user_identifier='shipping-fan')
+        for content in (
+            'How much is shipping to Canada?',
+            'Shipping is free over $50 <b>today</b>',
+            'Do you sell gift cards?',
+            'What does international shipping cost?',
+        ):
+            Message.objects.create(conversation=self.conversation, role='user', content=content)
+
+        other_owner = User.objects.create_user(username='other', password='secret')
+        other_website = Website.objects.create(name='Other', url='https://other.example.com', owner=other_owner)
+        other = Conversation.objects.create(website=other_website)
+        Message.objects.create(conversation=other, role='user', content='shipping elsewhere')
+
+    def test_paginates_ranked_snippets_for_owned_messages(self):
+        seen = []
+        response = self.client.get('/api/conversations/search/', {'q': 'shipping', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['user_identifier'] for c in response.data['conversations']], ['shipping-fan'])
+        while True:
+            seen.extend(response.data['results'])
+            if not response.data['next_cursor']:
+                break
+            response = self.client.get(
+                '/api/conversations/search/', {'q': 'shipping', 'limit': 2, 'cursor': response.data['next_cursor']}
+            )
+            self.assertEqual(response.data['conversations'], [])
+
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(len({hit['message_id'] for hit in seen}), 3)
+        self.assertTrue(all(hit['conversation_id'] == str(self.conversation.id) for hit in seen))
+        self.assertTrue(all('<mark>' in hit['snippet'].lower() for hit in seen))
+
+        # Markup in message text never reaches the snippet; only the highlight is HTML
+        free = next(hit for hit in seen if 'free' in hit['snippet'])
+        self.assertNotIn('<b>', free['snippet'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/conversations/search/', {'q': 'shipping', 'cursor': 'nope'})
+        self.assertEqual(response.status_code, 400)
+
+        # Well-formed cursors with bad values are rejected too
+        key = 0.5 if connection.vendor == 'postgresql' else timezone.now().isoformat()
+        for values in ((key, 'not-a-uuid'), (key, 42), ('high', str(uuid.uuid4())), (None, str(uuid.uuid4()))):
+            response = self.client.get(
+                '/api/conversations/search/', {'q': 'shipping', 'cursor': encode_cursor(*values)}
+            )
+            self.assertEqual(response.status_code, 400, values)
+
+
+class WebsiteConfigEndpointTests(TestCase):
+    """The widget config is served from cache with validators and invalidated on save"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=self.owner)
+        self.url = f'/api/config/{self.website.id}/'
+
+    def test_hot_cache_and_conditional_requests_skip_the_database(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['botName'], 'AI Assistant')
+        self.assertTrue(response['ETag'])
+        self.assertTrue(response['Last-Modified'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+            revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_save_and_delete_invalidate_the_cache(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.website.bot_name = 'ShopBot'
+        self.website.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['botName'], 'ShopBot')
+
+        self.website.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+@override_settings(STORAGES={
+    **settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
+})
+class WidgetLoaderTests(TestCase):
+
+    def test_loader_redirects_to_bundle_with_short_cache(self):
+        response = self.client.get('/widget.js')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], '/static/assets/js/chatbot-widget.min.js')
+        self.assertIn('max-age=300', response['Cache-Control'])
+        self.assertIn('public', response['Cache-Control'])
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.client.force_login(self.owner)
+        self.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=self.owner)
+        self.conversation = Conversation.objects.create(website=self.website)
+        Message.objects.bulk_create([
+            Message(conversation=self.conversation, role='user', content=f'message {i}') for i in range(7)
+        ])
+        # Pages follow insert order (seq), whatever the timestamps say
+        base = timezone.now() - timedelta(minutes=1)
+        for message in Message.objects.all():
+            Message.objects.filter(pk=message.pk).update(timestamp=base)
+        self.expected = list(Message.objects.order_by('seq').values_list('id', flat=True))
+        self.url = f'/api/conversations/{self.conversation.id}/messages/'
+
+    def test_latest_page_then_scroll_back_and_catch_up(self):
+        response = self.client.get(self.url, {'limit': 3})
+        self.assertEqual(response.status_code, 200)
+        pages = [response.data['messages']]
+        self.assertFalse(response.data['has_newer'])
+        after_cursor = response.data['after_cursor']
+
+        with self.assertNumQueries(4):
+            # Session, user, conversation lookup and one bounded SELECT; no COUNT or OFFSET
+            response = self.client.get(self.url, {'limit': 3, 'before': response.data['before_cursor']})
+        pages.insert(0, response.data['messages'])
+        response = self.client.get(self.url, {'limit': 3, 'before': response.data['before_cursor']})
+        pages.insert(0, response.data['messages'])
+        self.assertFalse(response.data['has_older'])
+        self.assertIsNone(response.data['before_cursor'])
+
+        ids = [message['id'] for page in pages for message in page]
+        self.assertEqual(ids, [str(pk) for pk in self.expected])
+
+        # Nothing newer yet, then a new message appears after the cursor
+        response = self.client.get(self.url, {'after': after_cursor})
+        self.assertEqual((response.data['messages'], response.data['after_cursor']), ([], after_cursor))
+        new = Message.objects.create(conversation=self.conversation, role='assistant', content='reply')
+        response = self.client.get(self.url, {'after': after_cursor})
+        self.assertEqual([message['id'] for message in response.data['messages']], [str(new.id)])
+
+    def test_conversation_list_pages_newest_first(self):
+        for _ in range(4):
+            Conversation.objects.create(website=self.website)
+        expected = [str(pk) for pk in Conversation.objects.order_by('-started_at', '-id').values_list('id', flat=True)]
+        url = f'/api/websites/{self.website.id}/conversations/'
+
+        seen, params = [], {'page_size': 2}
+        while True:
+            response = self.client.get(url, params)
+            seen.extend(conversation['id'] for conversation in response.data['results'])
+            if not response.data['has_next']:
+                break
+            params = {'page_size': 2, 'before': response.data['next_cursor']}
+        self.assertEqual(seen, expected)
+
+        # Paging forward again from the last page
+        response = self.client.get(url, {'page_size': 2, 'after': response.data['previous_cursor']})
+        self.assertEqual([c['id'] for c in response.data['results']], expected[2:4])
+        self.assertTrue(response.data['has_previous'])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'before': 'garbage'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'before': encode_cursor('not a date', 'x')}).status_code, 400)
+
+
+class ConversationCounterTests(TransactionTestCase):
+    """Message.save() keeps the conversation counters in step with the messages"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=self.owner)
+        self.conversation = Conversation.objects.create(website=self.website)
+
+    def counters(self, conversation):
+        conversation.refresh_from_db()
+        return conversation.total_messages, conversation.user_messages, conversation.bot_messages
+
+    def test_sequential_saves(self):
+        for role in ('user', 'assistant', 'user', 'system', 'assistant', 'user'):
+            Message.objects.create(conversation=self.conversation, role=role, content=role)
+        # The in-memory instance is bumped along with the row
+        self.assertEqual(
+            (self.conversation.total_messages, self.conversation.user_messages, self.conversation.bot_messages),
+            (6, 3, 2)
+        )
+        self.assertEqual(self.counters(self.conversation), (6, 3, 2))
+
+        # Editing a message does not count it again
+        message = Message.objects.filter(conversation=self.conversation).first()
+        message.content = 'edited'
+        message.save()
+        self.assertEqual(self.counters(self.conversation), (6, 3, 2))
+
+    def test_saves_from_stale_instances_keep_the_counters(self):
+        counters = ('total_messages', 'user_messages', 'bot_messages', 'last_message_seq', 'requires_attention')
+        stale = Conversation.objects.select_related('website').get(pk=self.conversation.pk)
+        Message.objects.create(conversation=self.conversation, role='user', content='hi')
+        Message.objects.create(conversation=self.conversation, role='assistant', content='Hello!')
+        Conversation.objects.filter(pk=self.conversation.pk).update(requires_attention=True)
+        self.conversation.refresh_from_db()
+        expected = [getattr(self.conversation, name) for name in counters]
+        self.assertEqual(expected, [2, 1, 1, 2, True])
+
+        # The visitor socket renames the conversation through its cached instance
+        async_to_sync(ChatConsumer().update_user_identifier)(stale, 'visitor@example.com')
+        stale.end_conversation()
+
+        self.conversation.refresh_from_db()
+        self.assertEqual([getattr(self.conversation, name) for name in counters], expected)
+        self.assertEqual((self.conversation.user_identifier, self.conversation.is_active), ('visitor@example.com', False))
+        self.assertEqual(Message.objects.create(conversation=stale, role='user', content='still there?').seq, 3)
+        # The in-memory instance follows the insert
+        self.assertEqual(stale.last_message_seq, 3)
+
+    @skipIf(connection.vendor == 'sqlite', 'SQLite serializes writers with a database lock')
+    def test_concurrent_saves(self):
+        writers, per_writer = 4, 10
+        barrier = threading.Barrier(writers)
+        errors = []
+
+        def write(index):
+            try:
+                # Each thread works on its own, possibly stale, conversation instance
+                conversation = Conversation.objects.get(pk=self.conversation.pk)
+                barrier.wait()
+                for number in range(per_writer):
+                    role = 'user' if number % 2 else 'assistant'
+                    Message.objects.create(conversation=conversation, role=role, content=f'{index}-{number}')
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=write, args=(index,)) for index in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        total = writers * per_writer
+        self.assertEqual(self.counters(self.conversation), (total, total // 2, total // 2))
+        self.assertEqual(
+            sorted(Message.objects.filter(conversation=self.conversation).values_list('seq', flat=True)),
+            list(range(1, total + 1))
+        )
+
+    def test_reconcile_repairs_drifted_counters(self):
+        for role in ('user', 'assistant', 'user'):
+            Message.objects.create(conversation=self.conversation, role=role, content=role)
+        healthy = Conversation.objects.create(website=self.website)
+        Message.objects.create(conversation=healthy, role='user', content='hi')
+        Conversation.objects.filter(pk=self.conversation.pk).update(total_messages=7, user_messages=0, bot_messages=5)
+
+        out = StringIO()
+        call_command('reconcile_conversation_counters', dry_run=True, stdout=out)
+        self.assertIn('Checked 2 conversations, would fix 1', out.getvalue())
+        self.assertEqual(self.counters(self.conversation), (7, 0, 5))
+
+        out = StringIO()
+        call_command('reconcile_conversation_counters', batch_size=1, stdout=out)
+        self.assertIn('Checked 2 conversations, fixed 1', out.getvalue())
+        self.assertEqual(self.counters(self.conversation), (3, 2, 1))
+        self.assertEqual(self.counters(healthy), (1, 1, 0))
+
+
+class MessageSequenceTests(TestCase):
+
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', password='secret')
+        self.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=owner)
+        self.conversation = Conversation.objects.create(website=self.website)
+
+    def test_numbers_are_per_conversation_and_follow_inserts(self):
+        other = Conversation.objects.create(website=self.website)
+        first = Message.objects.create(conversation=self.conversation, role='user', content='hi')
+        Message.objects.create(conversation=other, role='user', content='hello')
+        second = Message.objects.create(conversation=self.conversation, role='assistant', content='Hi!')
+        self.assertEqual((first.seq, second.seq), (1, 2))
+        self.assertEqual(Message.objects.get(conversation=other).seq, 1)
+
+        # The seq reservation and the counters share one UPDATE
+        self.conversation.refresh_from_db()
+        self.assertEqual(
+            (self.conversation.last_message_seq, self.conversation.total_messages, self.conversation.bot_messages),
+            (2, 2, 1)
+        )
+
+        # Saving an existing message keeps its number
+        first.content = 'hi there'
+        first.save()
+        self.assertEqual(Message.objects.get(pk=first.pk).seq, 1)
+
+    def test_bulk_create_numbers_each_conversation_once(self):
+        other = Conversation.objects.create(website=self.website)
+        Message.objects.create(conversation=self.conversation, role='user', content='before')
+        with self.assertNumQueries(5):
+            # A savepoint pair, one UPDATE per conversation and a single INSERT
+            Message.objects.bulk_create([
+                Message(conversation=conversation, role='user', content=str(i))
+                for i, conversation in enumerate([self.conversation, other, self.conversation])
+            ])
+        self.assertEqual(
+            list(Message.objects.filter(conversation=self.conversation).order_by('seq').values_list('content', 'seq')),
+            [('before', 1), ('0', 2), ('2', 3)]
+        )
+        self.assertEqual(Message.objects.get(conversation=other).seq, 1)
+
+    def test_seq_is_unique_within_a_conversation(self):
+        Message.objects.create(conversation=self.conversation, role='user', content='hi')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Message.objects.bulk_create([Message(conversation=self.conversation, role='user', content='dup', seq=1)])
+
+
+def archive_storage(root, alias='chat_archive'):
+    """Settings that put the transcript archive in `root`"""
+    return override_settings(
+        STORAGES={
+            **settings.STORAGES,
+            alias: {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': root}},
+        },
+        CHAT_ARCHIVE_STORAGE=alias
+    )
+
+
+class ConversationArchiveTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        for override in (archive_storage(self.root), override_settings(CHAT_ARCHIVE_AFTER_DAYS=180)):
+            override.enable()
+            self.addCleanup(override.disable)
+
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=self.owner)
+
+    def conversation(self, ended_days_ago=None, website=None, messages=('hi', 'Hello!')):
+        conversation = Conversation.objects.create(website=website or self.website, user_identifier='visitor')
+        for index, content in enumerate(messages):
+            Message.objects.create(
+                conversation=conversation, role='user' if index % 2 == 0 else 'assistant', content=content
+            )
+        if ended_days_ago is not None:
+            Conversation.objects.filter(pk=conversation.pk).update(
+                is_active=False, ended_at=timezone.now() - timedelta(days=ended_days_ago)
+            )
+        return conversation
+
+    def archive(self, **options):
+        out = StringIO()
+        call_command('archive_conversations', stdout=out, **options)
+        return out.getvalue()
+
+    def test_archives_due_conversations_only(self):
+        due = self.conversation(ended_days_ago=200)
+        recent = self.conversation(ended_days_ago=10)
+        active = self.conversation()
+        strict = Website.objects.create(
+            name='Strict', url='https://strict.example.com', owner=self.owner, archive_after_days=7
+        )
+        strict_due = self.conversation(ended_days_ago=10, website=strict)
+
+        self.assertIn('2 conversations are due', self.archive(dry_run=True))
+        self.assertIn('Archived 2 conversations (4 messages) in 2 files', self.archive())
+
+        self.assertFalse(Message.objects.filter(conversation__in=[due, strict_due]).exists())
+        self.assertEqual(Message.objects.filter(conversation__in=[recent, active]).count(), 4)
+        archive = ConversationArchive.objects.get(conversation=due)
+        self.assertEqual(archive.message_count, 2)
+        # Conversation rows and their counters stay
+        self.assertEqual(Conversation.objects.get(pk=due.pk).total_messages, 2)
+
+        # Archive files are plain gzipped JSONL
+        with gzip.open(os.path.join(self.root, archive.file), 'rt') as handle:
+            header, *rows = [json.loads(line) for line in handle]
+        self.assertEqual(header['conversation_id'], str(due.pk))
+        self.assertEqual([(row['seq'], row['content']) for row in rows], [(1, 'hi'), (2, 'Hello!')])
+
+        # Nothing is archived twice
+        self.assertIn('Archived 0 conversations', self.archive())
+
+    def test_archiving_is_opt_in(self):
+        self.conversation(ended_days_ago=2000)
+        with override_settings(CHAT_ARCHIVE_AFTER_DAYS=None):
+            self.assertIn('Archived 0 conversations', self.archive())
+            Website.objects.filter(pk=self.website.pk).update(archive_after_days=365)
+            self.assertIn('Archived 1 conversations', self.archive())
+
+    def test_archives_go_to_the_configured_storage(self):
+        conversation = self.conversation(ended_days_ago=200)
+        with tempfile.TemporaryDirectory() as root, archive_storage(root, alias='transcripts'):
+            self.archive()
+            archive = ConversationArchive.objects.get()
+            self.assertTrue(os.path.exists(os.path.join(root, archive.file)))
+            self.assertEqual(ConversationArchiveService.read(archive)[0]['conversation_id'], str(conversation.pk))
+        self.assertFalse(os.listdir(self.root))
+
+    def test_batches_can_stop_and_resume(self):
+        conversations = [self.conversation(ended_days_ago=200 + index) for index in range(3)]
+
+        self.assertIn('Archived 2 conversations (4 messages) in 2 files', self.archive(batch_size=1, max_batches=2))
+        # Oldest first
+        self.assertFalse(ConversationArchive.objects.filter(conversation=conversations[0]).exists())
+        self.assertIn('Archived 1 conversations', self.archive(batch_size=1))
+        self.assertEqual(ConversationArchive.objects.count(), 3)
+
+    def test_batch_shares_one_file(self):
+        conversations = [self.conversation(ended_days_ago=200, messages=[f'q{i}', f'a{i}']) for i in range(3)]
+        self.assertIn('in 1 files', self.archive())
+        archives = list(ConversationArchive.objects.order_by('offset'))
+        self.assertEqual(len({archive.file for archive in archives}), 1)
+        for archive in archives:
+            header, rows = ConversationArchiveService.read(archive)
+            self.assertEqual(header['conversation_id'], str(archive.conversation_id))
+            self.assertEqual(len(rows), 2)
+        self.assertEqual({str(archive.conversation_id) for archive in archives}, {str(c.pk) for c in conversations})
+
+    def test_detail_view_reads_the_archive_back(self):
+        conversation = self.conversation(ended_days_ago=200)
+        self.client.force_login(self.owner)
+        url = f'/api/conversations/{conversation.id}/'
+        before = self.client.get(url).json()
+        self.assertFalse(before['archived'])
+
+        self.assertEqual(archive_old_conversations()['conversations'], 1)
+        late = Message.objects.create(conversation=conversation, role='user', content='still there?')
+        response = self.client.get(url).json()
+
+        self.assertTrue(response['archived'])
+        self.assertEqual(response['messages'][:2], before['messages'])
+        self.assertEqual([m['id'] for m in response['messages'][2:]], [str(late.id)])
+        self.assertEqual(response['messages'][2]['seq'], 3)
+
+    def test_missing_archive_file(self):
+        conversation = self.conversation(ended_days_ago=200)
+        self.archive()
+        os.remove(os.path.join(self.root, ConversationArchive.objects.get().file))
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.get(f'/api/conversations/{conversation.id}/').status_code, 503)
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=self.owner)
+        self.first = Conversation.objects.create(website=self.website, user_identifier='alice')
+        self.second = Conversation.objects.create(
+            website=self.website, user_identifier='bob', requires_attention=True
+        )
+        for conversation in (self.first, self.second):
+            Message.objects.create(conversation=conversation, role='user', content=f'Hi, "{conversation.user_identifier}"')
+            Message.objects.create(conversation=conversation, role='assistant', content='Hello,\nhow can I help?')
+        other = Website.objects.create(
+            name='Other', url='https://other.example.com', owner=User.objects.create_user(username='other')
+        )
+        Message.objects.create(
+            conversation=Conversation.objects.create(website=other, user_identifier='mallory'), role='user', content='x'
+        )
+        self.client.force_login(self.owner)
+
+    def export(self, **params):
+        response = self.client.get('/api/conversations/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_messages_csv(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="messages-', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(StringIO(body.decode())))
+        self.assertEqual(len(rows), 4)
+        ordered = sorted([self.first, self.second], key=lambda conversation: conversation.id)
+        self.assertEqual(
+            [(row['conversation_id'], row['seq']) for row in rows],
+            [(str(conversation.id), seq) for conversation in ordered for seq in ('1', '2')]
+        )
+        self.assertEqual(rows[1]['content'], 'Hello,\nhow can I help?')
+        self.assertEqual({row['website_id'] for row in rows}, {str(self.website.id)})
+
+    def test_jsonl_gzip_with_filters(self):
+        response, body = self.export(output='jsonl', gzip='1', requires_attention='true')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertTrue(response['Content-Disposition'].endswith('.jsonl.gz"'))
+
+        rows = [json.loads(line) for line in gzip.decompress(body).splitlines()]
+        self.assertEqual([row['content'] for row in rows], ['Hi, "bob"', 'Hello,\nhow can I help?'])
+        self.assertEqual(rows[0]['user_identifier'], 'bob')
+        self.assertEqual(rows[0]['timestamp'], Message.objects.get(pk=rows[0]['id']).timestamp.isoformat())
+
+        tomorrow = (timezone.now() + timedelta(days=1)).date().isoformat()
+        _, body = self.export(output='jsonl', since=tomorrow)
+        self.assertEqual(body, b'')
+        _, body = self.export(output='jsonl', until=tomorrow, website_id=str(self.website.id))
+        self.assertEqual(len(body.splitlines()), 4)
+
+    def test_archived_transcripts_are_merged(self):
+        Conversation.objects.filter(pk=self.first.pk).update(
+            is_active=False, ended_at=timezone.now() - timedelta(days=400)
+        )
+        with tempfile.TemporaryDirectory() as root, archive_storage(root), \
+                override_settings(CHAT_ARCHIVE_AFTER_DAYS=180):
+            ConversationArchiveService.run()
+            Message.objects.create(conversation=self.first, role='user', content='back again')
+            _, body = self.export(output='jsonl')
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        first = [row for row in rows if row['conversation_id'] == str(self.first.id)]
+        self.assertEqual([row['seq'] for row in first], [1, 2, 3])
+        self.assertEqual(first[0]['user_identifier'], 'alice')
+        self.assertEqual(len(rows), 5)
+
+    def test_conversation_and_analytics_datasets(self):
+        ChatbotAnalytics.objects.create(website=self.website, date=timezone.now().date(), total_messages=4)
+        _, body = self.export(dataset='conversations')
+        rows = list(csv.DictReader(StringIO(body.decode())))
+        self.assertEqual([row['user_identifier'] for row in rows], ['alice', 'bob'])
+        self.assertEqual(rows[1]['requires_attention'], 'True')
+        self.assertEqual(rows[0]['total_messages'], '2')
+
+        _, body = self.export(dataset='analytics', output='jsonl')
+        self.assertEqual(json.loads(body)['total_messages'], 4)
+
+    def test_rows_are_fetched_while_streaming(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/conversations/export/')
+            before = len(queries)
+            b''.join(response.streaming_content)
+        self.assertGreater(len(queries), before)
+
+    def test_invalid_parameters(self):
+        for params in ({'dataset': 'users'}, {'output': 'xml'}, {'since': 'yesterday'}, {'website_id': 'nope'}):
+            self.assertEqual(self.client.get('/api/conversations/export/', params).status_code, 400)
+
+
+class SeedDataTests(TestCase):
+
+    def seed(self, *args, **options):
+        out = StringIO()
+        call_command('seed_chat_data', *args, stdout=out, **options)
+        return out.getvalue()
+
+    def assertCountersMatch(self):
+        for conversation in Conversation.objects.annotate(
+            actual_total=Count('messages'),
+            actual_user=Count('messages', filter=Q(messages__role='user')),
+            actual_bot=Count('messages', filter=Q(messages__role='assistant')),
+            max_seq=Max('messages__seq'),
+        ):
+            self.assertEqual(
+                (conversation.total_messages, conversation.user_messages, conversation.bot_messages,
+                 conversation.last_message_seq),
+                (conversation.actual_total, conversation.actual_user, conversation.actual_bot,
+                 conversation.max_seq or 0)
+            )
+
+    def test_generates_with_bulk_inserts(self):
+        with CaptureQueriesContext(connection) as queries:
+            output = self.seed(websites=2, conversations=5, messages=4, distribution='fixed', seed=1, owner='bench')
+        self.assertIn('Created 2 websites, 10 conversations and 40 messages', output)
+
+        statements = [query['sql'] for query in queries]
+        self.assertEqual(sum(sql.startswith('INSERT INTO "chatbot_message"') for sql in statements), 1)
+        self.assertFalse([sql for sql in statements if sql.startswith('UPDATE "chatbot_conversation"')])
+        self.assertEqual(Website.objects.filter(owner__username='bench').count(), 2)
+        self.assertCountersMatch()
+
+        # Timestamps are spread over --days instead of all being now()
+        started = Conversation.objects.aggregate(first=Min('started_at'), last=Max('started_at'))
+        self.assertGreater(started['last'] - started['first'], timedelta(days=1))
+        conversation = Conversation.objects.first()
+        timestamps = list(conversation.messages.order_by('seq').values_list('timestamp', flat=True))
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertGreater(timestamps[0], conversation.started_at)
+        self.assertTrue(Message._meta.get_field('timestamp').auto_now_add)
+
+    def test_distributions_and_batches(self):
+        self.seed(websites=1, conversations=50, messages=6, seed=3, batch_size=20)
+        counts = list(Conversation.objects.values_list('total_messages', flat=True))
+        self.assertEqual(len(counts), 50)
+        self.assertGreater(len(set(counts)), 1)
+        self.assertEqual(sum(counts), Message.objects.count())
+        self.assertCountersMatch()
+
+    def test_imports_an_export(self):
+        owner = User.objects.create_user(username='owner', password='secret')
+        source = Website.objects.create(name='Shop', url='https://shop.example.com', owner=owner)
+        target = Website.objects.create(name='Copy', url='https://copy.example.com', owner=owner)
+        for name in ('alice', 'bob'):
+            conversation = Conversation.objects.create(website=source, user_identifier=name)
+            for role, content in (('user', f'Hi from {name}'), ('assistant', 'Hello!'), ('user', 'Thanks')):
+                Message.objects.create(conversation=conversation, role=role, content=content)
+        self.client.force_login(owner)
+        response = self.client.get('/api/conversations/export/', {'output': 'jsonl', 'gzip': '1'})
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'messages.jsonl.gz')
+            with open(path, 'wb') as handle:
+                handle.writelines(response.streaming_content)
+            self.assertIn('2 conversations and 6 messages', self.seed(import_path=path, website=str(target.id)))
+            with self.assertRaisesMessage(CommandError, 'does not exist'):
+                self.seed(import_path=path, website=str(uuid.uuid4()))
+
+        copies = Conversation.objects.filter(website=target).order_by('user_identifier')
+        self.assertEqual([c.user_identifier for c in copies], ['alice', 'bob'])
+        self.assertEqual(
+            list(copies[0].messages.order_by('seq').values_list('seq', 'role', 'content')),
+            [(1, 'user', 'Hi from alice'), (2, 'assistant', 'Hello!'), (3, 'user', 'Thanks')]
+        )
+        original = Message.objects.get(conversation__website=source, content='Hi from alice')
+        self.assertEqual(copies[0].messages.get(seq=1).timestamp, original.timestamp)
+        self.assertCountersMatch()
+
+
+class ConversationSummaryTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=self.owner)
+
+    def add_messages(self, conversation, *roles):
+        start = timezone.now() - timedelta(hours=1)
+        Message.objects.bulk_create([
+            Message(conversation=conversation, role=role, content=f'{i:02d} {role} message ' + 'x' * 200)
+            for i, role in enumerate(roles)
+        ])
+        for i, message in enumerate(conversation.messages.order_by('content')):
+            Message.objects.filter(pk=message.pk).update(timestamp=start + timedelta(minutes=i))
+
+    def test_last_message_and_unread_count(self):
+        waiting = Conversation.objects.create(website=self.website)
+        self.add_messages(waiting, 'user', 'assistant', 'user', 'user')
+        answered = Conversation.objects.create(website=self.website)
+        self.add_messages(answered, 'user', 'assistant')
+        unanswered = Conversation.objects.create(website=self.website)
+        self.add_messages(unanswered, 'user', 'user')
+        empty = Conversation.objects.create(website=self.website)
+
+        with self.assertNumQueries(1):
+            summaries = {
+                conversation.pk: conversation
+                for conversation in ConversationSummaryService.annotate_summaries(Conversation.objects.all())
+            }
+
+        self.assertEqual(summaries[waiting.pk].unread_count, 2)
+        self.assertEqual(summaries[waiting.pk].last_message_role, 'user')
+        self.assertTrue(summaries[waiting.pk].last_message_preview.startswith('03 user message'))
+        self.assertEqual(len(summaries[waiting.pk].last_message_preview), ConversationSummaryService.PREVIEW_CHARS)
+        self.assertEqual(summaries[answered.pk].unread_count, 0)
+        self.assertEqual(summaries[answered.pk].last_message_role, 'assistant')
+        self.assertEqual(summaries[unanswered.pk].unread_count, 2)
+        self.assertIsNone(summaries[empty.pk].last_message_at)
+        self.assertEqual(summaries[empty.pk].unread_count, 0)
+
+    @patch('chatbot.views.render', side_effect=evaluate_context)
+    def test_live_chat_queries_do_not_grow_with_conversations(self, render):
+        self.client.force_login(self.owner)
+        for _ in range(3):
+            self.add_messages(Conversation.objects.create(website=self.website), 'user', 'assistant')
+
+        with CaptureQueriesContext(connection) as few:
+            self.client.get('/live-chat/')
+        for _ in range(10):
+            self.add_messages(Conversation.objects.create(website=self.website), 'user', 'assistant', 'user')
+        with CaptureQueriesContext(connection) as many:
+            self.client.get('/live-chat/')
+
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(len(render.call_args.args[2]['active_conversations']), 13)
+
+
+    @patch('chatbot.views.LIVE_CHAT_SIDEBAR_LIMIT', 2)
+    def test_live_chat_lists_waiting_conversations_first(self):
+        self.client.force_login(self.owner)
+        waiting = Conversation.objects.create(website=self.website, requires_attention=True)
+        Conversation.objects.filter(pk=waiting.pk).update(started_at=timezone.now() - timedelta(days=3))
+        newest = [Conversation.objects.create(website=self.website) for _ in range(3)][-1]
+
+        response = self.client.get('/live-chat/')
+        context = response.context
+        self.assertEqual([c.pk for c in context['active_conversations']], [waiting.pk, newest.pk])
+        self.assertEqual((context['active_conversations_count'], context['hidden_conversations_count']), (4, 2))
+        self.assertContains(response, '2 older conversations not shown')
+
+
+class DashboardStatsServiceTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.client.force_login(self.owner)
+        website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=self.owner)
+        Website.objects.create(name='Blog', url='https://blog.example.com', owner=self.owner)
+        self.conversation = Conversation.objects.create(website=website, requires_attention=True)
+        ended = Conversation.objects.create(website=website, is_active=False)
+        for conversation in (self.conversation, ended):
+            Message.objects.create(conversation=conversation, role='user', content='hi')
+        Conversation.objects.filter(pk=ended.pk).update(started_at=timezone.now() - timedelta(days=3))
+
+        other = User.objects.create_user(username='other', password='secret')
+        other_website = Website.objects.create(name='Other', url='https://other.example.com', owner=other)
+        Message.objects.create(conversation=Conversation.objects.create(website=other_website), role='user', content='x')
+
+    def test_counters_are_computed_in_two_queries_then_served_from_cache(self):
+        expected = {
+            'total_websites': 2,
+            'total_conversations': 2,
+            'active_conversations': 1,
+            'conversations_needing_attention': 1,
+            'total_messages': 2,
+            'today_conversations': 1,
+            'today_messages': 2,
+        }
+        with self.assertNumQueries(2):
+            self.assertEqual(DashboardStatsService.get(self.owner.id), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(DashboardStatsService.get(self.owner.id), expected)
+
+        response = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(response.json(), expected)
+
+    def test_notifications_apply_deltas_to_cached_counters(self):
+        before = DashboardStatsService.get(self.owner.id)
+
+        conversation = Conversation.objects.create(website=self.conversation.website)
+        message = Message.objects.create(conversation=conversation, role='user', content='hello')
+        route = NotificationRoute.for_website(self.conversation.website)
+        NotificationService.notify_new_conversation(route, conversation)
+        NotificationService.notify_new_message(route, message)
+
+        with self.assertNumQueries(0):
+            after = DashboardStatsService.get(self.owner.id)
+        for field in ('total_conversations', 'active_conversations', 'today_conversations',
+                      'total_messages', 'today_messages'):
+            self.assertEqual(after[field], before[field] + 1, field)
+
+        # The cached values match a fresh computation
+        DashboardStatsService.invalidate(self.owner.id)
+        self.assertEqual(DashboardStatsService.get(self.owner.id), after)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class NotificationServiceTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', password='secret')
+        self.website = Website.objects.create(name='Shop', url='https://shop.example.com', owner=self.owner)
+        self.conversation = Conversation.objects.create(website=self.website)
+        self.message = Message.objects.create(conversation=self.conversation, role='user', content='hello')
+        self.route = NotificationRoute.for_website(self.website)
+        self.layer = get_channel_layer()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(NotificationService.website_group(self.website.id), self.channel)
+
+    def test_publishing_needs_no_queries_and_does_not_block_the_caller(self):
+        with self.assertNumQueries(0):
+            NotificationService.notify_new_message(self.route, self.message, agent_id=self.owner.id)
+        self.assertTrue(NotificationPublisher.flush(timeout=2))
+
+        event = frame_of(async_to_sync(self.layer.receive)(self.channel))
+        self.assertEqual(event['type'], 'new_message')
+        self.assertEqual(event['website_id'], str(self.website.id))
+        self.assertEqual(event['message']['id'], str(self.message.id))
+        self.assertEqual(event['message']['agent_id'], self.owner.id)
+
+    def test_sends_beyond_the_buffer_are_dropped(self):
+        dropped = NotificationPublisher.dropped
+        with override_settings(NOTIFICATION_BUFFER_SIZE=0):
+            NotificationService.notify_conversation_updated(self.route, self.conversation.id, requires_attention=False)
+        # One event for the visitor sockets, one for the dashboards
+        self.assertEqual(NotificationPublisher.dropped, dropped + 2)
+
+    def test_inline_publishing_when_background_publish_is_off(self):
+        chat_channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(NotificationService.chat_group(self.conversation.id), chat_channel)
+
+        with override_settings(NOTIFICATION_BACKGROUND_PUBLISH=False):
+            NotificationService.notify_conversation_ended(self.route, self.conversation.id)
+
+        visitor_event = frame_of(async_to_sync(self.layer.receive)(chat_channel))
+        dashboard_event = frame_of(async_to_sync(self.layer.receive)(self.channel))
+        self.assertEqual(visitor_event['type'], 'conversation_ended')
+        self.assertEqual(dashboard_event['conversation_id'], str(self.conversation.id))
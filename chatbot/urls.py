@@ -33,7 +33,9 @@ urlpatterns = [
     # Public API endpoints
     path('api/config/<uuid:website_id>/', views.get_website_config, name='website-config'),
     path('api/chat/<uuid:website_id>/', views.chat_api, name='chat-api'),
-    path('static/assets/js/chatbot-widget.js', views.serve_widget_script, name='widget-script'),
+    path('api/chat/<uuid:website_id>/<uuid:conversation_id>/history/', views.chat_history, name='chat-history'),
+    path('widget.js', views.serve_widget_script, name='widget-script'),
+    path('metrics', views.metrics_view, name='metrics'),
     
     # Authenticated API endpoints
     path('api/websites/', views.WebsiteListCreateView.as_view(), name='website-list'),
@@ -43,6 +45,7 @@ urlpatterns = [
     path('api/conversations/<uuid:conversation_id>/end/', views.end_conversation, name='end-conversation'),
     path('api/websites/<uuid:website_id>/analytics/', views.AnalyticsView.as_view(), name='analytics'),
     path('api/conversations/search/', views.SearchConversationsView.as_view(), name='search-conversations'),
+    path('api/conversations/export/', views.export_conversations, name='export-conversations'),
     path('api/dashboard/stats/', views.dashboard_stats, name='dashboard-stats'),
     
     # New endpoints for live chat
@@ -1,9 +1,8 @@
-import json
 import logging
 import uuid
 from datetime import datetime, timedelta
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, HttpResponse, Http404
+from django.http import HttpResponse, HttpResponseRedirect, Http404, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
@@ -11,52 +10,82 @@ from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView, CreateView
 from django.db.models import Q, Count, Avg
 from django.utils import timezone
-from django.core.paginator import Paginator
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
+from . import codec, metrics
+from .codec import JsonResponse
 from .models import Website, Conversation, Message, ChatbotAnalytics
-from .serializers import WebsiteSerializer, ConversationSerializer, MessageSerializer
-from .services import AnalyticsService, NotificationService
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from .serializers import WebsiteSerializer, ConversationSerializer, ConversationListSerializer, MessageSerializer
+from .pagination import (
+    CONVERSATION_KEYSET, MAX_MESSAGE_PAGE_SIZE, MESSAGE_KEYSET, MESSAGE_PAGE_SIZE, InvalidCursor, keyset_window,
+)
+from .services import (
+    AnalyticsService, ConversationArchiveService, ConversationSearchService, ConversationSummaryService,
+    DashboardStatsService, NotificationRoute, NotificationService, ReplayBuffer, ResponseCache, TimeSeriesService,
+    TranscriptExportService, WebsiteConfigCache,
+)
 
 logger = logging.getLogger(__name__)
 
+# Most recent active conversations listed in the live chat sidebar
+LIVE_CHAT_SIDEBAR_LIMIT = 200
+
 # Public API Views (No Authentication Required)
 
 @csrf_exempt
-@require_http_methods(["GET"])
+@require_http_methods(["GET", "HEAD"])
 def get_website_config(request, website_id):
     """Get website configuration for chatbot widget"""
     try:
-        website = get_object_or_404(Website, id=website_id, is_active=True)
+        entry = WebsiteConfigCache.get(website_id)
+        if entry is None:
+            return JsonResponse({'error': 'Configuration not found'}, status=404)
+        
+        # Answer revalidations from browsers and CDNs with a 304 when nothing changed
+        response = get_conditional_response(
+            request,
+            etag=entry['etag'],
+            last_modified=int(entry['last_modified']),
+        )
+        if response is None:
+            response = HttpResponse(entry['body'], content_type='application/json')
         
-        config = {
-            'websiteId': str(website.id),
-            'botName': website.bot_name,
-            'welcomeMessage': website.welcome_message,
-            'theme': website.theme,
-            'position': website.position,
-            'allowFileUpload': website.allow_file_upload,
-            'collectUserInfo': website.collect_user_info,
-            'showTypingIndicator': website.show_typing_indicator,
-            'enableSound': website.enable_sound,
-            'maxMessages': website.max_messages,
-            'autoConnect': True,
-            'showAvatar': True,
-            'allowMinimize': True,
-            'allowClose': True
-        }
-        
-        return JsonResponse(config)
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'WEBSITE_CONFIG_MAX_AGE', 60))
+        return response
     except Exception as e:
         logger.error(f"Error getting website config: {e}")
         return JsonResponse({'error': 'Configuration not found'}, status=404)
 
 
+@csrf_exempt
+@require_http_methods(["GET"])
+def chat_history(request, website_id, conversation_id):
+    """Latest messages of a visitor's conversation, for a widget whose resume was incomplete"""
+    try:
+        limit = min(int(request.GET.get('limit', MESSAGE_PAGE_SIZE)), MAX_MESSAGE_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    if limit < 1:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    
+    # The conversation id is the visitor's secret, as on the chat socket
+    return JsonResponse({
+        'conversation_id': str(conversation_id),
+        'messages': ReplayBuffer.history(website_id, conversation_id, limit)
+    })
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def chat_api(request, website_id):
@@ -64,7 +93,7 @@ def chat_api(request, website_id):
     try:
         website = get_object_or_404(Website, id=website_id, is_active=True)
         
-        data = json.loads(request.body)
+        data = codec.loads(request.body)
         user_message = data.get('message', '').strip()
         conversation_id = data.get('conversationId')
         user_identifier = data.get('userIdentifier', 'Anonymous')
@@ -94,18 +123,19 @@ def chat_api(request, website_id):
             content=user_message
         )
         
-        # Update conversation
-        conversation.total_messages = conversation.messages.count()
+        # Update conversation (message counters are maintained by Message.save())
         conversation.requires_attention = True
-        conversation.save()
+        conversation.save(update_fields=['requires_attention'])
         
-        # Notify dashboard
+        # Notify dashboard (and any chat socket of this conversation, which caches its state)
         try:
-            NotificationService.notify_new_message(user_msg)
+            route = NotificationRoute.for_website(website)
+            NotificationService.notify_new_message(route, user_msg)
+            NotificationService.notify_conversation_updated(route, conversation.id, requires_attention=True)
             
             # Notify new conversation if this is the first message
             if conversation.total_messages == 1:
-                NotificationService.notify_new_conversation(conversation)
+                NotificationService.notify_new_conversation(route, conversation)
         except Exception as e:
             logger.error(f"Error sending notifications: {e}")
         
@@ -119,29 +149,40 @@ def chat_api(request, website_id):
             'is_manual': False
         })
         
-    except json.JSONDecodeError:
+    except codec.DecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
     except Exception as e:
         logger.error(f"Error in chat API: {e}")
         return JsonResponse({'error': 'Internal server error'}, status=500)
 
 
-@require_http_methods(["GET"])
+@require_http_methods(["GET", "HEAD"])
 def serve_widget_script(request):
-    """Serve the chatbot widget JavaScript file"""
+    """Loader stub: redirect to the current content-hashed widget bundle"""
     try:
-        # Read the widget script from your static files or generate it dynamically
-        script_content = """
-        // Chatbot Widget Script - This would be your actual widget code
-        console.log('Chatbot widget loaded');
-        """
-        
-        response = HttpResponse(script_content, content_type='application/javascript')
-        response['Cache-Control'] = 'max-age=3600'  # Cache for 1 hour
-        return response
-    except Exception as e:
-        logger.error(f"Error serving widget script: {e}")
-        return HttpResponse('// Error loading widget', content_type='application/javascript', status=500)
+        bundle_url = staticfiles_storage.url(settings.WIDGET_BUNDLE)
+    except ValueError:
+        # Bundle not built yet (see the build_widget command); serve the canonical source
+        logger.warning(f"Widget bundle {settings.WIDGET_BUNDLE} missing from the static manifest")
+        bundle_url = staticfiles_storage.url(settings.WIDGET_SOURCE)
+    
+    # The hashed bundle is cached forever, so only this redirect needs a short lifetime
+    response = HttpResponseRedirect(bundle_url)
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'WIDGET_LOADER_MAX_AGE', 300))
+    return response
+
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """Prometheus metrics for this process (bearer METRICS_TOKEN, or a staff session)"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = request.user.is_authenticated and request.user.is_staff
+    if not allowed:
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 # Authenticated API Views
@@ -199,42 +240,52 @@ class ConversationListView(APIView):
         """List conversations for a website"""
         try:
             website = Website.objects.get(id=website_id, owner=request.user)
-            conversations = Conversation.objects.filter(website=website).order_by('-started_at')
+            conversations = Conversation.objects.filter(website=website).select_related('website')
             
-            # Pagination
-            page = int(request.GET.get('page', 1))
-            page_size = int(request.GET.get('page_size', 20))
-            paginator = Paginator(conversations, page_size)
-            
-            page_conversations = paginator.get_page(page)
-            serializer = ConversationSerializer(page_conversations, many=True)
+            # Keyset pagination, newest first: `before` pages back, `after` forward
+            page_size = min(int(request.GET.get('page_size', 20)), 100)
+            window = keyset_window(
+                conversations, CONVERSATION_KEYSET, page_size,
+                before=request.GET.get('before'), after=request.GET.get('after')
+            )
+            serializer = ConversationListSerializer(window['rows'][::-1], many=True)
             
             return Response({
                 'results': serializer.data,
-                'count': paginator.count,
-                'num_pages': paginator.num_pages,
-                'current_page': page,
-                'has_next': page_conversations.has_next(),
-                'has_previous': page_conversations.has_previous()
+                'next_cursor': window['before'],
+                'previous_cursor': window['after'] if window['has_newer'] else None,
+                'has_next': window['has_older'],
+                'has_previous': window['has_newer']
             })
         except Website.DoesNotExist:
             return Response({'error': 'Website not found'}, status=404)
+        except (InvalidCursor, ValueError):
+            return Response({'error': 'Invalid cursor or page_size'}, status=400)
 
 
 class ConversationDetailView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request, pk):
-        """Get conversation details with messages"""
+        """Get conversation details with messages, reading archived transcripts back on demand"""
         try:
-            conversation = Conversation.objects.get(
+            conversation = Conversation.objects.select_related('archive').get(
                 id=pk, 
                 website__owner=request.user
             )
-            serializer = ConversationSerializer(conversation)
-            return Response(serializer.data)
+            data = ConversationSerializer(conversation).data
+            archive = getattr(conversation, 'archive', None)
+            if archive is not None:
+                # Anything saved after archiving follows the archived transcript
+                archived = ConversationArchiveService.load_messages(archive)
+                data['messages'] = MessageSerializer(archived, many=True).data + data['messages']
+            data['archived'] = archive is not None
+            return Response(data)
         except Conversation.DoesNotExist:
             return Response({'error': 'Conversation not found'}, status=404)
+        except OSError as e:
+            logger.error(f"Archived transcript of conversation {pk} could not be read: {e}")
+            return Response({'error': 'Archived transcript unavailable'}, status=503)
 
 
 @api_view(['GET'])
@@ -247,16 +298,27 @@ def get_conversation_messages(request, conversation_id):
             website__owner=request.user
         )
         
-        messages = conversation.messages.order_by('timestamp')
-        serializer = MessageSerializer(messages, many=True)
+        # Latest messages first; `before` scrolls back, `after` catches up
+        limit = min(int(request.GET.get('limit', MESSAGE_PAGE_SIZE)), MAX_MESSAGE_PAGE_SIZE)
+        window = keyset_window(
+            conversation.messages.all(), MESSAGE_KEYSET, limit,
+            before=request.GET.get('before'), after=request.GET.get('after')
+        )
+        serializer = MessageSerializer(window['rows'], many=True)
         
         return Response({
             'conversation_id': str(conversation.id),
             'messages': serializer.data,
-            'total_messages': messages.count()
+            'total_messages': conversation.total_messages,
+            'before_cursor': window['before'],
+            'after_cursor': window['after'],
+            'has_older': window['has_older'],
+            'has_newer': window['has_newer']
         })
     except Conversation.DoesNotExist:
         return Response({'error': 'Conversation not found'}, status=404)
+    except (InvalidCursor, ValueError):
+        return Response({'error': 'Invalid cursor or limit'}, status=400)
 
 
 @api_view(['POST'])
@@ -271,7 +333,7 @@ def send_manual_response(request):
             return Response({'error': 'conversation_id and message are required'}, status=400)
         
         # Get conversation
-        conversation = Conversation.objects.get(
+        conversation = Conversation.objects.select_related('website').get(
             id=conversation_id,
             website__owner=request.user
         )
@@ -281,45 +343,17 @@ def send_manual_response(request):
             conversation=conversation,
             role='assistant',
             content=message_content,
-            # is_manual_response=True
+            is_manual=True
         )
         
-        # Update conversation
-        conversation.total_messages = conversation.messages.count()
+        # Update conversation (message counters are maintained by Message.save())
         conversation.requires_attention = False
-        conversation.save()
-        
-        # Send via WebSocket to visitor
-        channel_layer = get_channel_layer()
-        # async_to_sync(channel_layer.group_send)(
-        #     f'chat_{conversation_id}',
-        #     {
-        #         'type': 'chat_message_from_dashboard',
-        #         'message': message_content,
-        #         'role': 'assistant',
-        #         'conversation_id': conversation_id,
-        #         'timestamp': message.timestamp.isoformat(),
-        #         'agent_id': request.user.id
-        #     }
-        # )
-        
-        # Notify other dashboard users
-        async_to_sync(channel_layer.group_send)(
-            f'dashboard_website_{conversation.website.id}',
-            {
-                'type': 'new_message',
-                'message': {
-                    'id': str(message.id),
-                    'content': message_content,
-                    'role': 'assistant',
-                    'conversation_id': str(conversation.id),
-                    'timestamp': message.timestamp.isoformat(),
-                    'is_manual': True,
-                    'agent_id': request.user.id
-                },
-                'conversation_id': str(conversation.id),
-                'website_id': str(conversation.website.id)
-            }
+        conversation.save(update_fields=['requires_attention'])
+        
+        # Deliver to the visitor and notify other dashboard users (fire-and-forget)
+        NotificationService.notify_agent_reply(message, agent_id=request.user.id)
+        NotificationService.notify_new_message(
+            NotificationRoute.for_website(conversation.website), message, agent_id=request.user.id
         )
         
         return Response({
@@ -341,34 +375,18 @@ def send_manual_response(request):
 def end_conversation(request, conversation_id):
     """End a conversation"""
     try:
-        conversation = Conversation.objects.get(
+        conversation = Conversation.objects.select_related('website').get(
             id=conversation_id,
             website__owner=request.user
         )
         
         conversation.is_active = False
         conversation.ended_at = timezone.now()
-        conversation.save()
-        
-        # Notify visitor via WebSocket
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'chat_{conversation_id}',
-            {
-                'type': 'conversation_ended',
-                'conversation_id': conversation_id,
-                'message': 'This conversation has been ended by an agent.'
-            }
-        )
+        conversation.save(update_fields=['is_active', 'ended_at'])
         
-        # Notify dashboard
-        async_to_sync(channel_layer.group_send)(
-            f'dashboard_website_{conversation.website.id}',
-            {
-                'type': 'conversation_ended',
-                'conversation_id': conversation_id,
-                'website_id': conversation.website.id
-            }
+        # Notify visitor and dashboards
+        NotificationService.notify_conversation_ended(
+            NotificationRoute.for_website(conversation.website), conversation.id
         )
         
         return Response({'success': True, 'message': 'Conversation ended'})
@@ -401,13 +419,16 @@ def active_conversations(request):
 def toggle_conversation_ai(request, conversation_id):
     """Toggle AI responses for a conversation"""
     try:
-        conversation = Conversation.objects.get(
+        conversation = Conversation.objects.select_related('website').get(
             id=conversation_id,
             website__owner=request.user
         )
         
         conversation.ai_enabled = not conversation.ai_enabled
-        conversation.save()
+        conversation.save(update_fields=['ai_enabled'])
+        NotificationService.notify_conversation_updated(
+            NotificationRoute.for_website(conversation.website), conversation.id, ai_enabled=conversation.ai_enabled
+        )
         
         return Response({
             'conversation_id': str(conversation.id),
@@ -426,34 +447,37 @@ class AnalyticsView(APIView):
         try:
             website = Website.objects.get(id=website_id, owner=request.user)
             
-            # Get date range from query params
-            days = int(request.GET.get('days', 30))
+            # Get date range and bucket size from query params
+            granularity = request.GET.get('granularity', 'day')
+            if granularity not in TimeSeriesService.GRANULARITIES:
+                return Response({'error': 'Invalid granularity'}, status=400)
+            max_days = TimeSeriesService.MAX_DAYS[granularity]
+            try:
+                days = int(request.GET.get('days', 30))
+            except ValueError:
+                days = 0
+            if not 1 <= days <= max_days:
+                return Response(
+                    {'error': f'days must be between 1 and {max_days} for {granularity} buckets'}, status=400
+                )
             
             # Get summary statistics
             summary = AnalyticsService.get_website_summary(website, days)
             
-            # Get daily analytics for chart data
-            end_date = timezone.now().date()
-            start_date = end_date - timedelta(days=days)
-            
-            daily_analytics = ChatbotAnalytics.objects.filter(
-                website=website,
-                date__range=[start_date, end_date]
-            ).order_by('date')
-            
-            chart_data = []
-            for analytics in daily_analytics:
-                chart_data.append({
-                    'date': analytics.date.isoformat(),
-                    'conversations': analytics.total_conversations,
-                    'messages': analytics.total_messages,
-                    'visitors': analytics.unique_visitors
-                })
+            # Chart data straight from the live tables, one grouped query per table
+            chart_data = TimeSeriesService.get_activity_series(
+                Conversation.objects.filter(website=website),
+                Message.objects.filter(conversation__website=website),
+                days=days,
+                granularity=granularity,
+            )
             
             return Response({
                 'summary': summary,
                 'chart_data': chart_data,
-                'period_days': days
+                'period_days': days,
+                'granularity': granularity,
+                'response_cache': ResponseCache.stats(website.id)
             })
             
         except Website.DoesNotExist:
@@ -464,74 +488,121 @@ class SearchConversationsView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """Search conversations across all user's websites"""
+        """Search message content across all user's websites
+        
+        Returns ranked message hits with highlighted snippets, paginated with
+        the opaque `cursor` from the previous page. The first page also lists
+        conversations whose visitor identifier matches (or the most recent
+        conversations when there is no query).
+        """
         query = request.GET.get('q', '').strip()
         website_id = request.GET.get('website_id')
+        cursor = request.GET.get('cursor')
         
-        conversations = Conversation.objects.filter(
-            website__owner=request.user
-        )
-        
+        try:
+            limit = int(request.GET.get('limit', ConversationSearchService.PAGE_SIZE))
+            if website_id:
+                website_id = uuid.UUID(website_id)
+        except ValueError:
+            return Response({'error': 'Invalid limit or website_id'}, status=400)
+        
+        conversations = Conversation.objects.filter(website__owner=request.user)
+        messages = Message.objects.filter(conversation__website__owner=request.user)
         if website_id:
             conversations = conversations.filter(website_id=website_id)
+            messages = messages.filter(conversation__website_id=website_id)
         
+        results, next_cursor = [], None
         if query:
-            conversations = conversations.filter(
-                Q(user_identifier__icontains=query) |
-                Q(messages__content__icontains=query)
-            ).distinct()
-        
-        conversations = conversations.order_by('-started_at')[:50]
-        serializer = ConversationSerializer(conversations, many=True)
+            try:
+                results, next_cursor = ConversationSearchService.search(messages, query, cursor, limit)
+            except InvalidCursor as e:
+                return Response({'error': str(e)}, status=400)
+            conversations = conversations.filter(user_identifier__icontains=query)
+        
+        matching_conversations = []
+        if not cursor:
+            matching_conversations = [
+                {
+                    'id': str(conversation['id']),
+                    'website_name': conversation['website__name'],
+                    'user_identifier': conversation['user_identifier'],
+                    'started_at': conversation['started_at'].isoformat(),
+                    'total_messages': conversation['total_messages'],
+                }
+                for conversation in conversations.order_by('-started_at').values(
+                    'id', 'website__name', 'user_identifier', 'started_at', 'total_messages'
+                )[:10 if query else 50]
+            ]
         
         return Response({
-            'results': serializer.data,
+            'results': results,
+            'conversations': matching_conversations,
             'query': query,
-            'count': len(serializer.data)
+            'count': len(results),
+            'next_cursor': next_cursor
         })
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_conversations(request):
+    """Stream an export of the user's conversations as a CSV or JSONL download
+    
+    Query parameters: dataset (messages, conversations or analytics),
+    output (csv or jsonl), website_id, since and until (YYYY-MM-DD, inclusive,
+    on the conversation start or analytics date), requires_attention
+    (true/false) and gzip (1 for a .gz file compressed on the fly).
+    """
+    dataset = request.GET.get('dataset', 'messages')
+    # Not `format`: DRF reserves that one for renderer selection
+    file_format = request.GET.get('output', 'csv')
+    if dataset not in TranscriptExportService.DATASETS or file_format not in TranscriptExportService.FORMATS:
+        return Response({'error': 'Invalid dataset or output'}, status=400)
+    
+    conversations = Conversation.objects.filter(website__owner=request.user)
+    analytics = ChatbotAnalytics.objects.filter(website__owner=request.user)
+    try:
+        website_id = request.GET.get('website_id')
+        if website_id:
+            website_id = uuid.UUID(website_id)
+            conversations = conversations.filter(website_id=website_id)
+            analytics = analytics.filter(website_id=website_id)
+        for param, lookup in (('since', 'gte'), ('until', 'lte')):
+            if request.GET.get(param):
+                day = parse_date(request.GET[param])
+                if day is None:
+                    raise ValueError(param)
+                # Matches conv_started_date_idx
+                conversations = conversations.filter(**{f'started_at__date__{lookup}': day})
+                analytics = analytics.filter(**{f'date__{lookup}': day})
+    except ValueError:
+        return Response({'error': 'Invalid website_id, since or until'}, status=400)
+    attention = request.GET.get('requires_attention')
+    if attention in ('true', 'false'):
+        conversations = conversations.filter(requires_attention=attention == 'true')
+    
+    compress = request.GET.get('gzip') in ('1', 'true')
+    rows = TranscriptExportService.rows(dataset, conversations, analytics)
+    response = StreamingHttpResponse(
+        TranscriptExportService.stream(dataset, rows, file_format, compress=compress),
+        content_type='application/gzip' if compress else (
+            'text/csv; charset=utf-8' if file_format == 'csv' else 'application/x-ndjson'
+        ),
+    )
+    filename = f"{dataset}-{timezone.now():%Y%m%d}.{file_format}{'.gz' if compress else ''}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Let proxies pass the chunks through instead of buffering the whole file
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_stats(request):
     """Get dashboard statistics for user"""
     try:
-        user_websites = Website.objects.filter(owner=request.user)
-        
-        # Total stats
-        total_websites = user_websites.count()
-        total_conversations = Conversation.objects.filter(website__in=user_websites).count()
-        active_conversations = Conversation.objects.filter(
-            website__in=user_websites,
-            is_active=True
-        ).count()
-        conversations_needing_attention = Conversation.objects.filter(
-            website__in=user_websites,
-            requires_attention=True,
-            is_active=True
-        ).count()
-        
-        # Today's stats
-        today = timezone.now().date()
-        today_conversations = Conversation.objects.filter(
-            website__in=user_websites,
-            started_at__date=today
-        ).count()
-        
-        today_messages = Message.objects.filter(
-            conversation__website__in=user_websites,
-            timestamp__date=today
-        ).count()
-        
-        return Response({
-            'total_websites': total_websites,
-            'total_conversations': total_conversations,
-            'active_conversations': active_conversations,
-            'conversations_needing_attention': conversations_needing_attention,
-            'today_conversations': today_conversations,
-            'today_messages': today_messages
-        })
-        
+        return Response(DashboardStatsService.get(request.user.id))
     except Exception as e:
         logger.error(f"Error getting dashboard stats: {e}")
         return Response({'error': 'Internal server error'}, status=500)
@@ -542,28 +613,36 @@ def dashboard_stats(request):
 def save_contact_info(request):
     """Save visitor contact information"""
     try:
-        data = json.loads(request.body)
+        data = codec.loads(request.body)
         conversation_id = data.get('conversation_id')
         contact_info = data.get('contact_info', {})
         
         if not conversation_id:
             return JsonResponse({'error': 'conversation_id is required'}, status=400)
         
-        conversation = get_object_or_404(Conversation, id=conversation_id)
+        conversation = get_object_or_404(Conversation.objects.select_related('website'), id=conversation_id)
         
         # Save contact info to conversation
+        updated = []
         if 'email' in contact_info:
             conversation.visitor_email = contact_info['email']
+            updated.append('visitor_email')
         if 'name' in contact_info:
             conversation.visitor_name = contact_info['name']
+            updated.append('visitor_name')
         if 'phone' in contact_info:
             conversation.visitor_phone = contact_info['phone']
+            updated.append('visitor_phone')
         
-        conversation.save()
+        # Only the contact fields, so the message counters are never written back
+        conversation.save(update_fields=updated)
+        NotificationService.notify_conversation_updated(
+            NotificationRoute.for_website(conversation.website), conversation.id, contact_info=contact_info
+        )
         
         return JsonResponse({'success': True, 'message': 'Contact information saved'})
         
-    except json.JSONDecodeError:
+    except codec.DecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
     except Exception as e:
         logger.error(f"Error saving contact info: {e}")
@@ -580,10 +659,22 @@ def live_chat_view(request):
     active_conversations = Conversation.objects.filter(
         website__in=user_websites,
         is_active=True
-    ).select_related('website').prefetch_related('messages').order_by('-started_at')
+    )
+    
+    # One summary row per conversation for the sidebar; transcripts are fetched
+    # page by page when a conversation is opened. Conversations waiting for an
+    # agent come first, so the cutoff only ever hides ones that are not
+    summaries = list(ConversationSummaryService.annotate_summaries(
+        active_conversations.select_related('website').only(
+            'id', 'website__name', 'user_identifier', 'started_at', 'total_messages', 'requires_attention'
+        )
+    ).order_by('-requires_attention', '-started_at')[:LIVE_CHAT_SIDEBAR_LIMIT])
+    count = active_conversations.count()
     
     context = {
-        'active_conversations': active_conversations,
+        'active_conversations': summaries,
+        'active_conversations_count': count,
+        'hidden_conversations_count': count - len(summaries),
         'websites': user_websites
     }
     
@@ -595,18 +686,12 @@ def dashboard_view(request):
     """Main dashboard view"""
     # Get user's websites and basic stats
     user_websites = Website.objects.filter(owner=request.user)
-    
-    # Get dashboard stats
-    total_conversations = Conversation.objects.filter(website__in=user_websites).count()
-    active_conversations = Conversation.objects.filter(
-        website__in=user_websites,
-        is_active=True
-    ).count()
+    stats = DashboardStatsService.get(request.user.id)
     
     context = {
         'websites': user_websites,
-        'total_conversations': total_conversations,
-        'active_conversations': active_conversations
+        'total_conversations': stats['total_conversations'],
+        'active_conversations': stats['active_conversations']
     }
     
     return render(request, 'chatbot/dashboard.html', context)
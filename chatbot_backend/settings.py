@@ -116,6 +116,77 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Cache shared by all web and worker processes (e.g. CACHE_URL=redis://127.0.0.1:6379/1).
+# Without CACHE_URL each process gets its own in-memory cache, which is enough
+# for development and tests but not shared between processes.
+if os.getenv('CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Widget config endpoint: server-side cache lifetime and browser/CDN max-age (seconds)
+WEBSITE_CONFIG_CACHE_TIMEOUT = 3600
+WEBSITE_CONFIG_MAX_AGE = 60
+
+# Per-owner dashboard counters (seconds); new conversations and messages are
+# applied to the cached values as they arrive
+DASHBOARD_STATS_CACHE_TIMEOUT = 60
+
+# Notifications from HTTP views are published from a background thread so a
+# slow channel layer never blocks the request; at most this many sends may be
+# in flight before new ones are dropped
+NOTIFICATION_BACKGROUND_PUBLISH = True
+NOTIFICATION_BUFFER_SIZE = 1000
+
+# Typing indicators (seconds): a stop is held back this long so stop/start
+# flicker is not broadcast, and a start with no further frames expires
+TYPING_DEBOUNCE = 1.0
+TYPING_TIMEOUT = 6.0
+
+# Conversation -> website lookups remembered per dashboard connection
+DASHBOARD_ACCESS_CACHE_SIZE = 1000
+
+# Write-behind persistence for visitor messages on the chat socket: messages
+# are published to dashboards at once and inserted in batches every
+# CHAT_WRITE_BEHIND_INTERVAL seconds (see MessageWriteBehind)
+CHAT_WRITE_BEHIND = os.getenv('CHAT_WRITE_BEHIND', 'False').lower() == 'true'
+CHAT_WRITE_BEHIND_INTERVAL = 0.005
+CHAT_WRITE_BEHIND_BATCH_SIZE = 500
+CHAT_WRITE_BEHIND_RETRIES = 5
+# How long a client message id is remembered to drop retried frames (seconds)
+CHAT_WRITE_BEHIND_CLAIM_TTL = 3600
+
+# Reconnecting widgets resume from their last seen reply: the newest replies
+# per conversation are kept in the cache (0 disables it) and older gaps are
+# read from the database, up to CHAT_RESUME_MAX_MESSAGES (see ReplayBuffer)
+CHAT_REPLAY_BUFFER_SIZE = 50
+CHAT_REPLAY_BUFFER_TTL = 3600
+CHAT_RESUME_MAX_MESSAGES = 200
+
+# Transcript archive: ended conversations older than their website's
+# archive_after_days (or CHAT_ARCHIVE_AFTER_DAYS; None, the default, keeps
+# them) have their messages moved to compressed JSONL files in the
+# CHAT_ARCHIVE_STORAGE alias of STORAGES (see ConversationArchiveService).
+# CHAT_ARCHIVE_ROOT is the location of the default, local 'chat_archive' storage
+CHAT_ARCHIVE_ROOT = os.getenv('CHAT_ARCHIVE_ROOT', str(BASE_DIR / 'archive'))
+CHAT_ARCHIVE_STORAGE = 'chat_archive'
+CHAT_ARCHIVE_AFTER_DAYS = int(os.getenv('CHAT_ARCHIVE_AFTER_DAYS')) if os.getenv('CHAT_ARCHIVE_AFTER_DAYS') else None
+CHAT_ARCHIVE_BATCH_SIZE = 200
+CHAT_ARCHIVE_MAX_BATCHES = 50  # per scheduled run
+
+# JSON encoder for socket frames and JSON responses: 'auto' (orjson when
+# installed), 'orjson' or 'json'
+JSON_CODEC = 'auto'
+
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -126,7 +197,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',  # Allow API access for now
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'chatbot.codec.CodecJSONRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
@@ -183,8 +254,40 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
-# WhiteNoise configuration
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # WhiteNoise configuration
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+    # Transcript archive files (CHAT_ARCHIVE_STORAGE); point it at object storage in production
+    'chat_archive': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': CHAT_ARCHIVE_ROOT},
+    },
+}
+
+# Chatbot widget: canonical source and the minified bundle built from it by
+# `manage.py build_widget`; /widget.js redirects to the hashed bundle
+WIDGET_SOURCE = 'assets/js/chatbot-widget.js'
+WIDGET_BUNDLE = 'assets/js/chatbot-widget.min.js'
+WIDGET_LOADER_MAX_AGE = 300
+
+# AI responses: provider used when a website has no active API key
+# ('openai', 'stub' or unset for manual, agent-only chat)
+CHATBOT_DEFAULT_PROVIDER = os.getenv('CHATBOT_DEFAULT_PROVIDER') or None
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+# Per-website AI answer cache (entries per website, 0 disables it), keyed by
+# the question and the conversation's earlier turns. Set a cosine similarity
+# threshold such as 0.9 to also reuse answers to near-identical questions;
+# requires NumPy
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_MAX_WEBSITES = 1000
+RESPONSE_CACHE_TTL = 3600
+RESPONSE_CACHE_SIMILARITY = None
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -197,7 +300,30 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Periodic tasks (run with `celery -A chatbot_backend beat`)
+CELERY_BEAT_SCHEDULE = {
+    'rollup-dirty-analytics': {
+        'task': 'chatbot.tasks.rollup_dirty_analytics',
+        'schedule': 300.0,  # Every 5 minutes
+    },
+    'archive-old-conversations': {
+        'task': 'chatbot.tasks.archive_old_conversations',
+        'schedule': 3600.0,  # Hourly
+    },
+}
+
+# Analytics rollups
+ANALYTICS_ROLLUP_LAG_SECONDS = 300
+ANALYTICS_ROLLUP_WEBSITES_PER_CHUNK = 50
+
 # Logging
+# Frame-level debug logging from the consumers is sampled (1.0 logs every frame)
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '0.01'))
+
+# Metrics endpoint (/metrics): a bearer token for scrapers; without one only
+# staff users may read it
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -206,13 +332,23 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'chatbot.log_handlers.JSONFormatter',
+        },
+    },
+    'filters': {
+        'sampled': {
+            '()': 'chatbot.log_handlers.SampleFilter',
+            'rate': LOG_SAMPLE_RATE,
+        },
     },
     'handlers': {
+        # Written from a background thread; records are dropped if it falls behind
         'file': {
-            'level': 'INFO',
-            'class': 'logging.FileHandler',
+            'level': 'DEBUG',
+            '()': 'chatbot.log_handlers.BackgroundFileHandler',
             'filename': BASE_DIR / 'debug.log',
-            'formatter': 'verbose',
+            'formatter': 'json',
         },
         'console': {
             'level': 'INFO',
@@ -228,9 +364,16 @@ LOGGING = {
         },
         'chatbot': {
             'handlers': ['file', 'console'],
-            'level': 'DEBUG',
+            'level': 'INFO',
             'propagate': True,
         },
+        # Per-frame records from the WebSocket consumers
+        'chatbot.frames': {
+            'handlers': ['file'],
+            'filters': ['sampled'],
+            'level': 'DEBUG',
+            'propagate': False,
+        },
     },
 }
 
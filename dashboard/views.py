@@ -3,12 +3,13 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib import messages
-from django.http import JsonResponse
 from django.db.models import Count, Avg, Q
 from django.utils import timezone
 from datetime import timedelta
+from chatbot.codec import JsonResponse
 from chatbot.models import Website, Conversation, Message, ChatbotAnalytics
-from chatbot.services import AnalyticsService
+from chatbot.pagination import MAX_MESSAGE_PAGE_SIZE, MESSAGE_KEYSET, MESSAGE_PAGE_SIZE, InvalidCursor, keyset_window
+from chatbot.services import AnalyticsService, DashboardStatsService, TimeSeriesService
 
 
 def home(request):
@@ -44,31 +45,17 @@ def dashboard(request):
         website__owner=user
     ).select_related('website').order_by('-started_at')[:10]
     
-    # Get active conversations
-    active_conversations = Conversation.objects.filter(
-        website__owner=user,
-        is_active=True
-    ).count()
-    
-    # Calculate total stats
-    total_conversations = Conversation.objects.filter(website__owner=user).count()
-    total_messages = Message.objects.filter(conversation__website__owner=user).count()
-    
-    # Get today's stats
-    today = timezone.now().date()
-    today_conversations = Conversation.objects.filter(
-        website__owner=user,
-        started_at__date=today
-    ).count()
+    # Cached counters, kept current by the notification paths
+    stats = DashboardStatsService.get(user.id)
     
     context = {
         'websites': websites,
         'recent_conversations': recent_conversations,
-        'active_conversations': active_conversations,
-        'total_conversations': total_conversations,
-        'total_messages': total_messages,
-        'today_conversations': today_conversations,
-        'websites_count': websites.count(),
+        'active_conversations': stats['active_conversations'],
+        'total_conversations': stats['total_conversations'],
+        'total_messages': stats['total_messages'],
+        'today_conversations': stats['today_conversations'],
+        'websites_count': stats['total_websites'],
     }
     
     return render(request, 'dashboard/dashboard.html', context)
@@ -149,43 +136,26 @@ def analytics(request):
     """Analytics dashboard"""
     websites = Website.objects.filter(owner=request.user)
     
-    # Get date range from query params
-    days = int(request.GET.get('days', 30))
-    
-    # Calculate overall analytics
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=days)
-    
-    total_conversations = Conversation.objects.filter(
-        website__owner=request.user,
-        started_at__date__range=[start_date, end_date]
-    ).count()
-    
-    total_messages = Message.objects.filter(
-        conversation__website__owner=request.user,
-        timestamp__date__range=[start_date, end_date]
-    ).count()
-    
-    # Get daily data for charts
-    daily_data = []
-    for i in range(days):
-        date = end_date - timedelta(days=i)
-        day_conversations = Conversation.objects.filter(
-            website__owner=request.user,
-            started_at__date=date
-        ).count()
-        day_messages = Message.objects.filter(
-            conversation__website__owner=request.user,
-            timestamp__date=date
-        ).count()
-        
-        daily_data.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'conversations': day_conversations,
-            'messages': day_messages,
-        })
+    # Get date range and bucket size from query params
+    granularity = request.GET.get('granularity', 'day')
+    if granularity not in TimeSeriesService.GRANULARITIES:
+        granularity = 'day'
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        days = 30
+    days = min(max(days, 1), TimeSeriesService.MAX_DAYS[granularity])
+    
+    # One grouped query per table, regardless of the range length
+    daily_data = TimeSeriesService.get_activity_series(
+        Conversation.objects.filter(website__owner=request.user),
+        Message.objects.filter(conversation__website__owner=request.user),
+        days=days,
+        granularity=granularity,
+    )
     
-    daily_data.reverse()  # Chronological order
+    total_conversations = sum(bucket['conversations'] for bucket in daily_data)
+    total_messages = sum(bucket['messages'] for bucket in daily_data)
     
     context = {
         'websites': websites,
@@ -193,6 +163,7 @@ def analytics(request):
         'total_messages': total_messages,
         'daily_data': daily_data,
         'days': days,
+        'granularity': granularity,
     }
     
     return render(request, 'dashboard/analytics.html', context)
@@ -261,12 +232,20 @@ def website_edit(request, website_id):
 def get_conversation_data(request, conversation_id):
     """Get conversation data for live updates"""
     conversation = get_object_or_404(
-        Conversation,
+        Conversation.objects.select_related('website'),
         id=conversation_id,
         website__owner=request.user
     )
     
-    messages = conversation.messages.order_by('timestamp')
+    # Latest messages first; `before` scrolls back, `after` catches up
+    try:
+        limit = min(int(request.GET.get('limit', MESSAGE_PAGE_SIZE)), MAX_MESSAGE_PAGE_SIZE)
+        window = keyset_window(
+            conversation.messages.all(), MESSAGE_KEYSET, limit,
+            before=request.GET.get('before'), after=request.GET.get('after')
+        )
+    except (InvalidCursor, ValueError):
+        return JsonResponse({'error': 'Invalid cursor or limit'}, status=400)
     
     data = {
         'conversation': {
@@ -285,8 +264,12 @@ def get_conversation_data(request, conversation_id):
                 'timestamp': msg.timestamp.isoformat(),
                 'is_error': msg.is_error,
             }
-            for msg in messages
-        ]
+            for msg in window['rows']
+        ],
+        'before_cursor': window['before'],
+        'after_cursor': window['after'],
+        'has_older': window['has_older'],
+        'has_newer': window['has_newer'],
     }
     
     return JsonResponse(data)
@@ -39,6 +39,9 @@
       this.socket = null;
       this.isConnected = false;
       this.typingTimeout = null;
+      // Sequence number of the newest reply received over the socket; sent back
+      // on reconnect to replay the missed ones
+      this.lastSeq = null;
 
       this.isRecording = false;
       this.mediaRecorder = null;
@@ -1133,12 +1136,35 @@
         this.socket.onmessage = (e) => {
           try {
             const data = JSON.parse(e.data);
-            if (data.type === 'chat_message') {
-              this.addMessage({
-                role: data.role,
-                content: data.message,
-                timestamp: new Date().toISOString()
-              });
+            if (data.type === 'connection_established') {
+              // Before the first reply there is no cursor yet: resume from the start so a
+              // reply sent while the socket was down is not lost
+              this.socket.send(JSON.stringify({ type: 'resume', lastSeq: this.lastSeq === null ? 0 : this.lastSeq }));
+            } else if (data.type === 'resumed') {
+              if (data.complete === false) {
+                // Too much was missed, or the cursor is unknown: start over from the transcript
+                this.reloadHistory();
+              } else {
+                data.messages.forEach((frame) => this.receiveChatMessage(frame));
+                this.updateWidget();
+              }
+            } else if (data.type === 'chat_chunk') {
+              // Streamed AI reply: grow the message in place as tokens arrive
+              const streaming = this.findMessage(data.message_id);
+              if (streaming) {
+                streaming.content += data.delta;
+              } else {
+                this.addMessage({
+                  id: data.message_id,
+                  role: 'assistant',
+                  content: data.delta,
+                  timestamp: new Date().toISOString()
+                });
+              }
+              this.isLoading = false;
+              this.updateWidget();
+            } else if (data.type === 'chat_message') {
+              this.receiveChatMessage(data);
               this.isLoading = false;
               this.updateWidget();
             }
@@ -1151,14 +1177,65 @@
       }
     }
 
+    receiveChatMessage(data) {
+      // The final frame of a streamed reply carries the full text; replayed
+      // replies may already be here
+      const streamed = this.findMessage(data.message_id);
+      if (streamed) {
+        streamed.content = data.message;
+        streamed.isError = data.is_error;
+      } else {
+        this.addMessage({
+          id: data.message_id,
+          role: data.role,
+          content: data.message,
+          timestamp: data.timestamp || new Date().toISOString()
+        });
+      }
+      if (data.role !== 'user' && data.seq != null && (this.lastSeq === null || data.seq > this.lastSeq)) {
+        this.lastSeq = data.seq;
+      }
+    }
+
+    async reloadHistory() {
+      try {
+        const response = await fetch(
+          `${this.config.apiUrl}/api/chat/${this.config.websiteId}/${this.conversationId}/history/?limit=${this.config.maxMessages}`
+        );
+        if (!response.ok) {
+          throw new Error('HTTP error');
+        }
+        const data = await response.json();
+        // Rebuilt without addMessage(), so past replies do not count as unread
+        this.messages = data.messages.map((frame) => ({
+          id: frame.message_id,
+          role: frame.role,
+          content: frame.message,
+          timestamp: frame.timestamp
+        }));
+        this.lastSeq = null;
+        data.messages.forEach((frame) => {
+          if (frame.role !== 'user' && frame.seq != null && (this.lastSeq === null || frame.seq > this.lastSeq)) {
+            this.lastSeq = frame.seq;
+          }
+        });
+        this.updateWidget();
+      } catch (error) {
+        console.error('Error reloading chat history:', error);
+      }
+    }
+
     async sendMessage() {
       const input = document.getElementById('chatbot-input');
       if (!input || !input.value.trim() || this.isLoading || this.isRecording) return;
 
       const message = input.value.trim();
       input.value = '';
+      // Client-side id, so the server can publish and persist the message idempotently
+      const messageId = window.crypto && crypto.randomUUID ? crypto.randomUUID() : undefined;
 
       this.addMessage({
+        id: messageId,
         role: 'user',
         content: message,
         timestamp: new Date().toISOString()
@@ -1172,6 +1249,7 @@
           this.socket.send(JSON.stringify({
             type: 'chat_message',
             message: message,
+            messageId: messageId,
             websiteId: this.websiteId,
             conversationId: this.conversationId
           }));
@@ -1225,6 +1303,10 @@
       }
     }
 
+    findMessage(id) {
+      return id ? this.messages.find((message) => message.id === id) : undefined;
+    }
+
     addMessage(message) {
       this.messages.push(message);
       if (this.messages.length > this.config.maxMessages) {